@@ -12,6 +12,8 @@ import os
 import json
 import webbrowser
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
@@ -32,13 +34,19 @@ from core.session import load_session, parse_view_state
 from loaders.csv_loader import load_csv, CSVImportSettings, preview_csv, detect_delimiter
 
 # Visualization
-from viz.figure_factory import create_figure, create_empty_grid, subplot_idx_to_row_col, THEMES
+from viz.figure_factory import create_figure, create_empty_grid, subplot_idx_to_row_col, THEMES, figure_to_payload, get_display_view, get_display_events
 
 # Operations
 from ops.engine import (
     apply_unary, apply_binary, apply_multi,
     UnaryOp, BinaryOp, MultiOp, AlignmentMethod
 )
+from ops.graph import (
+    make_recipe, create_derived, create_derived_across_runs, resolve_derived, invalidate_derived, dependents_of,
+    graph_lock,
+)
+from ops.align import resample
+from ops.events import subplot_event_spec, next_event_time, prev_event_time
 
 # Compare
 from compare.engine import (
@@ -62,6 +70,15 @@ APP_TITLE = "Signal Viewer Pro v2.6"
 APP_HOST = "127.0.0.1"
 APP_PORT = 8050
 DEBUG = False  # Set to True for verbose logging
+PLOT_Y_FLOAT32 = True  # Send plot y-values as float32 when precision allows
+
+# Optional: gzip/brotli response compression (requires flask-compress)
+try:
+    import flask_compress  # noqa: F401
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+    print("[WARN] flask-compress not installed - responses sent uncompressed", flush=True)
 
 
 def _log(tag: str, msg: str):
@@ -79,6 +96,7 @@ app = dash.Dash(
     external_stylesheets=[],  # No CDN - use local assets/bootstrap.min.css
     suppress_callback_exceptions=True,
     title="Signal Viewer Pro",
+    compress=COMPRESS_AVAILABLE,  # gzip/brotli figure payloads
 )
 
 # =============================================================================
@@ -111,44 +129,211 @@ signal_settings: Dict[str, Dict] = {}
 view_state = ViewState()
 stream_engine = StreamEngine()
 
-# Figure cache for performance optimization
-_figure_cache = {
-    "hash": None,  # Hash of inputs that generated the cached figure
-    "figure": None,  # Cached figure
-    "cursor_values": None,  # Cached cursor values
-}
+# Figure cache: LRU of rendered payloads keyed by the hash of everything that
+# affects rendering, so tabs (current and pre-rendered) are served without a rebuild
+FIGURE_CACHE_SIZE = 8
+PRERENDER_RECENT_TABS = 3  # Most recently viewed tabs to pre-render (plus neighbours)
+_figure_cache: "OrderedDict[str, Tuple[dict, Dict]]" = OrderedDict()  # hash -> (payload, cursor_values)
+_figure_cache_lock = threading.Lock()
+_tab_recency: "OrderedDict[str, None]" = OrderedDict()  # Tab IDs, most recently viewed last
+_prerender_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tab-prerender")
+_prerender_generation = 0  # Bumped on each schedule; stale jobs skip themselves
 
-def _compute_figure_hash() -> str:
-    """Compute a hash of all inputs that affect figure rendering"""
+
+def _compute_figure_hash(vs: ViewState, shared_x: bool) -> str:
+    """Compute a hash of all inputs that affect figure rendering for a view state"""
     import hashlib
     
     # Build a string representation of all relevant state
     parts = []
     
-    # Run data hashes (use sample count as proxy for data changes)
-    for i, run in enumerate(runs):
-        parts.append(f"run{i}:{run.sample_count}:{len(run.signals)}")
-    
-    # Derived signals
-    for name, ds in derived_signals.items():
-        parts.append(f"derived:{name}:{len(ds.data)}")
+    # Run data and derived signals (version stamps change whenever arrays change)
+    parts.append(f"runs:{_runs_key()}")
+    parts.append(f"derived:{_derived_key()}")
     
     # View state
-    parts.append(f"layout:{view_state.layout_rows}x{view_state.layout_cols}")
-    parts.append(f"active:{view_state.active_subplot}")
-    parts.append(f"cursor:{view_state.cursor_enabled}:{view_state.cursor_time}")
-    
-    # Subplot assignments
-    for sp in view_state.subplots:
-        parts.append(f"sp{sp.index}:{sp.mode}:{','.join(sp.assigned_signals)}:{sp.title}")
+    parts.append(f"layout:{vs.layout_rows}x{vs.layout_cols}")
+    parts.append(f"active:{vs.active_subplot}:{vs.theme}:{shared_x}")
+    parts.append(f"cursor:{vs.cursor_enabled}:{vs.cursor_time}")
+    if vs.cursor_mode == "dual":
+        parts.append(f"cursor2:{vs.cursor2_time}")
+    parts.append(f"region:{vs.region_enabled}:{vs.region_start}:{vs.region_end}")
+    
+    # Subplot configs (dataclass repr covers mode, signals, render and view settings)
+    total = vs.layout_rows * vs.layout_cols
+    for sp in vs.subplots[:total]:
+        parts.append(repr(sp))
     
     # Signal settings
-    for key, settings in signal_settings.items():
-        parts.append(f"settings:{key}:{settings.get('is_state')}:{settings.get('color')}")
+    for key in sorted(signal_settings):
+        parts.append(f"settings:{key}:{sorted(signal_settings[key].items())}")
     
     hash_str = "|".join(parts)
     return hashlib.md5(hash_str.encode()).hexdigest()
 
+
+# Fine-grained invalidation: store-refresh fans out to many callbacks, so each
+# records the state it last rendered from and skips refreshes that leave it unchanged
+_rendered_inputs: Dict[str, tuple] = {}  # Callback name -> input key
+
+
+def _runs_key() -> tuple:
+    """Version key of loaded runs (version stamps change whenever arrays change)"""
+    return tuple((run.file_path, run.version, run.time_offset) for run in runs)
+
+
+def _derived_key() -> tuple:
+    """Version key of derived signals"""
+    return tuple((name, ds.version) for name, ds in derived_signals.items())
+
+
+def _settings_key(sig_keys: List[str]) -> tuple:
+    """Key of the display settings of the given signals only"""
+    return tuple((k, tuple(sorted(signal_settings.get(k, {}).items()))) for k in sig_keys)
+
+
+def _skip_refresh(name: str, key: tuple) -> bool:
+    """
+    Check whether a refresh can be skipped for a callback.
+    
+    Returns True (caller returns dash.no_update) when the callback was
+    triggered only by the store-refresh counter and its input key is
+    unchanged since it last rendered. Otherwise records the key.
+    """
+    ctx = callback_context
+    refresh_only = bool(ctx.triggered) and all(
+        t["prop_id"].startswith("store-refresh.") for t in ctx.triggered
+    )
+    if refresh_only and _rendered_inputs.get(name) == key:
+        return True
+    _rendered_inputs[name] = key
+    return False
+
+
+def _figure_cache_get(key: str) -> Optional[Tuple[dict, Dict]]:
+    """Get a cached (payload, cursor_values) and mark it most recently used"""
+    with _figure_cache_lock:
+        entry = _figure_cache.get(key)
+        if entry is not None:
+            _figure_cache.move_to_end(key)
+        return entry
+
+
+def _figure_cache_put(key: str, payload: dict, cursor_values: Dict):
+    """Store a rendered figure, evicting the least recently used beyond FIGURE_CACHE_SIZE"""
+    with _figure_cache_lock:
+        _figure_cache[key] = (payload, cursor_values)
+        _figure_cache.move_to_end(key)
+        while len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+
+
+def _render_figure(vs: ViewState, shared_x: bool, snapshot: Optional[tuple] = None) -> Tuple[dict, Dict]:
+    """
+    Build the figure for a view state and encode it as a typed-array payload.
+    
+    Args:
+        vs: View state to render
+        shared_x: Link x axes across subplots
+        snapshot: (runs, derived_signals, signal_settings) copies to render
+                  from instead of the live globals (background renders)
+    """
+    runs_src, derived_src, settings_src = snapshot or (runs, derived_signals, signal_settings)
+    fig, cursor_values = create_figure(
+        runs_src,
+        derived_src,
+        vs,
+        settings_src,
+        shared_x=shared_x,
+    )
+    # Binary typed-array payload - much smaller/faster than JSON number lists
+    return figure_to_payload(fig, y_float32=PLOT_Y_FLOAT32), cursor_values
+
+
+def _prerender_candidates(tabs: List[Dict], active_tab: Optional[str], tab_view_states: Dict) -> List[str]:
+    """
+    Pick inactive tabs worth pre-rendering: the neighbours of the active tab
+    and the most recently viewed ones. Only tabs with a saved view state qualify.
+    """
+    tab_ids = [t.get("id") for t in tabs or []]
+    candidates = []
+    if active_tab in tab_ids:
+        pos = tab_ids.index(active_tab)
+        candidates.extend(tab_ids[max(pos - 1, 0):pos] + tab_ids[pos + 1:pos + 2])
+    recent = [t for t in reversed(_tab_recency) if t != active_tab][:PRERENDER_RECENT_TABS]
+    candidates.extend(recent)
+    
+    seen = set()
+    return [
+        t for t in candidates
+        if t != active_tab and t in tab_view_states and not (t in seen or seen.add(t))
+    ]
+
+
+def _schedule_prerender(tabs: List[Dict], active_tab: Optional[str], tab_view_states: Dict, shared_x: bool):
+    """
+    Pre-render inactive tabs in the background so switching to them is a cache hit.
+    
+    Hashes are taken now, together with a snapshot of runs, derived signals
+    and settings that the renders (on a single worker thread) read instead
+    of the globals callbacks keep mutating. A newer schedule supersedes
+    pending jobs.
+    """
+    global _prerender_generation
+    _prerender_generation += 1
+    generation = _prerender_generation
+    
+    with graph_lock:
+        snapshot = (list(runs), dict(derived_signals), {k: dict(v) for k, v in signal_settings.items()})
+        jobs = _prerender_jobs(tabs, active_tab, tab_view_states, shared_x)
+    for tab_id, vs, key in jobs:
+        _prerender_pool.submit(_prerender_tab, tab_id, vs, key, shared_x, generation, snapshot)
+
+
+def _prerender_jobs(tabs: List[Dict], active_tab: Optional[str], tab_view_states: Dict, shared_x: bool) -> List[tuple]:
+    """(tab_id, view state, figure hash) of candidate tabs not in the figure cache"""
+    jobs = []
+    for tab_id in _prerender_candidates(tabs, active_tab, tab_view_states):
+        vs = ViewState()
+        _apply_view_state_dict(vs, tab_view_states[tab_id])
+        # Slider values are global - update_plot applies them after a switch
+        vs.cursor_time = view_state.cursor_time
+        vs.cursor2_time = view_state.cursor2_time
+        vs.cursor_mode = view_state.cursor_mode
+        vs.region_enabled = view_state.region_enabled
+        vs.region_start = view_state.region_start
+        vs.region_end = view_state.region_end
+        key = _compute_figure_hash(vs, shared_x)
+        with _figure_cache_lock:
+            if key in _figure_cache:
+                continue
+        jobs.append((tab_id, vs, key))
+    return jobs
+
+
+def _prerender_tab(tab_id: str, vs: ViewState, key: str, shared_x: bool, generation: int, snapshot: tuple):
+    """
+    Background job: render one tab from a snapshot into the figure cache,
+    unless superseded or the data changed since the hash was taken
+    """
+    if generation != _prerender_generation:
+        return
+    with _figure_cache_lock:
+        if key in _figure_cache:
+            return
+    try:
+        payload, cursor_values = _render_figure(vs, shared_x, snapshot)
+    except Exception as e:
+        print(f"[PRERENDER] Tab {tab_id} failed: {e}", flush=True)
+        return
+    with graph_lock:
+        if _compute_figure_hash(vs, shared_x) != key:
+            _log("PRERENDER", f"Tab {tab_id} discarded (data changed while rendering)")
+            return
+        # At most 2 + PRERENDER_RECENT_TABS jobs per schedule, so the on-screen figure survives
+        _figure_cache_put(key, payload, cursor_values)
+    _log("PRERENDER", f"Tab {tab_id} ready")
+
 _reset_state()  # Ensure clean start - P0 requirement
 
 
@@ -451,13 +636,13 @@ def build_signal_tree(runs_list: List[Run], search_filter: str = "", collapsed_r
             ),
         ], className="mt-2 mb-1 d-flex align-items-center"))
         
-        for name in derived_signals.keys():
+        for name, ds in derived_signals.items():
             sig_key = make_signal_key(DERIVED_RUN_IDX, name)
             items.append(
                 html.Div([
-                    # Clickable signal name
+                    # Clickable signal name (flagged while its inputs are missing)
                     html.Span(
-                        name,
+                        f"⚠ {name} (broken)" if ds.broken else name,
                         id={"type": "signal-item", "key": sig_key},
                         className="small text-warning",
                         style={"cursor": "pointer", "flex": "1"},
@@ -727,6 +912,9 @@ def replace_csv_path(replace_clicks, refresh, collapsed_runs):
     
     print(f"[REPLACE] Replaced run {run_idx}: {old_run.file_path} -> {new_path}", flush=True)
     
+    # Only derived signals built on this run recompute (lazily)
+    invalidate_derived(runs, derived_signals)
+    
     run_paths = [r.file_path for r in runs]
     return (
         build_runs_list(run_paths),
@@ -863,6 +1051,8 @@ def toggle_link_mode(n_clicks, current_style):
 )
 def update_linked_runs_options(refresh):
     """Update linked runs dropdown options"""
+    if _skip_refresh("linked_runs", tuple(run.csv_display_name for run in runs)):
+        return dash.no_update
     if not runs:
         return []
     return [{"label": run.csv_display_name, "value": i} for i, run in enumerate(runs)]
@@ -975,6 +1165,23 @@ def _view_state_to_dict() -> dict:
                 "x_signal": sp.x_signal,
                 "y_signals": list(sp.y_signals),  # Copy!
                 "xy_alignment": sp.xy_alignment,
+                "xy_density": sp.xy_density,
+                "xy_bins": sp.xy_bins,
+                "fft_window": sp.fft_window,
+                "fft_log_scale": sp.fft_log_scale,
+                "fft_pad": sp.fft_pad,
+                "fft_average": sp.fft_average,
+                "fft_psd": sp.fft_psd,
+                "event_kind": sp.event_kind,
+                "event_level": sp.event_level,
+                "event_low": sp.event_low,
+                "event_high": sp.event_high,
+                "event_direction": sp.event_direction,
+                "event_hysteresis": sp.event_hysteresis,
+                "event_min_duration": sp.event_min_duration,
+                "render": sp.render,
+                "spec_nperseg": sp.spec_nperseg,
+                "spec_hop": sp.spec_hop,
                 "xlim": sp.xlim,  # Axis limits
                 "ylim": sp.ylim,  # Axis limits
                 "title": sp.title,
@@ -987,6 +1194,55 @@ def _view_state_to_dict() -> dict:
     }
 
 
+def _apply_view_state_dict(vs: ViewState, saved_state: dict):
+    """
+    Restore a view state saved by _view_state_to_dict (P1 - preserve all data).
+    
+    CRITICAL: Uses list() to create copies, not references.
+    """
+    vs.layout_rows = saved_state.get("layout_rows", 1)
+    vs.layout_cols = saved_state.get("layout_cols", 1)
+    vs.active_subplot = saved_state.get("active_subplot", 0)
+    vs.theme = saved_state.get("theme", "dark")
+    vs.cursor_time = saved_state.get("cursor_time")
+    vs.cursor_enabled = saved_state.get("cursor_enabled", False)
+    
+    vs.subplots = []
+    for sp_data in saved_state.get("subplots", []):
+        sp = SubplotConfig(
+            index=sp_data.get("index", len(vs.subplots)),
+            mode=sp_data.get("mode", "time"),
+            assigned_signals=list(sp_data.get("assigned_signals", [])),  # Copy!
+            x_signal=sp_data.get("x_signal"),
+            y_signals=list(sp_data.get("y_signals", [])),  # Copy!
+            xy_alignment=sp_data.get("xy_alignment", "linear"),
+            xy_density=sp_data.get("xy_density", False),
+            xy_bins=sp_data.get("xy_bins", 200),
+            fft_window=sp_data.get("fft_window", "hanning"),
+            fft_log_scale=sp_data.get("fft_log_scale", True),
+            fft_pad=sp_data.get("fft_pad", False),
+            fft_average=sp_data.get("fft_average", "none"),
+            fft_psd=sp_data.get("fft_psd", False),
+            event_kind=sp_data.get("event_kind", "none"),
+            event_level=sp_data.get("event_level"),
+            event_low=sp_data.get("event_low"),
+            event_high=sp_data.get("event_high"),
+            event_direction=sp_data.get("event_direction", "both"),
+            event_hysteresis=sp_data.get("event_hysteresis", 0.0),
+            event_min_duration=sp_data.get("event_min_duration", 0.0),
+            render=sp_data.get("render", "lines"),
+            spec_nperseg=sp_data.get("spec_nperseg", 1024),
+            spec_hop=sp_data.get("spec_hop", 512),
+            xlim=sp_data.get("xlim"),
+            ylim=sp_data.get("ylim"),
+            title=sp_data.get("title", ""),
+            caption=sp_data.get("caption", ""),
+            description=sp_data.get("description", ""),
+            include_in_report=sp_data.get("include_in_report", True),
+        )
+        vs.subplots.append(sp)
+
+
 # =============================================================================
 # CALLBACKS: Layout & Subplot Selection
 # =============================================================================
@@ -1128,6 +1384,10 @@ def init_subplot_selector(refresh):
     """
     global view_state
     
+    layout_key = (view_state.layout_rows, view_state.layout_cols, view_state.active_subplot)
+    if _skip_refresh("subplot_selector", layout_key):
+        return dash.no_update, dash.no_update, dash.no_update
+    
     total = view_state.layout_rows * view_state.layout_cols
     options = [{"label": f"{i + 1} / {total}", "value": i} for i in range(total)]
     value = min(view_state.active_subplot, total - 1) if total > 0 else 0
@@ -1145,6 +1405,8 @@ def init_subplot_selector(refresh):
     Output("btn-mode-xy", "outline"),
     Output("btn-mode-fft", "color", allow_duplicate=True),
     Output("btn-mode-fft", "outline", allow_duplicate=True),
+    Output("btn-mode-spec", "color", allow_duplicate=True),
+    Output("btn-mode-spec", "outline", allow_duplicate=True),
     Output("input-subplot-title", "value"),
     Input("select-subplot", "value"),
     prevent_initial_call=True,
@@ -1173,6 +1435,8 @@ def select_subplot(subplot_idx):
     xy_outline = False if mode == "xy" else True
     fft_color = "primary" if mode == "fft" else "secondary"
     fft_outline = False if mode == "fft" else True
+    spec_color = "primary" if mode == "spectrogram" else "secondary"
+    spec_outline = False if mode == "spectrogram" else True
     
     total = view_state.layout_rows * view_state.layout_cols
     
@@ -1184,6 +1448,7 @@ def select_subplot(subplot_idx):
         time_color, time_outline,
         xy_color, xy_outline,
         fft_color, fft_outline,
+        spec_color, spec_outline,
         sp_config.title or "",  # Populate subplot title input
     )
 
@@ -1457,13 +1722,16 @@ def clear_all(n_clicks, refresh):
     Output("xy-controls", "style"),
     Output("xy-x-signal", "options"),
     Output("xy-x-signal", "value"),
+    Output("xy-density", "value"),
+    Output("xy-bins", "value"),
     Input("btn-mode-time", "n_clicks"),
     Input("btn-mode-xy", "n_clicks"),
     Input("btn-mode-fft", "n_clicks"),
+    Input("btn-mode-spec", "n_clicks"),
     Input("select-subplot", "value"),
     State("store-runs", "data"),
 )
-def update_xy_controls(time_clicks, xy_clicks, fft_clicks, subplot_idx, run_paths):
+def update_xy_controls(time_clicks, xy_clicks, fft_clicks, spec_clicks, subplot_idx, run_paths):
     """
     Show/hide X-Y controls and populate X signal dropdown.
     Y signals come from the assigned list (P0-13).
@@ -1490,10 +1758,13 @@ def update_xy_controls(time_clicks, xy_clicks, fft_clicks, subplot_idx, run_path
     elif "btn-mode-fft" in trigger:
         sp_config.mode = "fft"
         print(f"[MODE] Subplot {sp_idx}: FFT mode", flush=True)
+    elif "btn-mode-spec" in trigger:
+        sp_config.mode = "spectrogram"
+        print(f"[MODE] Subplot {sp_idx}: Spectrogram mode", flush=True)
     
     # Show/hide based on mode
     if sp_config.mode != "xy":
-        return {"display": "none"}, [], None
+        return {"display": "none"}, [], None, dash.no_update, dash.no_update
     
     # Build X signal options from all runs + assigned signals
     options = []
@@ -1512,6 +1783,8 @@ def update_xy_controls(time_clicks, xy_clicks, fft_clicks, subplot_idx, run_path
         {"display": "block"},
         options,
         sp_config.x_signal,
+        [True] if sp_config.xy_density else [],
+        sp_config.xy_bins,
     )
 
 
@@ -1519,11 +1792,13 @@ def update_xy_controls(time_clicks, xy_clicks, fft_clicks, subplot_idx, run_path
     Output("store-refresh", "data", allow_duplicate=True),
     Input("xy-x-signal", "value"),
     Input("xy-alignment", "value"),
+    Input("xy-density", "value"),
+    Input("xy-bins", "value"),
     State("select-subplot", "value"),
     State("store-refresh", "data"),
     prevent_initial_call=True,
 )
-def update_xy_config(x_signal, alignment, subplot_idx, refresh):
+def update_xy_config(x_signal, alignment, density, bins, subplot_idx, refresh):
     """
     Update subplot X-Y configuration when X signal or alignment is changed.
     Y signals come from the assigned list automatically (P0-13).
@@ -1538,7 +1813,15 @@ def update_xy_config(x_signal, alignment, subplot_idx, refresh):
         # Y signals are the assigned signals (excluding X if it's in there)
         sp_config.xy_alignment = alignment or "linear"
         
-        print(f"[X-Y] Subplot {sp_idx}: X={x_signal}, align={alignment}", flush=True)
+        density = bool(density)
+        if density != sp_config.xy_density:
+            # Zoom window from line mode does not apply to the new rendering
+            sp_config.view_xrange = None
+            sp_config.view_yrange = None
+        sp_config.xy_density = density
+        sp_config.xy_bins = int(bins or 200)
+        
+        print(f"[X-Y] Subplot {sp_idx}: X={x_signal}, align={alignment}, density={density}", flush=True)
     
     return (refresh or 0) + 1
 
@@ -1641,6 +1924,9 @@ def update_cursor_range(refresh, cursor_enabled, current_value):
     - Preserves current value if within new range
     """
     is_enabled = cursor_enabled and len(cursor_enabled) > 0
+    assigned = tuple(k for sp in view_state.subplots for k in sp.assigned_signals)
+    if _skip_refresh("cursor_range", (bool(is_enabled), assigned, _runs_key(), _derived_key())):
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
     if not is_enabled or not runs:
         return 0, 100, 0, True  # Disabled
     
@@ -1653,8 +1939,8 @@ def update_cursor_range(refresh, cursor_enabled, current_value):
             run_idx, sig_name = parse_signal_key(sig_key)
             
             if run_idx == DERIVED_RUN_IDX:
-                if sig_name in derived_signals:
-                    ds = derived_signals[sig_name]
+                ds = resolve_derived(runs, derived_signals, sig_name)
+                if ds is not None:
                     if len(ds.time) > 0:
                         t_min = min(t_min, float(ds.time[0]))
                         t_max = max(t_max, float(ds.time[-1]))
@@ -1728,8 +2014,9 @@ def cursor_jump_to_time(n_clicks, n_submit, target_time, t_min, t_max):
             
             time_arr = None
             if run_idx == DERIVED_RUN_IDX:
-                if sig_name in derived_signals:
-                    time_arr = derived_signals[sig_name].time
+                ds = resolve_derived(runs, derived_signals, sig_name)
+                if ds is not None:
+                    time_arr = ds.time
             elif 0 <= run_idx < len(runs):
                 time_arr = runs[run_idx].time
             
@@ -1752,6 +2039,152 @@ def cursor_jump_to_time(n_clicks, n_submit, target_time, t_min, t_max):
     return nearest_time, f"T = {nearest_time:.6f}"
 
 
+# =============================================================================
+# CALLBACKS: Events
+# =============================================================================
+
+@app.callback(
+    Output("event-controls", "style"),
+    Output("event-kind", "value"),
+    Output("event-direction", "value"),
+    Output("event-level", "value"),
+    Output("event-hysteresis", "value"),
+    Output("event-low", "value"),
+    Output("event-high", "value"),
+    Output("event-min-duration", "value"),
+    Input("btn-mode-time", "n_clicks"),
+    Input("btn-mode-xy", "n_clicks"),
+    Input("btn-mode-fft", "n_clicks"),
+    Input("btn-mode-spec", "n_clicks"),
+    Input("select-subplot", "value"),
+)
+def update_event_controls(time_clicks, xy_clicks, fft_clicks, spec_clicks, subplot_idx):
+    """Show event detection controls for time-mode subplots and load their settings"""
+    ctx = callback_context
+    trigger = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
+    sp_idx = int(subplot_idx or 0)
+    
+    sp_config = view_state.subplots[sp_idx] if sp_idx < len(view_state.subplots) else SubplotConfig(index=sp_idx)
+    # Mode buttons update the config in other callbacks - use the trigger directly
+    is_time = "btn-mode-time" in trigger or (sp_config.mode == "time" and "btn-mode-" not in trigger)
+    if not is_time:
+        return ({"display": "none"},) + (dash.no_update,) * 7
+    
+    return (
+        {"display": "block"},
+        sp_config.event_kind or "none",
+        sp_config.event_direction or "both",
+        sp_config.event_level,
+        sp_config.event_hysteresis or None,
+        sp_config.event_low,
+        sp_config.event_high,
+        sp_config.event_min_duration or None,
+    )
+
+
+@app.callback(
+    Output("store-refresh", "data", allow_duplicate=True),
+    Input("event-kind", "value"),
+    Input("event-direction", "value"),
+    Input("event-level", "value"),
+    Input("event-hysteresis", "value"),
+    Input("event-low", "value"),
+    Input("event-high", "value"),
+    Input("event-min-duration", "value"),
+    State("select-subplot", "value"),
+    State("store-refresh", "data"),
+    prevent_initial_call=True,
+)
+def update_event_config(kind, direction, level, hysteresis, low, high, min_duration, subplot_idx, refresh):
+    """Update event detection settings of the active subplot"""
+    def as_float(value):
+        try:
+            return float(value) if value not in (None, "") else None
+        except (ValueError, TypeError):
+            return None
+    
+    sp_idx = int(subplot_idx or 0)
+    while len(view_state.subplots) <= sp_idx:
+        view_state.subplots.append(SubplotConfig(index=len(view_state.subplots)))
+    sp_config = view_state.subplots[sp_idx]
+    
+    settings = (
+        kind or "none",
+        direction or "both",
+        as_float(level),
+        abs(as_float(hysteresis) or 0.0),
+        as_float(low),
+        as_float(high),
+        max(as_float(min_duration) or 0.0, 0.0),
+    )
+    current = (
+        sp_config.event_kind, sp_config.event_direction, sp_config.event_level,
+        sp_config.event_hysteresis, sp_config.event_low, sp_config.event_high,
+        sp_config.event_min_duration,
+    )
+    if settings == current:
+        return dash.no_update
+    
+    (sp_config.event_kind, sp_config.event_direction, sp_config.event_level,
+     sp_config.event_hysteresis, sp_config.event_low, sp_config.event_high,
+     sp_config.event_min_duration) = settings
+    print(f"[EVENTS] Subplot {sp_idx}: {subplot_event_spec(sp_config)}", flush=True)
+    
+    return (refresh or 0) + 1
+
+
+@app.callback(
+    Output("cursor-slider", "value", allow_duplicate=True),
+    Output("cursor-time-display", "children", allow_duplicate=True),
+    Input("btn-event-prev", "n_clicks"),
+    Input("btn-event-next", "n_clicks"),
+    State("cursor-slider", "value"),
+    State("cursor-slider", "min"),
+    State("cursor-slider", "max"),
+    prevent_initial_call=True,
+)
+def cursor_jump_to_event(prev_clicks, next_clicks, cursor_time, t_min, t_max):
+    """
+    Step the cursor to the previous/next detected event.
+    
+    Considers the events of every time-mode subplot with event detection.
+    Event tables are cached per signal, so each step is one binary search
+    per signal.
+    """
+    ctx = callback_context
+    if not ctx.triggered:
+        return dash.no_update, dash.no_update
+    forward = "btn-event-next" in ctx.triggered[0]["prop_id"]
+    
+    current = cursor_time if cursor_time is not None else view_state.cursor_time
+    if current is None:
+        current = float("-inf") if forward else float("inf")
+    
+    best = None
+    for sp in view_state.subplots:
+        if sp.mode != "time" or sp.event_kind == "none":
+            continue
+        spec = subplot_event_spec(sp)
+        for sig_key in sp.assigned_signals:
+            events = get_display_events(runs, derived_signals, sig_key, signal_settings, spec)
+            if not events:
+                continue
+            t = next_event_time(events, current) if forward else prev_event_time(events, current)
+            if t is not None and (best is None or (t < best if forward else t > best)):
+                best = t
+    
+    if best is None:
+        print(f"[EVENTS] No {'next' if forward else 'previous'} event from T={current}", flush=True)
+        return dash.no_update, dash.no_update
+    
+    if t_min is not None and t_max is not None:
+        best = max(t_min, min(t_max, best))
+    view_state.cursor_time = best
+    
+    print(f"[CURSOR] {'Next' if forward else 'Previous'} event at T={best:.6f}", flush=True)
+    return best, f"T = {best:.6f}"
+
+
 # =============================================================================
 # CALLBACKS: Dual Cursor Mode
 # =============================================================================
@@ -1872,8 +2305,9 @@ def cursor2_jump_to_time(n_clicks, n_submit, target_time, t_min, t_max):
             
             time_arr = None
             if run_idx == DERIVED_RUN_IDX:
-                if sig_name in derived_signals:
-                    time_arr = derived_signals[sig_name].time
+                ds = resolve_derived(runs, derived_signals, sig_name)
+                if ds is not None:
+                    time_arr = ds.time
             elif 0 <= run_idx < len(runs):
                 time_arr = runs[run_idx].time
             
@@ -1907,6 +2341,8 @@ def cursor2_jump_to_time(n_clicks, n_submit, target_time, t_min, t_max):
     Output("btn-mode-xy", "outline", allow_duplicate=True),
     Output("btn-mode-fft", "color"),
     Output("btn-mode-fft", "outline"),
+    Output("btn-mode-spec", "color", allow_duplicate=True),
+    Output("btn-mode-spec", "outline", allow_duplicate=True),
     Output("store-refresh", "data", allow_duplicate=True),
     Input("btn-mode-fft", "n_clicks"),
     State("select-subplot", "value"),
@@ -1924,7 +2360,251 @@ def set_fft_mode(n_clicks, active_sp, refresh):
     view_state.subplots[sp_idx].mode = "fft"
     print(f"[MODE] Subplot {sp_idx} set to FFT mode", flush=True)
     
-    return "secondary", True, "secondary", True, "primary", False, (refresh or 0) + 1
+    return "secondary", True, "secondary", True, "primary", False, "secondary", True, (refresh or 0) + 1
+
+
+@app.callback(
+    Output("fft-controls", "style"),
+    Output("fft-pad", "value"),
+    Output("fft-average", "value"),
+    Output("fft-psd", "value"),
+    Input("btn-mode-time", "n_clicks"),
+    Input("btn-mode-xy", "n_clicks"),
+    Input("btn-mode-fft", "n_clicks"),
+    Input("btn-mode-spec", "n_clicks"),
+    Input("select-subplot", "value"),
+)
+def update_fft_controls(time_clicks, xy_clicks, fft_clicks, spec_clicks, subplot_idx):
+    """Show FFT controls for FFT subplots and load their settings"""
+    ctx = callback_context
+    trigger = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
+    sp_idx = int(subplot_idx or 0)
+    
+    sp_config = view_state.subplots[sp_idx] if sp_idx < len(view_state.subplots) else None
+    # Mode buttons update the config in other callbacks - use the trigger directly
+    is_fft = "btn-mode-fft" in trigger or (
+        sp_config is not None and sp_config.mode == "fft" and "btn-mode-" not in trigger
+    )
+    if not is_fft or sp_config is None:
+        return {"display": "none"}, dash.no_update, dash.no_update, dash.no_update
+    
+    return (
+        {"display": "block"},
+        [True] if sp_config.fft_pad else [],
+        sp_config.fft_average or "none",
+        [True] if sp_config.fft_psd else [],
+    )
+
+
+@app.callback(
+    Output("store-refresh", "data", allow_duplicate=True),
+    Input("fft-pad", "value"),
+    Input("fft-average", "value"),
+    Input("fft-psd", "value"),
+    State("select-subplot", "value"),
+    State("store-refresh", "data"),
+    prevent_initial_call=True,
+)
+def update_fft_config(pad, average, psd, subplot_idx, refresh):
+    """Update FFT zero-padding, Welch averaging and PSD display for the active subplot"""
+    sp_idx = int(subplot_idx or 0)
+    if sp_idx >= len(view_state.subplots):
+        return dash.no_update
+    
+    sp_config = view_state.subplots[sp_idx]
+    pad, average, psd = bool(pad), average or "none", bool(psd)
+    if (sp_config.fft_pad, sp_config.fft_average, sp_config.fft_psd) == (pad, average, psd):
+        return dash.no_update
+    
+    sp_config.fft_pad = pad
+    sp_config.fft_average = average
+    sp_config.fft_psd = psd
+    print(f"[FFT] Subplot {sp_idx}: pad={pad}, average={average}, psd={psd}", flush=True)
+    
+    return (refresh or 0) + 1
+
+
+# =============================================================================
+# CALLBACKS: Spectrogram Mode
+# =============================================================================
+
+@app.callback(
+    Output("btn-mode-time", "color", allow_duplicate=True),
+    Output("btn-mode-time", "outline", allow_duplicate=True),
+    Output("btn-mode-xy", "color", allow_duplicate=True),
+    Output("btn-mode-xy", "outline", allow_duplicate=True),
+    Output("btn-mode-fft", "color", allow_duplicate=True),
+    Output("btn-mode-fft", "outline", allow_duplicate=True),
+    Output("btn-mode-spec", "color"),
+    Output("btn-mode-spec", "outline"),
+    Output("store-refresh", "data", allow_duplicate=True),
+    Input("btn-mode-spec", "n_clicks"),
+    State("select-subplot", "value"),
+    State("store-refresh", "data"),
+    prevent_initial_call=True,
+)
+def set_spectrogram_mode(n_clicks, active_sp, refresh):
+    """Set active subplot to spectrogram mode"""
+    global view_state
+    
+    sp_idx = int(active_sp or 0)
+    while len(view_state.subplots) <= sp_idx:
+        view_state.subplots.append(SubplotConfig(index=len(view_state.subplots)))
+    
+    view_state.subplots[sp_idx].mode = "spectrogram"
+    print(f"[MODE] Subplot {sp_idx} set to Spectrogram mode", flush=True)
+    
+    return "secondary", True, "secondary", True, "secondary", True, "primary", False, (refresh or 0) + 1
+
+
+@app.callback(
+    Output("spec-controls", "style"),
+    Output("spec-window", "value"),
+    Output("spec-nperseg", "value"),
+    Output("spec-overlap", "value"),
+    Input("btn-mode-time", "n_clicks"),
+    Input("btn-mode-xy", "n_clicks"),
+    Input("btn-mode-fft", "n_clicks"),
+    Input("btn-mode-spec", "n_clicks"),
+    Input("select-subplot", "value"),
+)
+def update_spec_controls(time_clicks, xy_clicks, fft_clicks, spec_clicks, subplot_idx):
+    """Show spectral controls for spectrogram and FFT subplots and load their settings"""
+    ctx = callback_context
+    trigger = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
+    sp_idx = int(subplot_idx or 0)
+    
+    sp_config = view_state.subplots[sp_idx] if sp_idx < len(view_state.subplots) else None
+    # Mode buttons update the config in other callbacks - use the trigger directly
+    is_spec = "btn-mode-spec" in trigger or "btn-mode-fft" in trigger or (
+        sp_config is not None and sp_config.mode in ("spectrogram", "fft") and "btn-mode-" not in trigger
+    )
+    if not is_spec or sp_config is None:
+        return {"display": "none"}, dash.no_update, dash.no_update, dash.no_update
+    
+    nperseg = sp_config.spec_nperseg
+    overlap = int(round(100 * (1 - sp_config.spec_hop / nperseg))) if nperseg else 50
+    return {"display": "block"}, sp_config.fft_window or "hanning", nperseg, overlap
+
+
+@app.callback(
+    Output("store-refresh", "data", allow_duplicate=True),
+    Input("spec-window", "value"),
+    Input("spec-nperseg", "value"),
+    Input("spec-overlap", "value"),
+    State("select-subplot", "value"),
+    State("store-refresh", "data"),
+    prevent_initial_call=True,
+)
+def update_spec_config(window, nperseg, overlap, subplot_idx, refresh):
+    """Update spectral window/segment/hop for the active subplot"""
+    sp_idx = int(subplot_idx or 0)
+    if sp_idx >= len(view_state.subplots):
+        return dash.no_update
+    
+    sp_config = view_state.subplots[sp_idx]
+    nperseg = int(nperseg or 1024)
+    hop = max(int(nperseg * (1 - (overlap or 0) / 100.0)), 1)
+    window = window or "hanning"
+    
+    if (sp_config.fft_window, sp_config.spec_nperseg, sp_config.spec_hop) == (window, nperseg, hop):
+        return dash.no_update
+    
+    sp_config.fft_window = window
+    sp_config.spec_nperseg = nperseg
+    sp_config.spec_hop = hop
+    print(f"[SPECTROGRAM] Subplot {sp_idx}: window={window}, nperseg={nperseg}, hop={hop}", flush=True)
+    
+    return (refresh or 0) + 1
+
+
+# =============================================================================
+# CALLBACKS: Raster Rendering
+# =============================================================================
+
+@app.callback(
+    Output("btn-render-raster", "color"),
+    Output("btn-render-raster", "outline"),
+    Output("store-refresh", "data", allow_duplicate=True),
+    Input("btn-render-raster", "n_clicks"),
+    Input("select-subplot", "value"),
+    State("store-refresh", "data"),
+    prevent_initial_call=True,
+)
+def toggle_raster_render(n_clicks, active_sp, refresh):
+    """Toggle server-side raster rendering for the active subplot (time mode)"""
+    global view_state
+    
+    ctx = callback_context
+    trigger = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
+    
+    sp_idx = int(active_sp or 0)
+    while len(view_state.subplots) <= sp_idx:
+        view_state.subplots.append(SubplotConfig(index=len(view_state.subplots)))
+    sp_config = view_state.subplots[sp_idx]
+    
+    new_refresh = dash.no_update
+    if "btn-render-raster" in trigger:
+        sp_config.render = "lines" if sp_config.render == "raster" else "raster"
+        sp_config.view_xrange = None
+        sp_config.view_yrange = None
+        new_refresh = (refresh or 0) + 1
+        print(f"[RASTER] Subplot {sp_idx} render={sp_config.render}", flush=True)
+    
+    is_raster = sp_config.render == "raster"
+    return ("primary" if is_raster else "secondary"), not is_raster, new_refresh
+
+
+@app.callback(
+    Output("store-refresh", "data", allow_duplicate=True),
+    Input("main-plot", "relayoutData"),
+    State("store-refresh", "data"),
+    prevent_initial_call=True,
+)
+def update_raster_viewport(relayout_data, refresh):
+    """Re-render raster / X-Y density subplots for the zoom/pan window reported by the browser"""
+    if not relayout_data:
+        return dash.no_update
+    
+    changed = False
+    for sp_idx, sp_config in enumerate(view_state.subplots):
+        if not sp_config.uses_viewport:
+            continue
+        suffix = str(sp_idx + 1) if sp_idx > 0 else ""
+        for axis, attr in (("xaxis", "view_xrange"), ("yaxis", "view_yrange")):
+            new_range = _relayout_axis_range(relayout_data, f"{axis}{suffix}")
+            if new_range is False:
+                continue  # Axis not part of this relayout
+            if new_range != getattr(sp_config, attr):
+                setattr(sp_config, attr, new_range)
+                changed = True
+    
+    if not changed:
+        return dash.no_update
+    return (refresh or 0) + 1
+
+
+def _relayout_axis_range(relayout_data: dict, axis: str):
+    """
+    Extract an axis range from Plotly relayoutData.
+    
+    Returns:
+        [min, max] for a zoom/pan, None for an autorange reset,
+        or False if the axis is not mentioned
+    """
+    if relayout_data.get(f"{axis}.autorange"):
+        return None
+    if f"{axis}.range[0]" in relayout_data and f"{axis}.range[1]" in relayout_data:
+        lo, hi = relayout_data[f"{axis}.range[0]"], relayout_data[f"{axis}.range[1]"]
+    elif f"{axis}.range" in relayout_data:
+        lo, hi = relayout_data[f"{axis}.range"]
+    else:
+        return False
+    try:
+        lo, hi = float(lo), float(hi)
+    except (TypeError, ValueError):
+        return False  # Date axes etc. - leave the current window
+    return [min(lo, hi), max(lo, hi)]
 
 
 # =============================================================================
@@ -2020,7 +2700,13 @@ def handle_region_drag_selection(relayout_data, region_data, refresh):
 )
 def update_region_stats(region_data, refresh):
     """Calculate and display statistics for selected region"""
-    from ops.engine import compute_signal_stats
+    from ops.engine import compute_batch_stats
+    
+    sp_idx = view_state.active_subplot
+    assigned = view_state.subplots[sp_idx].assigned_signals if sp_idx < len(view_state.subplots) else []
+    stats_key = (sp_idx, tuple(assigned), _runs_key(), _derived_key(), _settings_key(assigned))
+    if _skip_refresh("region_stats", (json.dumps(region_data, sort_keys=True),) + stats_key):
+        return dash.no_update
     
     if not region_data or not region_data.get("enabled", False):
         return html.P("Select a region by zooming on the plot", className="text-muted small")
@@ -2037,45 +2723,35 @@ def update_region_stats(region_data, refresh):
     if sp_idx < len(view_state.subplots):
         sp_config = view_state.subplots[sp_idx]
         
+        # Stats of the displayed signals (offsets/scale applied lazily) in one batch
+        views = {k: get_display_view(runs, derived_signals, k, signal_settings) for k in sp_config.assigned_signals}
+        batch_stats = compute_batch_stats(views, [(t_start, t_end)])
+        
         for sig_key in sp_config.assigned_signals:
             run_idx, sig_name = parse_signal_key(sig_key)
+            stats = batch_stats[sig_key][0]
             
-            # Get data
-            time_data, sig_data = None, None
-            if run_idx == DERIVED_RUN_IDX:
-                if sig_name in derived_signals:
-                    ds = derived_signals[sig_name]
-                    time_data, sig_data = ds.time, ds.data
-            elif 0 <= run_idx < len(runs):
-                run = runs[run_idx]
-                if sig_name in run.signals:
-                    time_data = run.time
-                    sig_data = run.signals[sig_name].data
-            
-            if time_data is not None and sig_data is not None:
-                stats = compute_signal_stats(time_data, sig_data, t_start, t_end)
+            if stats:
+                settings = signal_settings.get(sig_key, {})
+                color = settings.get("color", "#58a6ff")
+                label = settings.get("display_name") or sig_name
                 
-                if stats:
-                    settings = signal_settings.get(sig_key, {})
-                    color = settings.get("color", "#58a6ff")
-                    label = settings.get("display_name") or sig_name
-                    
-                    stats_items.append(html.Div([
-                        html.Div([
-                            html.Span("●", style={"color": color, "marginRight": "5px"}),
-                            html.Strong(label[:20], className="small"),
-                        ]),
-                        html.Table([
-                            html.Tbody([
-                                html.Tr([html.Td("Min:", className="text-muted"), html.Td(f"{stats['min']:.4g}")]),
-                                html.Tr([html.Td("Max:", className="text-muted"), html.Td(f"{stats['max']:.4g}")]),
-                                html.Tr([html.Td("Mean:", className="text-muted"), html.Td(f"{stats['mean']:.4g}")]),
-                                html.Tr([html.Td("Std:", className="text-muted"), html.Td(f"{stats['std']:.4g}")]),
-                                html.Tr([html.Td("RMS:", className="text-muted"), html.Td(f"{stats['rms']:.4g}")]),
-                                html.Tr([html.Td("P2P:", className="text-muted"), html.Td(f"{stats['peak_to_peak']:.4g}")]),
-                            ])
-                        ], className="small", style={"fontSize": "10px"}),
-                    ], className="mb-2 pb-2 border-bottom border-secondary"))
+                stats_items.append(html.Div([
+                    html.Div([
+                        html.Span("●", style={"color": color, "marginRight": "5px"}),
+                        html.Strong(label[:20], className="small"),
+                    ]),
+                    html.Table([
+                        html.Tbody([
+                            html.Tr([html.Td("Min:", className="text-muted"), html.Td(f"{stats['min']:.4g}")]),
+                            html.Tr([html.Td("Max:", className="text-muted"), html.Td(f"{stats['max']:.4g}")]),
+                            html.Tr([html.Td("Mean:", className="text-muted"), html.Td(f"{stats['mean']:.4g}")]),
+                            html.Tr([html.Td("Std:", className="text-muted"), html.Td(f"{stats['std']:.4g}")]),
+                            html.Tr([html.Td("RMS:", className="text-muted"), html.Td(f"{stats['rms']:.4g}")]),
+                            html.Tr([html.Td("P2P:", className="text-muted"), html.Td(f"{stats['peak_to_peak']:.4g}")]),
+                        ])
+                    ], className="small", style={"fontSize": "10px"}),
+                ], className="mb-2 pb-2 border-bottom border-secondary"))
     
     if not stats_items:
         return html.P("No signals in active subplot", className="text-muted small")
@@ -2105,9 +2781,12 @@ def toggle_stats_panel(n_clicks, is_open):
 )
 def update_stats_panel(refresh, active_sp):
     """Update statistics panel with signal stats for active subplot"""
-    from ops.engine import compute_signal_stats
+    from ops.engine import compute_batch_stats
     
     sp_idx = int(active_sp or 0)
+    assigned = view_state.subplots[sp_idx].assigned_signals if sp_idx < len(view_state.subplots) else []
+    if _skip_refresh("stats_panel", (sp_idx, tuple(assigned), _runs_key(), _derived_key(), _settings_key(assigned))):
+        return dash.no_update
     if sp_idx >= len(view_state.subplots):
         return html.P("No subplot selected", className="text-muted small")
     
@@ -2118,40 +2797,29 @@ def update_stats_panel(refresh, active_sp):
     
     stats_items = []
     
+    views = {k: get_display_view(runs, derived_signals, k, signal_settings) for k in sp_config.assigned_signals}
+    batch_stats = compute_batch_stats(views)
+    
     for sig_key in sp_config.assigned_signals:
         run_idx, sig_name = parse_signal_key(sig_key)
+        stats = batch_stats[sig_key][0]
         
-        # Get data
-        time_data, sig_data = None, None
-        if run_idx == DERIVED_RUN_IDX:
-            if sig_name in derived_signals:
-                ds = derived_signals[sig_name]
-                time_data, sig_data = ds.time, ds.data
-        elif 0 <= run_idx < len(runs):
-            run = runs[run_idx]
-            if sig_name in run.signals:
-                time_data = run.time
-                sig_data = run.signals[sig_name].data
-        
-        if time_data is not None and sig_data is not None:
-            stats = compute_signal_stats(time_data, sig_data)
+        if stats:
+            settings = signal_settings.get(sig_key, {})
+            color = settings.get("color", "#58a6ff")
+            label = settings.get("display_name") or sig_name
             
-            if stats:
-                settings = signal_settings.get(sig_key, {})
-                color = settings.get("color", "#58a6ff")
-                label = settings.get("display_name") or sig_name
-                
-                stats_items.append(html.Div([
-                    html.Div([
-                        html.Span("●", style={"color": color, "marginRight": "5px"}),
-                        html.Strong(label[:15] + ("..." if len(label) > 15 else ""), className="small", title=label),
-                    ]),
-                    html.Div([
-                        html.Span(f"μ={stats['mean']:.3g} ", className="text-muted", style={"fontSize": "10px"}),
-                        html.Span(f"σ={stats['std']:.3g} ", className="text-muted", style={"fontSize": "10px"}),
-                        html.Span(f"[{stats['min']:.3g}, {stats['max']:.3g}]", className="text-info", style={"fontSize": "10px"}),
-                    ]),
-                ], className="mb-1"))
+            stats_items.append(html.Div([
+                html.Div([
+                    html.Span("●", style={"color": color, "marginRight": "5px"}),
+                    html.Strong(label[:15] + ("..." if len(label) > 15 else ""), className="small", title=label),
+                ]),
+                html.Div([
+                    html.Span(f"μ={stats['mean']:.3g} ", className="text-muted", style={"fontSize": "10px"}),
+                    html.Span(f"σ={stats['std']:.3g} ", className="text-muted", style={"fontSize": "10px"}),
+                    html.Span(f"[{stats['min']:.3g}, {stats['max']:.3g}]", className="text-info", style={"fontSize": "10px"}),
+                ]),
+            ], className="mb-1"))
     
     if not stats_items:
         return html.P("No valid signal data", className="text-muted small")
@@ -2271,7 +2939,7 @@ def stream_refresh(n_intervals, refresh, is_disabled):
 # =============================================================================
 
 @app.callback(
-    Output("main-plot", "figure"),
+    Output("store-figure-payload", "data"),
     Output("inspector-values", "children"),
     Input("store-view-state", "data"),
     Input("store-refresh", "data"),
@@ -2285,9 +2953,14 @@ def stream_refresh(n_intervals, refresh, is_disabled):
     Input("btn-mode-time", "n_clicks"),
     Input("btn-mode-xy", "n_clicks"),
     Input("store-link-axes", "data"),
+    Input("store-cursor-mode", "data"),
+    State("store-tabs", "data"),
+    State("store-active-tab", "data"),
+    State("store-tab-view-states", "data"),
 )
 def update_plot(vs_data, refresh, cursor_time, cursor2_time, theme_clicks, layout_rows, layout_cols, 
-                active_sp, inspector_show_all, mode_time_clicks, mode_xy_clicks, link_axes_state):
+                active_sp, inspector_show_all, mode_time_clicks, mode_xy_clicks, link_axes_state,
+                cursor_mode, tabs, active_tab, tab_view_states):
     global view_state
     
     ctx = callback_context
@@ -2320,6 +2993,7 @@ def update_plot(vs_data, refresh, cursor_time, cursor2_time, theme_clicks, layou
     # Update cursor time
     view_state.cursor_time = cursor_time
     view_state.cursor2_time = cursor2_time
+    view_state.cursor_mode = cursor_mode or "single"
     
     # Log layout changes
     if "select-rows" in trigger or "select-cols" in trigger:
@@ -2330,45 +3004,48 @@ def update_plot(vs_data, refresh, cursor_time, cursor2_time, theme_clicks, layou
     # Create figure with caching
     link_tab_axes = link_axes_state.get("tab", False) if link_axes_state else False
     
-    # Check cache - skip re-rendering if nothing changed
-    current_hash = _compute_figure_hash()
-    if (_figure_cache["hash"] == current_hash and 
-        _figure_cache["figure"] is not None and
-        "cursor-slider" not in trigger and
-        "cursor2-slider" not in trigger):  # Always update for cursor changes
-        fig = _figure_cache["figure"]
-        cursor_values = _figure_cache["cursor_values"]
+    # Check cache - skip re-rendering if nothing changed (or the tab was pre-rendered)
+    cursor_moved = "cursor-slider" in trigger or "cursor2-slider" in trigger
+    current_hash = _compute_figure_hash(view_state, link_tab_axes)
+    show_all = view_state.cursor_show_all if hasattr(view_state, 'cursor_show_all') else True
+    if _skip_refresh("main_plot", (current_hash, show_all, view_state.cursor2_time)):
+        return dash.no_update, dash.no_update  # Browser already shows this exact figure
+    
+    cached = _figure_cache_get(current_hash)
+    if cached is not None:
+        fig, cursor_values = cached
         if DEBUG:
             print("[CACHE] Using cached figure", flush=True)
     else:
-        fig, cursor_values = create_figure(
-            runs,
-            derived_signals,
-            view_state,
-            signal_settings,
-            shared_x=link_tab_axes,
-        )
-        # Update cache
-        _figure_cache["hash"] = current_hash
-        _figure_cache["figure"] = fig
-        _figure_cache["cursor_values"] = cursor_values
+        fig, cursor_values = _render_figure(view_state, link_tab_axes)
+        # Cursor drags produce a new hash per position - keep them out of the LRU
+        if not cursor_moved:
+            _figure_cache_put(current_hash, fig, cursor_values)
         if DEBUG:
             print("[CACHE] Generated new figure", flush=True)
     
+    # Warm the cache for tabs the user is likely to switch to next
+    if active_tab:
+        _tab_recency.pop(active_tab, None)
+        _tab_recency[active_tab] = None
+    if not cursor_moved and tab_view_states:
+        _schedule_prerender(tabs, active_tab, tab_view_states, link_tab_axes)
+    
     # Build inspector with cursor values grouped by subplot
     # Use cursor_show_all from view_state (managed by scope buttons)
-    show_all = view_state.cursor_show_all if hasattr(view_state, 'cursor_show_all') else True
     inspector = build_inspector(
         cursor_values,
         active_subplot=view_state.active_subplot,
         show_all=show_all,
         cursor_time=view_state.cursor_time if view_state.cursor_enabled else None,
+        cursor2_time=view_state.cursor2_time if view_state.cursor_mode == "dual" else None,
     )
     
     return fig, inspector
 
 
-def build_inspector(cursor_values: Dict, active_subplot: int = 0, show_all: bool = True, cursor_time: float = None) -> list:
+def build_inspector(cursor_values: Dict, active_subplot: int = 0, show_all: bool = True, cursor_time: float = None,
+                    cursor2_time: float = None) -> list:
     """
     Build inspector panel content grouped by subplot.
     
@@ -2377,10 +3054,11 @@ def build_inspector(cursor_values: Dict, active_subplot: int = 0, show_all: bool
         - Right: numeric value in monospace font
     
     Args:
-        cursor_values: Dict of signal_key -> {value, label, color, subplot}
+        cursor_values: Dict of signal_key -> {value, value2, label, color, subplot}
         active_subplot: Currently active subplot index
         show_all: If True, show all subplots; if False, show only active
         cursor_time: Current cursor time for display
+        cursor2_time: Cursor 2 time in dual mode (adds T₂ values and deltas)
     """
     if not cursor_values:
         return [html.P("Enable cursor to see values", className="text-muted small")]
@@ -2404,7 +3082,11 @@ def build_inspector(cursor_values: Dict, active_subplot: int = 0, show_all: bool
             html.Strong("T = ", className="small text-muted"),
             html.Span(f"{cursor_time:.6f}", className="small text-info fw-bold", 
                      style={"fontFamily": "monospace"}),
-        ], className="mb-2 pb-1 border-bottom border-secondary"))
+        ] + ([
+            html.Strong(" T₂ = ", className="small text-muted ms-2"),
+            html.Span(f"{cursor2_time:.6f}", className="small fw-bold",
+                     style={"fontFamily": "monospace", "color": "#ffa500"}),
+        ] if cursor2_time is not None else []), className="mb-2 pb-1 border-bottom border-secondary"))
     
     # Render each subplot section
     for sp_idx in sorted(by_subplot.keys()):
@@ -2442,6 +3124,17 @@ def build_inspector(cursor_values: Dict, active_subplot: int = 0, show_all: bool
                                        "textAlign": "right", "minWidth": "70px"}),
                     ], className="d-flex align-items-center justify-content-between mb-1 ms-2")
                 )
+                
+                # Dual cursor: value at T₂ and the change from T₁
+                val2 = info.get("value2")
+                if cursor2_time is not None and val2 is not None:
+                    items.append(
+                        html.Div([
+                            html.Span(f"T₂ {val2:.4g}", style={"color": "#ffa500"}),
+                            html.Span(f"Δ {val2 - val:.4g}", className="text-muted"),
+                        ], className="d-flex justify-content-between small mb-1 ms-4",
+                           style={"fontFamily": "monospace"})
+                    )
         
         items.append(html.Hr(className="my-1 opacity-25"))
     
@@ -2490,13 +3183,15 @@ def save_session_callback(n_clicks, tabs, active_tab, tab_view_states, link_axes
     
     # Serialize derived signals
     derived_data = {}
-    for name, ds in derived_signals.items():
+    for name in list(derived_signals):
+        ds = resolve_derived(runs, derived_signals, name)
         derived_data[name] = {
             "name": ds.name,
             "time": ds.time.tolist(),
             "data": ds.data.tolist(),
             "operation": ds.operation,
             "source_signals": ds.source_signals,
+            "recipe": ds.recipe,
             "display_name": ds.display_name,
             "color": ds.color,
             "line_width": ds.line_width,
@@ -2602,6 +3297,8 @@ def load_session_callback(n_clicks, refresh):
             display_name=ds_data.get("display_name"),
             color=ds_data.get("color"),
             line_width=ds_data.get("line_width", 1.5),
+            recipe=ds_data.get("recipe"),
+            stale=ds_data.get("recipe") is not None,  # Recompute from the reloaded runs on first use
         )
     
     actual_paths = [r.file_path for r in runs]
@@ -2714,35 +3411,10 @@ def refresh_data(n_clicks, refresh, collapsed_runs):
             print(f"[REFRESH] Subplot {sp.index}: {len(sp.assigned_signals) - len(valid_signals)} signals removed", flush=True)
         sp.assigned_signals = valid_signals
     
-    # Re-compute derived signals (check for broken dependencies)
-    broken_derived = []
-    for name, ds in derived_signals.items():
-        inputs_valid = True
-        for src_key in ds.source_signals:
-            run_idx, sig_name = parse_signal_key(src_key)
-            
-            if run_idx == DERIVED_RUN_IDX:
-                if sig_name not in derived_signals:
-                    inputs_valid = False
-                    break
-            elif 0 <= run_idx < len(runs):
-                if sig_name not in runs[run_idx].signals:
-                    inputs_valid = False
-                    break
-            else:
-                inputs_valid = False
-                break
-        
-        if not inputs_valid:
-            broken_derived.append(name)
-            print(f"[REFRESH] Derived signal '{name}' marked broken (missing inputs)", flush=True)
-    
-    # Mark broken derived signals (keep them but note status)
-    for name in broken_derived:
-        ds = derived_signals[name]
-        ds.display_name = f"⚠ {ds.name} (broken)"
+    # Mark derived signals downstream of changed data stale (recomputed lazily)
+    stale_derived, broken_derived = invalidate_derived(runs, derived_signals)
     
-    print(f"[REFRESH] Complete: {len(runs)} runs, {len(derived_signals)} derived, {len(broken_derived)} broken", flush=True)
+    print(f"[REFRESH] Complete: {len(runs)} runs, {len(derived_signals)} derived ({len(stale_derived)} stale), {len(broken_derived)} broken", flush=True)
     
     return (
         (refresh or 0) + 1,
@@ -2983,31 +3655,7 @@ def switch_tab(tab_clicks, tabs, current_tab, tab_view_states, refresh):
     
     # Restore view state from target tab (or use defaults for new tab)
     if new_tab_id in tab_view_states:
-        saved_state = tab_view_states[new_tab_id]
-        view_state.layout_rows = saved_state.get("layout_rows", 1)
-        view_state.layout_cols = saved_state.get("layout_cols", 1)
-        view_state.active_subplot = saved_state.get("active_subplot", 0)
-        view_state.theme = saved_state.get("theme", "dark")
-        view_state.cursor_time = saved_state.get("cursor_time")
-        view_state.cursor_enabled = saved_state.get("cursor_enabled", False)
-        
-        # Restore subplot configs with ALL properties (P1 - preserve all data)
-        # CRITICAL: Use list() to create copies, not references
-        view_state.subplots = []
-        for sp_data in saved_state.get("subplots", []):
-            sp = SubplotConfig(
-                index=sp_data.get("index", len(view_state.subplots)),
-                mode=sp_data.get("mode", "time"),
-                assigned_signals=list(sp_data.get("assigned_signals", [])),  # Copy!
-                x_signal=sp_data.get("x_signal"),
-                y_signals=list(sp_data.get("y_signals", [])),  # Copy!
-                xy_alignment=sp_data.get("xy_alignment", "linear"),
-                title=sp_data.get("title", ""),
-                caption=sp_data.get("caption", ""),
-                description=sp_data.get("description", ""),
-                include_in_report=sp_data.get("include_in_report", True),
-            )
-            view_state.subplots.append(sp)
+        _apply_view_state_dict(view_state, tab_view_states[new_tab_id])
         
         print(f"[TABS] Restored view state for tab: {new_tab_id} with {len(view_state.subplots)} subplots", flush=True)
         for i, sp in enumerate(view_state.subplots):
@@ -3081,19 +3729,7 @@ def close_tab(close_clicks, tabs, active_tab, tab_view_states, refresh):
         
         # Restore view state from new active tab
         if new_active in tab_view_states:
-            saved_state = tab_view_states[new_active]
-            view_state.layout_rows = saved_state.get("layout_rows", 1)
-            view_state.layout_cols = saved_state.get("layout_cols", 1)
-            view_state.active_subplot = saved_state.get("active_subplot", 0)
-            
-            # Restore subplot configs
-            view_state.subplots = []
-            for sp_data in saved_state.get("subplots", []):
-                view_state.subplots.append(SubplotConfig(
-                    index=sp_data.get("index", len(view_state.subplots)),
-                    mode=sp_data.get("mode", "time"),
-                    assigned_signals=sp_data.get("assigned_signals", []),
-                ))
+            _apply_view_state_dict(view_state, tab_view_states[new_active])
         
         print(f"[TABS] Closed tab: {tab_id}, switched to: {new_active}", flush=True)
         
@@ -3257,6 +3893,7 @@ def smart_incremental_refresh(n_clicks, file_offsets, refresh):
                             run.time = np.append(run.time, new_df['Time'].values)
                         
                         run.compute_metadata()
+                        run.bump_version()
                         appended_count += 1
                         print(f"[SMART] Appended {len(new_df)} rows to {run.csv_display_name}", flush=True)
                 
@@ -3281,6 +3918,9 @@ def smart_incremental_refresh(n_clicks, file_offsets, refresh):
         # Update offset tracking
         file_offsets[path] = {"size": current_size, "mtime": current_mtime}
     
+    if appended_count or reloaded_count:
+        invalidate_derived(runs, derived_signals)
+    
     # Build status message
     status_parts = []
     if appended_count:
@@ -3332,6 +3972,8 @@ def toggle_compare_panel(n_clicks, is_open):
 )
 def update_compare_run_options(refresh, is_open):
     """Populate run dropdowns for compare (P3 - multi-CSV)"""
+    if _skip_refresh("compare_runs", (is_open, tuple(run.csv_display_name for run in runs))):
+        return dash.no_update, dash.no_update
     if not is_open or not runs:
         return [], []
     
@@ -3459,7 +4101,7 @@ def run_comparison(n_clicks, selected_runs, baseline_method, baseline_run_idx, s
             baseline_time = signal_data[0][0]
             aligned_data = []
             for t, d, name, idx in signal_data:
-                aligned = np.interp(baseline_time, t, d)
+                aligned = resample(t, d, baseline_time, version=runs[idx].version)
                 aligned_data.append(aligned)
             baseline_data = np.mean(aligned_data, axis=0)
             baseline_name = "Mean"
@@ -3472,14 +4114,14 @@ def run_comparison(n_clicks, selected_runs, baseline_method, baseline_run_idx, s
             # Align to baseline time
             if alignment == "baseline":
                 time_common = baseline_time
-                data_aligned = np.interp(baseline_time, t, d)
+                data_aligned = resample(t, d, baseline_time, version=runs[run_idx].version)
             elif alignment == "intersection":
                 t_start = max(baseline_time[0], t[0])
                 t_end = min(baseline_time[-1], t[-1])
                 mask = (baseline_time >= t_start) & (baseline_time <= t_end)
                 time_common = baseline_time[mask]
-                data_aligned = np.interp(time_common, t, d)
-                baseline_aligned = baseline_data[mask] if baseline_method != "specific" else np.interp(time_common, baseline_time, baseline_data)
+                data_aligned = resample(t, d, baseline_time, version=runs[run_idx].version)[mask]
+                baseline_aligned = baseline_data[mask]
             else:  # union
                 time_common = np.sort(np.unique(np.concatenate([baseline_time, t])))
                 data_aligned = np.interp(time_common, t, d)
@@ -3487,6 +4129,8 @@ def run_comparison(n_clicks, selected_runs, baseline_method, baseline_run_idx, s
             # Use baseline_data aligned to time_common
             if alignment == "intersection":
                 bl_aligned = baseline_aligned
+            elif alignment == "baseline":
+                bl_aligned = baseline_data
             else:
                 bl_aligned = np.interp(time_common, baseline_time, baseline_data)
             
@@ -3577,8 +4221,6 @@ def generate_all_deltas(n_clicks, selected_runs, baseline_method, baseline_run_i
     """
     Generate delta signals for ALL common signals (P3 - Advanced Compare).
     """
-    import numpy as np
-    
     if not selected_runs or len(selected_runs) < 2:
         return html.Span("⚠️ Select 2+ runs first", className="text-warning"), dash.no_update, dash.no_update
     
@@ -3624,8 +4266,6 @@ def generate_all_deltas(n_clicks, selected_runs, baseline_method, baseline_run_i
                 # Use mean as baseline
                 baseline_entry = signal_data[0]  # Use first for time base
             
-            baseline_time = baseline_entry[0]
-            baseline_data = baseline_entry[1]
             baseline_run = baseline_entry[3]
             baseline_name = baseline_entry[2]
             
@@ -3635,19 +4275,20 @@ def generate_all_deltas(n_clicks, selected_runs, baseline_method, baseline_run_i
                 if run_idx == baseline_run:
                     continue
                 
-                time_common = baseline_time
-                data_aligned = np.interp(baseline_time, t, d)
-                diff = data_aligned - baseline_data
-                
                 # Improved naming: show it's delta vs baseline
                 delta_name = f"Δ({signal_name})_{name}_vs_{baseline_name}"
-                derived_signals[delta_name] = DerivedSignal(
-                    name=delta_name,
-                    time=time_common,
-                    data=diff,
-                    operation="compare_delta",
-                    source_signals=[f"{run_idx}:{signal_name}", f"{baseline_run}:{signal_name}"],
+                
+                # Run minus baseline on the baseline's time base (recomputed if either run changes)
+                recipe = make_recipe(
+                    "binary", "subtract",
+                    [f"{run_idx}:{signal_name}", f"{baseline_run}:{signal_name}"],
+                    base=1,
                 )
+                ds = create_derived(runs, derived_signals, delta_name, recipe)
+                if ds is None:
+                    continue
+                ds.operation = "compare_delta"
+                derived_signals[delta_name] = ds
                 created_count += 1
         
         print(f"[COMPARE] Generated {created_count} delta signals for {len(common_signals)} signals", flush=True)
@@ -3746,7 +4387,7 @@ def compare_all_signals_modal(compare_clicks, close_clicks, sort_order, selected
             baseline_time = signal_data[0][0]
             aligned_data = []
             for t, d, name, idx in signal_data:
-                aligned = np.interp(baseline_time, t, d)
+                aligned = resample(t, d, baseline_time, version=runs[idx].version)
                 aligned_data.append(aligned)
             baseline_data = np.mean(aligned_data, axis=0)
             
@@ -4144,6 +4785,9 @@ def toggle_stream_panel(n_clicks, is_open):
 )
 def update_op_signals_options(refresh, is_open):
     """Populate signal dropdown for operations"""
+    names_key = tuple((run.file_path, tuple(run.signals)) for run in runs) + tuple(derived_signals)
+    if _skip_refresh("op_signals", (is_open, names_key)):
+        return dash.no_update
     if not is_open:
         return []
     
@@ -4178,6 +4822,8 @@ def update_operation_options(op_type):
             {"label": "Smooth (moving avg)", "value": "smooth"},
             {"label": "Low-pass filter", "value": "lowpass"},
             {"label": "High-pass filter", "value": "highpass"},
+            {"label": "Butterworth low-pass (zero-phase)", "value": "butter_lowpass"},
+            {"label": "Butterworth high-pass (zero-phase)", "value": "butter_highpass"},
         ]
     elif op_type == "binary":
         return [
@@ -4187,6 +4833,8 @@ def update_operation_options(op_type):
             {"label": "A ÷ B (ratio)", "value": "divide"},
             {"label": "|A − B| (abs diff)", "value": "abs_diff"},
         ]
+    elif op_type == "expr":
+        return []  # Formula input is used instead
     else:  # multi
         return [
             {"label": "Norm (√Σx²)", "value": "norm"},
@@ -4196,6 +4844,20 @@ def update_operation_options(op_type):
         ]
 
 
+@app.callback(
+    Output("op-operation-group", "style"),
+    Output("op-expression-group", "style"),
+    Output("op-all-runs-group", "style"),
+    Input("select-op-type", "value"),
+)
+def toggle_op_inputs(op_type):
+    """Show the formula input for formulas, and the all-runs option for unary ops"""
+    all_runs = {"display": "block" if op_type == "unary" else "none"}
+    if op_type == "expr":
+        return {"display": "none"}, {"display": "block"}, all_runs
+    return {"display": "block"}, {"display": "none"}, all_runs
+
+
 @app.callback(
     Output("op-status", "children"),
     Output("signal-tree", "children", allow_duplicate=True),
@@ -4206,19 +4868,30 @@ def update_operation_options(op_type):
     State("select-operation", "value"),
     State("select-op-alignment", "value"),
     State("input-op-output-name", "value"),
+    State("input-op-expression", "value"),
+    State("check-op-all-runs", "value"),
     State("store-refresh", "data"),
     prevent_initial_call=True,
 )
-def apply_operation(n_clicks, op_type, signal_keys, operation, alignment, output_name, refresh):
+def apply_operation(n_clicks, op_type, signal_keys, operation, alignment, output_name, expression, all_runs, refresh):
     """
     Apply operation and create derived signal(s).
     
     For unary operations: supports 1 or more signals, creating one derived signal per input.
+    With "all runs", each selected signal name is processed in every run containing it.
     For binary operations: requires exactly 2 signals.
     For multi operations: requires 2+ signals.
+    For formulas: A, B, ... are the selected signals; {run:signal} adds any other.
     """
     global derived_signals
     
+    signal_keys = list(signal_keys or [])
+    if op_type == "expr":
+        if not (expression or "").strip():
+            return html.Span("⚠️ Enter a formula", className="text-warning"), dash.no_update, dash.no_update
+        from ops.expr import expression_refs
+        signal_keys += [k for k in expression_refs(expression) if k not in signal_keys]
+    
     if not signal_keys:
         return html.Span("⚠️ Select signal(s)", className="text-warning"), dash.no_update, dash.no_update
     
@@ -4231,85 +4904,87 @@ def apply_operation(n_clicks, op_type, signal_keys, operation, alignment, output
         return html.Span("⚠️ Select 2+ signals", className="text-warning"), dash.no_update, dash.no_update
     
     try:
-        # Get signal data
-        signals_data = []
+        # Keep only keys that still resolve to data
+        valid_keys = []
         for sig_key in signal_keys:
             run_idx, sig_name = parse_signal_key(sig_key)
             if run_idx == DERIVED_RUN_IDX:
                 if sig_name in derived_signals:
-                    ds = derived_signals[sig_name]
-                    signals_data.append((ds.time, ds.data, sig_name, sig_key))
-            elif 0 <= run_idx < len(runs):
-                time_data, sig_data = runs[run_idx].get_signal_data(sig_name)
-                signals_data.append((time_data, sig_data, sig_name, sig_key))
+                    valid_keys.append(sig_key)
+            elif 0 <= run_idx < len(runs) and sig_name in runs[run_idx].signals:
+                valid_keys.append(sig_key)
         
-        if not signals_data:
+        if not valid_keys:
             return html.Span("⚠️ No valid signal data", className="text-warning"), dash.no_update, dash.no_update
         
-        # Apply operation
-        import numpy as np
+        names = [parse_signal_key(k)[1] for k in valid_keys]
+        
+        if op_type == "expr":
+            if len(valid_keys) < len(signal_keys):
+                missing = [k for k in signal_keys if k not in valid_keys]
+                return html.Span(f"⚠️ Unknown signal: {missing[0]}", className="text-warning"), dash.no_update, dash.no_update
+            from ops.expr import compile_expression
+            try:
+                compile_expression(expression, tuple(valid_keys))
+            except ValueError as e:
+                return html.Span(f"⚠️ {e}", className="text-warning"), dash.no_update, dash.no_update
         
+        # Each derived signal keeps its recipe, so it recomputes when sources change
         if op_type == "unary":
             # Support multiple signals - create one derived signal per input
+            unary_labels = {
+                "derivative": "d({})/dt",
+                "integral": "int({})",  # ASCII-safe
+                "abs": "abs({})",
+                "normalize": "norm({})",
+                "rms": "rms({})",
+                "smooth": "smooth({})",
+                "lowpass": "lpf({})",
+                "highpass": "hpf({})",
+                "butter_lowpass": "blpf({})",
+                "butter_highpass": "bhpf({})",
+            }
             created_names = []
             
-            for time, data, name, sig_key in signals_data:
-                if operation == "derivative":
-                    result = np.gradient(data, time)
-                    op_label = f"d({name})/dt"
-                elif operation == "integral":
-                    result = np.cumsum(data) * np.mean(np.diff(time)) if len(time) > 1 else data
-                    op_label = f"int({name})"  # ASCII-safe
-                elif operation == "abs":
-                    result = np.abs(data)
-                    op_label = f"abs({name})"
-                elif operation == "normalize":
-                    min_v, max_v = np.min(data), np.max(data)
-                    result = (data - min_v) / (max_v - min_v) if max_v > min_v else data * 0
-                    op_label = f"norm({name})"
-                elif operation == "rms":
-                    window = min(100, len(data) // 10) or 10
-                    result = np.sqrt(np.convolve(data**2, np.ones(window)/window, mode='same'))
-                    op_label = f"rms({name})"
-                elif operation == "smooth":
-                    window = min(50, len(data) // 20) or 5
-                    result = np.convolve(data, np.ones(window)/window, mode='same')
-                    op_label = f"smooth({name})"
-                elif operation == "lowpass":
-                    from ops.engine import apply_filter
-                    # Use ~5% of Nyquist as default cutoff
-                    dt = np.mean(np.diff(time)) if len(time) > 1 else 1.0
-                    fs = 1.0 / dt
-                    cutoff = fs * 0.05  # 5% of sampling rate
-                    result = apply_filter(time, data, "lowpass", cutoff)
-                    op_label = f"lpf({name})"
-                elif operation == "highpass":
-                    from ops.engine import apply_filter
-                    dt = np.mean(np.diff(time)) if len(time) > 1 else 1.0
-                    fs = 1.0 / dt
-                    cutoff = fs * 0.01  # 1% of sampling rate
-                    result = apply_filter(time, data, "highpass", cutoff)
-                    op_label = f"hpf({name})"
-                else:
-                    result = data
-                    op_label = name
+            if all_runs:
+                # Batched across runs sharing a time base, registered in bulk
+                for name in dict.fromkeys(names):
+                    op_label = unary_labels.get(operation, "{}").format(name)
+                    created = create_derived_across_runs(
+                        runs, derived_signals, name, operation,
+                        lambda run_idx: f"{op_label}_{runs[run_idx].csv_display_name}",
+                    )
+                    derived_signals.update(created)
+                    created_names.extend(created)
+                
+                if not created_names:
+                    return html.Span("⚠️ No valid signal data", className="text-warning"), dash.no_update, dash.no_update
+                print(f"[OPS] Created {len(created_names)} derived signals across runs", flush=True)
+                return (
+                    html.Span(f"✅ Created {len(created_names)} signals across runs", className="text-success"),
+                    build_signal_tree(runs, ""),
+                    (refresh or 0) + 1,
+                )
+            
+            for sig_key, name in zip(valid_keys, names):
+                op_label = unary_labels.get(operation, "{}").format(name)
                 
                 # Use custom output name only for single signal, otherwise auto-generate
-                if output_name and len(signals_data) == 1:
+                if output_name and len(valid_keys) == 1:
                     final_name = output_name
                 else:
                     final_name = op_label
                 
-                derived_signals[final_name] = DerivedSignal(
-                    name=final_name,
-                    time=time.copy(),
-                    data=result,
-                    operation=operation,
-                    source_signals=[sig_key],
-                )
+                ds = create_derived(runs, derived_signals, final_name, make_recipe("unary", operation, [sig_key]))
+                if ds is None:
+                    continue
+                derived_signals[final_name] = ds
                 created_names.append(final_name)
                 print(f"[OPS] Created derived signal: {final_name}", flush=True)
             
+            if not created_names:
+                return html.Span("⚠️ No valid signal data", className="text-warning"), dash.no_update, dash.no_update
+            
             # Return success message
             if len(created_names) == 1:
                 return (
@@ -4325,115 +5000,43 @@ def apply_operation(n_clicks, op_type, signal_keys, operation, alignment, output
                 )
             
         elif op_type == "binary":
-            t1, d1, n1, _ = signals_data[0]
-            t2, d2, n2, _ = signals_data[1]
-            
-            # Align time bases
-            if len(t1) >= len(t2):
-                result_time = t1
-                if alignment == "nearest":
-                    indices = np.searchsorted(t2, t1)
-                    indices = np.clip(indices, 0, len(d2) - 1)
-                    d2_aligned = d2[indices]
-                else:
-                    d2_aligned = np.interp(t1, t2, d2)
-                d1_aligned = d1
-            else:
-                result_time = t2
-                if alignment == "nearest":
-                    indices = np.searchsorted(t1, t2)
-                    indices = np.clip(indices, 0, len(d1) - 1)
-                    d1_aligned = d1[indices]
-                else:
-                    d1_aligned = np.interp(t2, t1, d1)
-                d2_aligned = d2
+            if len(valid_keys) != 2:
+                return html.Span("⚠️ Select exactly 2 signals", className="text-warning"), dash.no_update, dash.no_update
+            n1, n2 = names
             
             # Use ASCII operators to avoid issues with Dash pattern matching callbacks
-            if operation == "add":
-                result = d1_aligned + d2_aligned
-                op_label = f"{n1} + {n2}"
-            elif operation == "subtract":
-                result = d1_aligned - d2_aligned
-                op_label = f"{n1} - {n2}"  # ASCII minus
-            elif operation == "multiply":
-                result = d1_aligned * d2_aligned
-                op_label = f"{n1} * {n2}"  # ASCII asterisk
-            elif operation == "divide":
-                result = d1_aligned / np.where(d2_aligned != 0, d2_aligned, 1)
-                op_label = f"{n1} / {n2}"  # ASCII slash
-            elif operation == "abs_diff":
-                result = np.abs(d1_aligned - d2_aligned)
-                op_label = f"|{n1} - {n2}|"  # ASCII minus
-            else:
-                result = d1_aligned
-                op_label = n1
-            
-            # Create derived signal for binary operation
-            final_name = output_name if output_name else op_label
-            
-            derived_signals[final_name] = DerivedSignal(
-                name=final_name,
-                time=result_time,
-                data=result,
-                operation=operation,
-                source_signals=signal_keys,
-            )
-            
-            print(f"[OPS] Created derived signal: {final_name}", flush=True)
-            
-            return (
-                html.Span(f"✅ Created: {final_name}", className="text-success"),
-                build_signal_tree(runs, ""),
-                (refresh or 0) + 1,
-            )
+            binary_labels = {
+                "add": f"{n1} + {n2}",
+                "subtract": f"{n1} - {n2}",
+                "multiply": f"{n1} * {n2}",
+                "divide": f"{n1} / {n2}",
+                "abs_diff": f"|{n1} - {n2}|",
+            }
+            op_label = binary_labels.get(operation, n1)
+            recipe = make_recipe("binary", operation, valid_keys, alignment)
                 
+        elif op_type == "expr":
+            # One pass over all inputs - no intermediate derived signals
+            op_label = expression.strip()
+            recipe = make_recipe("expr", op_label, valid_keys, alignment)
+        
         else:  # multi
-            # Use first signal's time base
-            result_time = signals_data[0][0]
-            aligned_data = []
-            signal_names = []
-            
-            for t, d, n, _ in signals_data:
-                signal_names.append(n)
-                if len(t) == len(result_time) and np.allclose(t, result_time):
-                    aligned_data.append(d)
-                else:
-                    aligned_data.append(np.interp(result_time, t, d))
-            
-            stacked = np.vstack(aligned_data)
-            
             # Build descriptive name from signal names
-            if len(signal_names) <= 3:
-                names_str = ", ".join(signal_names)
+            if len(names) <= 3:
+                names_str = ", ".join(names)
             else:
-                names_str = f"{signal_names[0]}, ..., {signal_names[-1]}"
+                names_str = f"{names[0]}, ..., {names[-1]}"
             
-            if operation == "norm":
-                result = np.sqrt(np.sum(stacked**2, axis=0))
-                op_label = f"norm({names_str})"
-            elif operation == "mean":
-                result = np.mean(stacked, axis=0)
-                op_label = f"mean({names_str})"
-            elif operation == "max":
-                result = np.max(stacked, axis=0)
-                op_label = f"max({names_str})"
-            elif operation == "min":
-                result = np.min(stacked, axis=0)
-                op_label = f"min({names_str})"
-            else:
-                result = stacked[0]
-                op_label = f"multi({names_str})"
+            op_label = f"{operation}({names_str})" if operation in ("norm", "mean", "max", "min") else f"multi({names_str})"
+            recipe = make_recipe("multi", operation, valid_keys, alignment)
         
         # Create derived signal
         final_name = output_name if output_name else op_label
         
-        derived_signals[final_name] = DerivedSignal(
-            name=final_name,
-            time=result_time,
-            data=result,
-            operation=operation,
-            source_signals=signal_keys,
-        )
+        ds = create_derived(runs, derived_signals, final_name, recipe)
+        if ds is None:
+            return html.Span("⚠️ No valid signal data", className="text-warning"), dash.no_update, dash.no_update
+        derived_signals[final_name] = ds
         
         print(f"[OPS] Created derived signal: {final_name}", flush=True)
         
@@ -4653,9 +5256,25 @@ def export_report(n_clicks, title, intro, conclusion, rtl, scope, format_type, i
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     if format_type == "csv":
-        # Export data as CSV
-        content = _build_csv_export()
-        return dict(content=content, filename=f"signal_data_{timestamp}.csv")
+        # Export data as CSV: written to a temp file, then downloaded from
+        # CSV_EXPORT_ROUTE (streamed, not sent through the callback response)
+        import os
+        import tempfile
+        import uuid
+        
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+            tmp_path = tmp.name
+        try:
+            nbytes = _build_csv_export(tmp_path)
+        except Exception as e:
+            print(f"[EXPORT] CSV export failed: {e}", flush=True)
+            os.unlink(tmp_path)
+            return dash.no_update
+        print(f"[EXPORT] CSV: {nbytes / 1e6:.1f} MB", flush=True)
+        token = uuid.uuid4().hex
+        _register_csv_export(token, tmp_path, f"signal_data_{timestamp}.csv")
+        dash.set_props("export-location", {"href": CSV_EXPORT_ROUTE.format(token=token)})
+        return dash.no_update
     
     elif format_type == "docx":
         # Export DOCX - Feature 4: Support all tabs, per-tab layout, preserve axis limits
@@ -4848,63 +5467,103 @@ def export_report(n_clicks, title, intro, conclusion, rtl, scope, format_type, i
         return dict(content=html_content, filename=f"report_{timestamp}.html")
 
 
-def _build_csv_export() -> str:
-    """Build CSV export with all visible signals"""
-    import io
-    lines = []
+# Exported CSV files waiting to be downloaded: token -> (path, filename).
+# Each is deleted once downloaded, or when evicted by newer exports.
+CSV_EXPORT_ROUTE = "/export/csv/{token}"
+CSV_EXPORT_PENDING = 4
+CSV_EXPORT_BLOCK_BYTES = 1 << 20  # Read/send size when streaming a download
+_csv_exports: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+_csv_exports_lock = threading.Lock()
+
+
+def _register_csv_export(token: str, path: str, filename: str):
+    """Make an exported file downloadable once under token (evicting the oldest)"""
+    with _csv_exports_lock:
+        _csv_exports[token] = (path, filename)
+        evicted = []
+        while len(_csv_exports) > CSV_EXPORT_PENDING:
+            evicted.append(_csv_exports.popitem(last=False)[1][0])
+    for old_path in evicted:
+        _remove_export_file(old_path)
+
+
+def _remove_export_file(path: str):
+    """Delete an exported temp file (ignores files already gone)"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@app.server.route(CSV_EXPORT_ROUTE.replace("{token}", "<token>"))
+def download_csv_export(token: str):
+    """Stream an exported CSV file in blocks, deleting it once sent (or aborted)"""
+    import flask
     
-    # Header
+    with _csv_exports_lock:
+        entry = _csv_exports.pop(token, None)
+    if entry is None or not os.path.exists(entry[0]):
+        flask.abort(404)
+    path, filename = entry
+    
+    def blocks():
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    block = f.read(CSV_EXPORT_BLOCK_BYTES)
+                    if not block:
+                        break
+                    yield block
+        finally:
+            _remove_export_file(path)
+    
+    return flask.Response(blocks(), mimetype="text/csv", headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Content-Length": str(os.path.getsize(path)),
+    })
+
+
+def _build_csv_export(path: str) -> int:
+    """
+    Write all visible signals as CSV on the densest run's time base.
+
+    Rows are written in chunks (see report.csv_export), so large exports
+    never build the whole text in memory.
+
+    Args:
+        path: Output file path
+
+    Returns:
+        Number of bytes written
+    """
+    import numpy as np
+    from report.csv_export import write_csv
+    
+    # Header and source (time, data) per column
     header = ["Time"]
+    columns = []
     for sp in view_state.subplots:
         if not sp.include_in_report:
             continue
         for sig_key in sp.assigned_signals:
             run_idx, sig_name = parse_signal_key(sig_key)
-            label = get_signal_label(run_idx, sig_name, [r.file_path for r in runs])
-            header.append(label)
-    
-    lines.append(",".join(header))
-    
-    # Find common time base
-    all_times = []
-    for run in runs:
-        if len(run.time) > 0:
-            all_times.append(run.time)
-    
-    if not all_times:
-        return "\n".join(lines)
+            header.append(get_signal_label(run_idx, sig_name, [r.file_path for r in runs]))
+            
+            if run_idx == DERIVED_RUN_IDX:
+                ds = resolve_derived(runs, derived_signals, sig_name)
+                columns.append((ds.time, ds.data) if ds is not None and len(ds.time) > 0 else None)
+            elif 0 <= run_idx < len(runs):
+                time_data, sig_data = runs[run_idx].get_signal_data(sig_name)
+                columns.append((time_data, sig_data) if len(time_data) > 0 else None)
+            else:
+                columns.append(None)
     
     # Use densest time base
-    common_time = max(all_times, key=len)
+    all_times = [run.time for run in runs if len(run.time) > 0]
+    common_time = max(all_times, key=len) if all_times else np.array([])
     
-    # Build data rows
-    import numpy as np
-    for t_idx, t in enumerate(common_time):
-        row = [f"{t:.6f}"]
-        
-        for sp in view_state.subplots:
-            if not sp.include_in_report:
-                continue
-            for sig_key in sp.assigned_signals:
-                run_idx, sig_name = parse_signal_key(sig_key)
-                
-                if run_idx == DERIVED_RUN_IDX:
-                    if sig_name in derived_signals:
-                        ds = derived_signals[sig_name]
-                        val = np.interp(t, ds.time, ds.data)
-                    else:
-                        val = ""
-                elif 0 <= run_idx < len(runs):
-                    time_data, sig_data = runs[run_idx].get_signal_data(sig_name)
-                    val = np.interp(t, time_data, sig_data) if len(time_data) > 0 else ""
-                else:
-                    val = ""
-                
-                row.append(f"{val:.6g}" if isinstance(val, (int, float)) else str(val))
-        
-        lines.append(",".join(row))
-    
-    return "\n".join(lines)
+    with open(path, "wb") as f:
+        return write_csv(f, common_time, columns, header)
 
 
 def _build_html_report(title: str, intro: str, conclusion: str, rtl: bool, 
@@ -5202,8 +5861,9 @@ def check_state_signal_transitions(sig_type, sig_key):
         run_idx, sig_name = parse_signal_key(sig_key)
         
         if run_idx == DERIVED_RUN_IDX:
-            if sig_name in derived_signals:
-                data = derived_signals[sig_name].data
+            ds = resolve_derived(runs, derived_signals, sig_name)
+            if ds is not None:
+                data = ds.data
             else:
                 return ""
         elif 0 <= run_idx < len(runs):
@@ -5378,12 +6038,9 @@ def remove_single_derived(remove_clicks, refresh, collapsed_runs):
     if derived_name not in derived_signals:
         return dash.no_update, dash.no_update
     
-    # Check for dependent derived signals
-    dependents = []
+    # Check for dependent derived signals (direct and transitive)
     sig_key_to_remove = make_signal_key(DERIVED_RUN_IDX, derived_name)
-    for name, ds in derived_signals.items():
-        if name != derived_name and sig_key_to_remove in ds.source_signals:
-            dependents.append(name)
+    dependents = dependents_of(derived_signals, derived_name)
     
     # Remove dependents too (cascading delete)
     for dep_name in dependents:
@@ -5407,6 +6064,43 @@ def remove_single_derived(remove_clicks, refresh, collapsed_runs):
     return build_signal_tree(runs, "", collapsed_runs or {}), (refresh or 0) + 1
 
 
+# Resolve the figure payload in the browser: shared x arrays (one per time base,
+# see figure_to_payload) are decoded once and the same typed array is handed to
+# every trace that references it.
+app.clientside_callback(
+    """
+    function(payload) {
+        if (!payload || !payload.data) return window.dash_clientside.no_update;
+        var shared = payload.shared_x;
+        if (!shared || !shared.length) return payload;
+        
+        var ctors = {
+            f8: Float64Array, f4: Float32Array,
+            i4: Int32Array, u4: Uint32Array,
+            i2: Int16Array, u2: Uint16Array,
+            i1: Int8Array, u1: Uint8Array
+        };
+        var arrays = shared.map(function(spec) {
+            var bin = atob(spec.bdata);
+            var bytes = new Uint8Array(bin.length);
+            for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+            return new ctors[spec.dtype](bytes.buffer);
+        });
+        
+        var data = payload.data.map(function(trace) {
+            if (!trace.x || trace.x.shared === undefined) return trace;
+            var resolved = Object.assign({}, trace);
+            resolved.x = arrays[trace.x.shared];
+            return resolved;
+        });
+        return {data: data, layout: payload.layout};
+    }
+    """,
+    Output("main-plot", "figure"),
+    Input("store-figure-payload", "data"),
+)
+
+
 # =============================================================================
 # CALLBACKS: Keyboard Shortcuts (Clientside)
 # =============================================================================
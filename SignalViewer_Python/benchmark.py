@@ -0,0 +1,413 @@
+"""
+Signal Viewer Pro - Figure Rendering Benchmark
+===============================================
+Repeatable timing of figure building on synthetic workloads, so rendering
+regressions are caught before they ship.
+
+For each workload the harness measures:
+- Cold build: create_figure with all trace/spectrogram caches cleared
+- Warm build: create_figure again with the subplot cache populated
+- Serialise: figure_to_payload + JSON encoding (what Dash sends)
+- Payload size in bytes and peak Python memory (tracemalloc)
+
+Usage:
+    python benchmark.py                          # Run all, compare to baseline
+    python benchmark.py --save-baseline          # Store results as the baseline
+    python benchmark.py --only xy_pairs fft      # Selected workloads
+    python benchmark.py --scale 0.25 --repeat 1  # Quick smoke run
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+from core.models import Run, Signal, DerivedSignal, ViewState, SubplotConfig, make_signal_key
+from ops.engine import clear_spectrogram_cache
+from viz import figure_factory
+from viz.figure_factory import create_figure, figure_to_payload
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.25  # Allowed relative slowdown/growth before flagging a regression
+
+# Metrics compared against the baseline (higher is worse for all of them)
+COMPARED_METRICS = ("build_ms", "warm_ms", "serialize_ms", "payload_bytes", "peak_mb")
+
+Workload = Tuple[List[Run], Dict[str, DerivedSignal], ViewState, Dict[str, Dict]]
+
+
+@dataclass
+class BenchResult:
+    """Measurements for one workload"""
+    workload: str
+    samples: int         # Total samples across assigned signals
+    traces: int          # Traces in the built figure
+    build_ms: float      # Median cold create_figure time
+    warm_ms: float       # Median create_figure time with the subplot cache warm
+    serialize_ms: float  # Median figure_to_payload + JSON encode time
+    payload_bytes: int   # Size of the JSON payload sent to the browser
+    peak_mb: float       # Peak traced Python memory for one cold build + serialise
+
+
+# =============================================================================
+# SYNTHETIC DATA
+# =============================================================================
+
+def _make_run(
+    name: str,
+    n: int,
+    duration: float,
+    n_signals: int,
+    rng: np.random.Generator,
+    state_every: int = 0,
+) -> Run:
+    """
+    Build a synthetic run of sines plus noise on a uniform time base.
+
+    Args:
+        name: Run name (used for the display name)
+        n: Samples per signal
+        duration: Time span in seconds
+        n_signals: Number of signals
+        rng: Random generator (seeded by the caller for repeatability)
+        state_every: If > 0, signals are integer states that change every
+                     ~state_every samples instead of sines
+    """
+    time_arr = np.linspace(0.0, duration, n)
+    run = Run(file_path=f"<synthetic>/{name}.csv", csv_display_name=f"{name}.csv", time=time_arr)
+    for i in range(n_signals):
+        if state_every > 0:
+            steps = rng.integers(0, 8, size=n // state_every + 1).astype(float)
+            data = np.repeat(steps, state_every)[:n]
+        else:
+            freq = 0.5 + i * 0.37
+            data = np.sin(2 * np.pi * freq * time_arr) + 0.05 * rng.standard_normal(n)
+        run.signals[f"sig{i}"] = Signal(name=f"sig{i}", data=data)
+    run.sample_count = n
+    run.start_time, run.end_time = float(time_arr[0]), float(time_arr[-1])
+    return run
+
+
+def _grid(rows: int, cols: int, subplots: List[SubplotConfig]) -> ViewState:
+    """View state with the given grid and subplot configs"""
+    vs = ViewState(layout_rows=rows, layout_cols=cols)
+    vs.subplots = subplots
+    return vs
+
+
+def _keys(run_idx: int, run: Run, names: Optional[List[str]] = None) -> List[str]:
+    """Signal keys for (a subset of) a run's signals"""
+    return [make_signal_key(run_idx, s) for s in (names or list(run.signals))]
+
+
+def workload_many_signals(scale: float, rng: np.random.Generator) -> Workload:
+    """128 moderate signals from one run spread over a 2x2 grid"""
+    run = _make_run("many", max(int(20_000 * scale), 64), 60.0, 128, rng)
+    keys = _keys(0, run)
+    subplots = [SubplotConfig(index=i, assigned_signals=keys[i::4]) for i in range(4)]
+    return [run], {}, _grid(2, 2, subplots), {}
+
+
+def workload_long_signals(scale: float, rng: np.random.Generator) -> Workload:
+    """A few very long signals in one subplot"""
+    run = _make_run("long", max(int(4_000_000 * scale), 64), 3600.0, 4, rng)
+    return [run], {}, _grid(1, 1, [SubplotConfig(index=0, assigned_signals=_keys(0, run))]), {}
+
+
+def workload_dense_states(scale: float, rng: np.random.Generator) -> Workload:
+    """State signals with frequent transitions (each one is a layout shape + label)"""
+    run = _make_run("states", max(int(100_000 * scale), 64), 600.0, 4, rng, state_every=100)
+    keys = _keys(0, run)
+    settings = {k: {"is_state": True} for k in keys}
+    subplots = [SubplotConfig(index=i, assigned_signals=keys[i::2]) for i in range(2)]
+    return [run], {}, _grid(2, 1, subplots), settings
+
+
+def workload_multi_rate(scale: float, rng: np.random.Generator) -> Workload:
+    """Runs sampled at 100 Hz, 1 kHz and 10 kHz overlaid in the same subplots"""
+    duration = 60.0
+    runs = [
+        _make_run(f"rate{rate}", max(int(rate * duration * scale), 64), duration, 4, rng)
+        for rate in (100, 1_000, 10_000)
+    ]
+    top = [k for i, r in enumerate(runs) for k in _keys(i, r, ["sig0", "sig1"])]
+    bottom = [k for i, r in enumerate(runs) for k in _keys(i, r, ["sig2", "sig3"])]
+    subplots = [SubplotConfig(index=0, assigned_signals=top), SubplotConfig(index=1, assigned_signals=bottom)]
+    return runs, {}, _grid(2, 1, subplots), {}
+
+
+def workload_large_grid(scale: float, rng: np.random.Generator) -> Workload:
+    """4x4 grid, four signals per subplot from two runs"""
+    runs = [_make_run(f"grid{i}", max(int(100_000 * scale), 64), 120.0, 32, rng) for i in range(2)]
+    subplots = [
+        SubplotConfig(index=i, assigned_signals=_keys(i % 2, runs[i % 2], [f"sig{(i + j) % 32}" for j in range(4)]))
+        for i in range(16)
+    ]
+    return runs, {}, _grid(4, 4, subplots), {}
+
+
+def workload_xy_pairs(scale: float, rng: np.random.Generator) -> Workload:
+    """X-Y subplots whose Y signals come from a run on a different time base"""
+    n = max(int(500_000 * scale), 64)
+    runs = [_make_run("xy_a", n, 100.0, 4, rng), _make_run("xy_b", n // 2 + 1, 100.0, 4, rng)]
+    subplots = [
+        SubplotConfig(
+            index=i, mode="xy", x_signal=make_signal_key(0, f"sig{i}"),
+            assigned_signals=_keys(1, runs[1], ["sig0", "sig1", "sig2"]),
+        )
+        for i in range(4)
+    ]
+    return runs, {}, _grid(2, 2, subplots), {}
+
+
+def workload_fft(scale: float, rng: np.random.Generator) -> Workload:
+    """FFT subplots over long signals"""
+    run = _make_run("fft", max(int(1_000_000 * scale), 64), 100.0, 8, rng)
+    keys = _keys(0, run)
+    subplots = [SubplotConfig(index=i, mode="fft", assigned_signals=keys[i::4]) for i in range(4)]
+    return [run], {}, _grid(2, 2, subplots), {}
+
+
+WORKLOADS: Dict[str, Callable[[float, np.random.Generator], Workload]] = {
+    "many_signals": workload_many_signals,
+    "long_signals": workload_long_signals,
+    "dense_states": workload_dense_states,
+    "multi_rate": workload_multi_rate,
+    "large_grid": workload_large_grid,
+    "xy_pairs": workload_xy_pairs,
+    "fft": workload_fft,
+}
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def _clear_caches():
+    """Drop every render cache so the next build is cold"""
+    figure_factory.clear_trace_cache()
+    clear_spectrogram_cache()
+
+
+def _build(workload: Workload):
+    """create_figure with the builders' progress prints silenced"""
+    runs, derived, vs, settings = workload
+    with contextlib.redirect_stdout(io.StringIO()):
+        fig, _ = create_figure(runs, derived, vs, settings)
+    return fig
+
+
+def _serialize(fig) -> str:
+    """Encode a figure the way update_plot + Dash do"""
+    return to_json_plotly(figure_to_payload(fig, y_float32=True))
+
+
+def _median_ms(fn: Callable[[], object], repeat: int, before: Optional[Callable[[], None]] = None) -> float:
+    """Median wall time of fn in milliseconds over repeat runs"""
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return float(np.median(times))
+
+
+def run_workload(name: str, scale: float = 1.0, repeat: int = 3, seed: int = 0) -> BenchResult:
+    """
+    Generate and measure one workload.
+
+    Args:
+        name: Key in WORKLOADS
+        scale: Multiplier for sample counts
+        repeat: Timed repetitions (median is reported)
+        seed: Random seed for the synthetic data
+
+    Returns:
+        BenchResult
+    """
+    workload = WORKLOADS[name](scale, np.random.default_rng(seed))
+    runs, derived, vs, _ = workload
+    total = vs.layout_rows * vs.layout_cols
+    samples = 0
+    for sp in vs.subplots[:total]:
+        keys = list(sp.assigned_signals) + ([sp.x_signal] if sp.mode == "xy" and sp.x_signal else [])
+        for key in keys:
+            run_idx, sig_name = key.split(":", 1)
+            samples += len(runs[int(run_idx)].signals[sig_name].data)
+
+    build_ms = _median_ms(lambda: _build(workload), repeat, before=_clear_caches)
+    warm_ms = _median_ms(lambda: _build(workload), repeat)
+    fig = _build(workload)
+    serialize_ms = _median_ms(lambda: _serialize(fig), repeat)
+    payload_bytes = len(_serialize(fig).encode("utf-8"))
+
+    # Peak memory in a separate pass - tracemalloc slows allocation-heavy code
+    _clear_caches()
+    tracemalloc.start()
+    try:
+        _serialize(_build(workload))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    _clear_caches()
+
+    return BenchResult(
+        workload=name,
+        samples=samples,
+        traces=len(fig.data),
+        build_ms=round(build_ms, 2),
+        warm_ms=round(warm_ms, 2),
+        serialize_ms=round(serialize_ms, 2),
+        payload_bytes=payload_bytes,
+        peak_mb=round(peak / 1e6, 2),
+    )
+
+
+# =============================================================================
+# BASELINE
+# =============================================================================
+
+def _environment() -> Dict:
+    """Describe the machine so baselines from different hosts are recognisable"""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_baseline(results: List[BenchResult], path: str, scale: float):
+    """Write results (plus environment and scale) as the new baseline"""
+    data = {
+        "scale": scale,
+        "environment": _environment(),
+        "results": {r.workload: asdict(r) for r in results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"[BENCH] Baseline saved: {path}", flush=True)
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    """Load a baseline file, or None if missing/unreadable"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[BENCH] Could not read baseline {path}: {e}", flush=True)
+        return None
+
+
+def compare_to_baseline(results: List[BenchResult], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        List of regression messages (metric grew by more than tolerance)
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    for r in results:
+        base = base_results.get(r.workload)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), getattr(r, metric)
+            if old and new > old * (1.0 + tolerance):
+                regressions.append(f"{r.workload}.{metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def _format_delta(new: float, old: Optional[float]) -> str:
+    """Relative change vs baseline as a short string"""
+    if not old:
+        return ""
+    return f" ({(new / old - 1) * 100:+.0f}%)"
+
+
+def print_results(results: List[BenchResult], baseline: Optional[Dict] = None):
+    """Print a results table, with changes vs baseline when available"""
+    base_results = (baseline or {}).get("results", {})
+    header = f"{'workload':<14} {'samples':>11} {'traces':>6} {'build ms':>16} {'warm ms':>14} {'serialize ms':>16} {'payload MB':>15} {'peak MB':>15}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        base = base_results.get(r.workload, {})
+        print(
+            f"{r.workload:<14} {r.samples:>11,} {r.traces:>6} "
+            f"{r.build_ms:>9.1f}{_format_delta(r.build_ms, base.get('build_ms')):>7} "
+            f"{r.warm_ms:>7.1f}{_format_delta(r.warm_ms, base.get('warm_ms')):>7} "
+            f"{r.serialize_ms:>9.1f}{_format_delta(r.serialize_ms, base.get('serialize_ms')):>7} "
+            f"{r.payload_bytes / 1e6:>8.2f}{_format_delta(r.payload_bytes, base.get('payload_bytes')):>7} "
+            f"{r.peak_mb:>8.1f}{_format_delta(r.peak_mb, base.get('peak_mb')):>7}",
+            flush=True,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark figure rendering on synthetic workloads")
+    parser.add_argument("--only", nargs="+", choices=sorted(WORKLOADS), help="Workloads to run (default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Sample count multiplier (default: 1.0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per metric (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic data")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative growth flagged as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(WORKLOADS)
+    results = []
+    for name in names:
+        print(f"[BENCH] {name} ...", flush=True)
+        results.append(run_workload(name, scale=args.scale, repeat=max(args.repeat, 1), seed=args.seed))
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline is not None and baseline.get("scale") != args.scale:
+        print(f"[BENCH] Baseline was recorded at scale {baseline.get('scale')} - not comparing", flush=True)
+        baseline = None
+
+    print()
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline, args.scale)
+        return 0
+
+    if baseline is None:
+        print(f"\n[BENCH] No baseline at {args.baseline} (use --save-baseline to create one)", flush=True)
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n[BENCH] {len(regressions)} regression(s) beyond {args.tolerance:.0%}:", flush=True)
+        for msg in regressions:
+            print(f"  {msg}", flush=True)
+        return 1
+
+    print(f"\n[BENCH] No regressions beyond {args.tolerance:.0%}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,14 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from core.models import SignalView
+from ops.align import resample
+from ops.resample import resample_rate, sample_rate
+
+
+# Max uniform samples over the overlap used to estimate a time shift
+SHIFT_MAX_SAMPLES = 1 << 24
+
 
 class SyncMethod(Enum):
     """Time synchronization method"""
@@ -99,8 +107,8 @@ def compare_runs(
         return None
     
     try:
-        # Apply time shift
-        compare_time_shifted = compare_time + config.time_shift
+        # Apply time shift (shared shifted array, so alignments stay cached)
+        compare_time_shifted = SignalView(compare_time, compare_data, time_shift=config.time_shift).resolve_time()
         
         # Synchronize time bases
         time_out, base_aligned, comp_aligned = _sync_signals(
@@ -204,17 +212,19 @@ def _sync_signals(
         if t_start >= t_end:
             return np.array([]), np.array([]), np.array([])
         
-        # Use denser time base within overlap
+        # Use denser time base within overlap (resampled on the full base, so
+        # repeated compares hit the alignment cache, then cut to the overlap)
         mask_a = (time_a >= t_start) & (time_a <= t_end)
         mask_b = (time_b >= t_start) & (time_b <= t_end)
         
         if np.sum(mask_a) >= np.sum(mask_b):
-            time_out = time_a[mask_a]
+            time_base, mask = time_a, mask_a
         else:
-            time_out = time_b[mask_b]
+            time_base, mask = time_b, mask_b
         
-        a_out = _interpolate(time_a, data_a, time_out, interp_method)
-        b_out = _interpolate(time_b, data_b, time_out, interp_method)
+        time_out = time_base[mask]
+        a_out = _interpolate(time_a, data_a, time_base, interp_method)[mask]
+        b_out = _interpolate(time_b, data_b, time_base, interp_method)[mask]
     
     else:
         time_out = time_a
@@ -230,13 +240,8 @@ def _interpolate(
     time_dst: np.ndarray,
     method: InterpolationMethod,
 ) -> np.ndarray:
-    """Interpolate data to new time base"""
-    if method == InterpolationMethod.NEAREST:
-        indices = np.searchsorted(time_src, time_dst)
-        indices = np.clip(indices, 0, len(data_src) - 1)
-        return data_src[indices]
-    else:
-        return np.interp(time_dst, time_src, data_src)
+    """Interpolate data to new time base (cached, see ops.align)"""
+    return resample(time_src, data_src, time_dst, method.value)
 
 
 def auto_time_shift(
@@ -249,6 +254,12 @@ def auto_time_shift(
     """
     Estimate optimal time shift using cross-correlation.
     
+    Both signals are put on a common uniform grid at the faster signal's
+    rate (full resolution, up to SHIFT_MAX_SAMPLES over the overlap) and
+    correlated via FFT. Only lags within +/-max_shift are searched, and
+    the peak is refined to a fraction of a sample with a parabola through
+    its neighbours.
+    
     Args:
         time_a, data_a: Baseline signal
         time_b, data_b: Compare signal
@@ -262,28 +273,44 @@ def auto_time_shift(
         t_start = max(time_a[0], time_b[0])
         t_end = min(time_a[-1], time_b[-1])
         
-        if t_end <= t_start:
+        if t_end <= t_start or not max_shift > 0:
+            return 0.0
+        
+        # Faster signal's rate (median interval, robust to jitter), reduced
+        # with anti-aliasing only beyond SHIFT_MAX_SAMPLES over the overlap
+        fs = max(sample_rate(time_a), sample_rate(time_b))
+        if not fs > 0:
             return 0.0
+        fs = min(fs, SHIFT_MAX_SAMPLES / (t_end - t_start))
         
-        dt = min(np.mean(np.diff(time_a)), np.mean(np.diff(time_b)))
-        n_samples = int((t_end - t_start) / dt)
-        n_samples = min(n_samples, 10000)  # Limit for performance
+        grid_a, uniform_a = resample_rate(time_a, data_a, fs)
+        grid_b, uniform_b = resample_rate(time_b, data_b, fs)
+        start = int(np.searchsorted(grid_a, t_start, side="left"))
+        stop = int(np.searchsorted(grid_a, t_end, side="right"))
+        t_common = grid_a[start:stop]
+        n_samples = len(t_common)
+        if n_samples < 2:
+            return 0.0
+        dt = (t_common[-1] - t_common[0]) / (n_samples - 1)
         
-        t_common = np.linspace(t_start, t_end, n_samples)
-        a_resampled = np.interp(t_common, time_a, data_a)
-        b_resampled = np.interp(t_common, time_b, data_b)
+        a_resampled = uniform_a[start:stop]
+        b_resampled = resample(grid_b, uniform_b, grid_a)[start:stop]
         
-        # Cross-correlation
-        corr = np.correlate(a_resampled - np.mean(a_resampled),
-                           b_resampled - np.mean(b_resampled),
-                           mode='full')
+        max_lag = min(int(np.ceil(max_shift / dt)), n_samples - 1)
+        corr = _xcorr_window(a_resampled - np.mean(a_resampled),
+                             b_resampled - np.mean(b_resampled),
+                             max_lag)
         
-        # Find peak
-        lags = np.arange(-(n_samples-1), n_samples)
-        peak_idx = np.argmax(corr)
-        lag_samples = lags[peak_idx]
+        # Peak within the window, refined by a parabola through its neighbours
+        peak_idx = int(np.argmax(corr))
+        offset = 0.0
+        if 0 < peak_idx < len(corr) - 1:
+            left, centre, right = corr[peak_idx - 1:peak_idx + 2]
+            curvature = left - 2.0 * centre + right
+            if curvature < 0:
+                offset = 0.5 * (left - right) / curvature
         
-        time_shift = lag_samples * dt
+        time_shift = (peak_idx - max_lag + offset) * dt
         
         # Clamp to max shift
         return float(np.clip(time_shift, -max_shift, max_shift))
@@ -291,3 +318,30 @@ def auto_time_shift(
     except Exception:
         return 0.0
 
+
+def _xcorr_window(a: np.ndarray, b: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    Normalised cross-correlation for lags k = -max_lag..max_lag.
+
+    The raw products sum(a[n + k] * b[n]) (np.correlate(a, b, 'full') over
+    that range) come from one zero-padded real FFT pair; padding by max_lag
+    keeps circular wrap-around out of the lags returned. Each lag is then
+    divided by the energy of the overlapping parts, so the shrinking
+    overlap at larger lags does not pull the peak towards zero.
+    """
+    from ops.engine import fast_fft_length
+    
+    n = len(a)
+    nfft = fast_fft_length(n + max_lag)
+    spectrum = np.fft.rfft(a, nfft)
+    spectrum *= np.conj(np.fft.rfft(b, nfft))
+    circular = np.fft.irfft(spectrum, nfft)
+    corr = np.concatenate((circular[nfft - max_lag:], circular[:max_lag + 1]))
+    
+    # Energy of a[max(k, 0):n + min(k, 0)] and b[max(-k, 0):n - max(k, 0)]
+    energy_a = np.concatenate(([0.0], np.cumsum(np.square(a))))
+    energy_b = np.concatenate(([0.0], np.cumsum(np.square(b))))
+    lags = np.arange(-max_lag, max_lag + 1)
+    lo, hi = np.maximum(lags, 0), np.minimum(lags, 0)
+    norm = np.sqrt((energy_a[n + hi] - energy_a[lo]) * (energy_b[n - lo] - energy_b[-hi]))
+    return np.divide(corr, norm, out=np.zeros_like(corr), where=norm > 0)
@@ -5,11 +5,168 @@ Core data structures for runs, signals, and derived signals.
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
+import itertools
+import threading
+import weakref
 import numpy as np
 from enum import Enum
 
 
+# Monotonic counter for data version stamps (never reused within a process)
+_data_version_counter = itertools.count(1)
+
+
+def next_data_version() -> int:
+    """Get a new, process-unique data version stamp"""
+    return next(_data_version_counter)
+
+
+# Shifted time arrays shared by all views on the same base time vector
+SHIFTED_TIME_CACHE_SIZE = 32
+_shifted_time_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_shifted_time_lock = threading.Lock()
+
+
+def _shifted_time(time: np.ndarray, shift: float) -> np.ndarray:
+    """
+    Get time + shift, reusing the result for every caller with the same base array.
+    
+    Keyed by array identity (guarded by a weak reference) so all signals of a
+    run share one shifted copy instead of allocating one each.
+    """
+    key = (id(time), shift)
+    with _shifted_time_lock:
+        entry = _shifted_time_cache.get(key)
+        if entry is not None and entry[0]() is time:
+            _shifted_time_cache.move_to_end(key)
+            return entry[1]
+    
+    shifted = time + shift
+    with _shifted_time_lock:
+        _shifted_time_cache[key] = (weakref.ref(time), shifted)
+        while len(_shifted_time_cache) > SHIFTED_TIME_CACHE_SIZE:
+            _shifted_time_cache.popitem(last=False)
+    return shifted
+
+
+@dataclass(frozen=True)
+class SignalView:
+    """
+    Lazy affine view of a signal: t = time + time_shift, y = data * scale + offset.
+    
+    Holds references to the base arrays without copying them. Point queries
+    and index lookups work on the base arrays directly; full transformed
+    arrays are only materialised by resolve_time()/resolve_data().
+    """
+    time: np.ndarray
+    data: np.ndarray
+    time_shift: float = 0.0
+    scale: float = 1.0
+    offset: float = 0.0
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    @property
+    def has_value_transform(self) -> bool:
+        return self.scale != 1.0 or self.offset != 0.0
+    
+    def with_transform(self, scale: float = 1.0, offset: float = 0.0, time_shift: float = 0.0) -> "SignalView":
+        """Compose another affine transform on top of this view"""
+        return SignalView(
+            time=self.time,
+            data=self.data,
+            time_shift=self.time_shift + time_shift,
+            scale=self.scale * scale,
+            offset=self.offset * scale + offset,
+        )
+    
+    def resolve_time(self) -> np.ndarray:
+        """Get the displayed time array (the base array itself when unshifted)"""
+        if self.time_shift == 0.0:
+            return self.time
+        return _shifted_time(self.time, self.time_shift)
+    
+    def resolve_data(self) -> np.ndarray:
+        """Get the displayed data array (the base array itself when untransformed)"""
+        if not self.has_value_transform:
+            return self.data
+        return self.data * self.scale + self.offset
+    
+    def map_value(self, value: float) -> float:
+        """Apply the value transform to a scalar"""
+        return value * self.scale + self.offset
+    
+    def value_at(self, t: float) -> Optional[float]:
+        """Linearly interpolated displayed value at displayed time t"""
+        if len(self.time) == 0:
+            return None
+        try:
+            return self.map_value(float(np.interp(t - self.time_shift, self.time, self.data)))
+        except Exception:
+            return None
+    
+    def index_range(self, t_start: Optional[float] = None, t_end: Optional[float] = None) -> Tuple[int, int]:
+        """Get [i0, i1) sample range covering displayed times t_start..t_end (inclusive)"""
+        i0 = 0 if t_start is None else int(np.searchsorted(self.time, t_start - self.time_shift, side="left"))
+        i1 = len(self.time) if t_end is None else int(np.searchsorted(self.time, t_end - self.time_shift, side="right"))
+        return i0, max(i0, i1)
+
+
+def sample_views(views: List[Optional[SignalView]], times: List[float]) -> np.ndarray:
+    """
+    Linearly interpolated displayed values of many views at several times.
+
+    Views sharing a base time array are answered with one searchsorted call
+    (covering every distinct time shift and query time), then all their data
+    arrays are gathered and blended in a vectorised batch. Matches
+    SignalView.value_at, including clamping to the end values.
+
+    Args:
+        views: Signal views (None or empty views yield NaN)
+        times: Displayed query times (e.g. cursor 1 and cursor 2)
+
+    Returns:
+        float array shaped (len(views), len(times))
+    """
+    times = np.asarray(times, dtype=float)
+    out = np.full((len(views), len(times)), np.nan)
+
+    groups: Dict[int, List[int]] = {}
+    for i, view in enumerate(views):
+        if view is not None and len(view.time) > 0:
+            groups.setdefault(id(view.time), []).append(i)
+
+    for members in groups.values():
+        time = views[members[0]].time
+        n = len(time)
+        shifts, shift_idx = np.unique([views[i].time_shift for i in members], return_inverse=True)
+        query = times[None, :] - shifts[:, None]  # (distinct shifts, times)
+
+        pos = np.searchsorted(time, query.ravel(), side="right").reshape(query.shape)
+        hi = np.clip(pos, 1, n - 1) if n > 1 else np.zeros_like(pos)
+        lo = np.maximum(hi - 1, 0)
+        t_lo, t_hi = time[lo], time[hi]
+        span = np.where(t_hi > t_lo, t_hi - t_lo, np.inf)  # Repeated/single sample -> weight 0
+        w = np.clip((query - t_lo) / span, 0.0, 1.0) if n > 1 else np.zeros(query.shape)
+
+        # Gather every member at its shift's indices: (members, times)
+        rows = shift_idx.ravel()
+        lo, hi, w = lo[rows], hi[rows], w[rows]
+        v_lo = np.array([views[i].data.take(idx) for i, idx in zip(members, lo)], dtype=float)
+        v_hi = np.array([views[i].data.take(idx) for i, idx in zip(members, hi)], dtype=float)
+        with np.errstate(invalid="ignore"):
+            values = np.where(w == 0.0, v_lo, np.where(w == 1.0, v_hi, v_lo + w * (v_hi - v_lo)))
+
+        scale = np.array([views[i].scale for i in members])[:, None]
+        offset = np.array([views[i].offset for i in members])[:, None]
+        out[members] = values * scale + offset
+
+    return out
+
+
 class SignalType(Enum):
     """Signal type classification"""
     NORMAL = "normal"
@@ -61,18 +218,31 @@ class Run:
     description: Optional[str] = None
     time_offset: float = 0.0  # Per-run time offset
     
+    # Data version stamp - changes whenever time/signal arrays change
+    version: int = field(default_factory=next_data_version)
+    
     @property
     def signal_names(self) -> List[str]:
         return list(self.signals.keys())
     
+    def bump_version(self):
+        """Mark run data as changed (call after mutating arrays in place)"""
+        self.version = next_data_version()
+    
     def get_signal_data(self, signal_name: str) -> tuple:
         """Get (time, data) for a signal, with offsets applied"""
         if signal_name not in self.signals:
             return np.array([]), np.array([])
         
-        sig = self.signals[signal_name]
-        time_with_offset = self.time + self.time_offset + sig.time_offset
-        return time_with_offset, sig.data
+        view = self.get_signal_view(signal_name)
+        return view.resolve_time(), view.data
+    
+    def get_signal_view(self, signal_name: str) -> Optional[SignalView]:
+        """Get a copy-free view of a signal with run/signal time offsets applied lazily"""
+        sig = self.signals.get(signal_name)
+        if sig is None:
+            return None
+        return SignalView(self.time, sig.data, time_shift=self.time_offset + sig.time_offset)
     
     def compute_metadata(self):
         """Compute metadata from time vector"""
@@ -101,16 +271,36 @@ class DerivedSignal:
     color: Optional[str] = None
     line_width: float = 1.5
     
+    # Data version stamp - changes whenever time/data arrays change
+    version: int = field(default_factory=next_data_version)
+    
+    # Dependency graph (ops.graph): how to recompute from sources, the source
+    # stamps the data was computed from, whether it needs recomputing, and
+    # whether its inputs are missing (it then keeps its last data)
+    recipe: Optional[Dict] = None
+    input_stamps: Optional[tuple] = None
+    stale: bool = False
+    broken: bool = False
+    
     @property
     def label(self) -> str:
-        return self.display_name or self.name
+        name = self.display_name or self.name
+        return f"⚠ {name} (broken)" if self.broken else name
+    
+    def get_view(self) -> SignalView:
+        """Get a copy-free view of the derived signal"""
+        return SignalView(self.time, self.data)
+    
+    def bump_version(self):
+        """Mark derived data as changed"""
+        self.version = next_data_version()
 
 
 @dataclass 
 class SubplotConfig:
     """Configuration for a single subplot"""
     index: int
-    mode: str = "time"  # "time", "xy", or "fft"
+    mode: str = "time"  # "time", "xy", "fft" or "spectrogram"
     
     # Time mode: list of signal keys
     assigned_signals: List[str] = field(default_factory=list)
@@ -119,10 +309,37 @@ class SubplotConfig:
     x_signal: Optional[str] = None
     y_signals: List[str] = field(default_factory=list)
     xy_alignment: str = "linear"  # "linear" or "nearest"
+    xy_density: bool = False      # Render as 2D histogram heatmap instead of lines
+    xy_bins: int = 200            # Histogram bins per axis in density mode
     
     # FFT mode settings
     fft_window: str = "hanning"  # "hanning", "hamming", "blackman", "none"
     fft_log_scale: bool = True   # Log scale for magnitude
+    fft_pad: bool = False        # Zero-pad to a fast (5-smooth) FFT length
+    fft_average: str = "none"    # "none" (whole-record FFT) or Welch "mean" / "median"
+    fft_psd: bool = False        # Show power spectral density instead of magnitude
+    
+    # Spectrogram mode settings (window and log scale shared with FFT mode;
+    # segment length and hop also used by averaged FFT/PSD)
+    spec_nperseg: int = 1024  # Samples per STFT segment
+    spec_hop: int = 512       # Samples between segment starts
+    
+    # Time mode rendering: "lines" (WebGL traces) or "raster" (server-side image)
+    render: str = "lines"
+    
+    # Time mode event detection (see ops.events); levels in displayed units
+    event_kind: str = "none"             # "none", "crossing", "edge", "dwell" or "band"
+    event_level: Optional[float] = None  # Crossing level / dwell value (None = every value)
+    event_low: Optional[float] = None    # Band limits (None = unbounded)
+    event_high: Optional[float] = None
+    event_direction: str = "both"        # Crossings/edges: "rising", "falling" or "both"
+    event_hysteresis: float = 0.0        # Crossing dead band half-width
+    event_min_duration: float = 0.0      # Shortest dwell/band violation reported (s)
+    
+    # Current zoom window reported by the browser (None = full data range);
+    # raster rendering and X-Y density redraw for this window
+    view_xrange: Optional[List[float]] = None
+    view_yrange: Optional[List[float]] = None
     
     # Axis limits (None = auto)
     xlim: Optional[List[float]] = None  # [min, max] or None for auto
@@ -133,6 +350,11 @@ class SubplotConfig:
     caption: str = ""        # Short caption 
     description: str = ""    # Multi-line description
     include_in_report: bool = True
+    
+    @property
+    def uses_viewport(self) -> bool:
+        """True if the subplot is rendered server-side for the current zoom window"""
+        return (self.mode == "time" and self.render == "raster") or (self.mode == "xy" and self.xy_density)
 
 
 @dataclass
@@ -57,6 +57,21 @@ def save_session(
                         "x_signal": sp.x_signal,
                         "y_signals": sp.y_signals,
                         "xy_alignment": sp.xy_alignment,
+                        "xy_density": sp.xy_density,
+                        "xy_bins": sp.xy_bins,
+                        "render": sp.render,
+                        "spec_nperseg": sp.spec_nperseg,
+                        "spec_hop": sp.spec_hop,
+                        "fft_pad": sp.fft_pad,
+                        "fft_average": sp.fft_average,
+                        "fft_psd": sp.fft_psd,
+                        "event_kind": sp.event_kind,
+                        "event_level": sp.event_level,
+                        "event_low": sp.event_low,
+                        "event_high": sp.event_high,
+                        "event_direction": sp.event_direction,
+                        "event_hysteresis": sp.event_hysteresis,
+                        "event_min_duration": sp.event_min_duration,
                         "xlim": sp.xlim,  # Feature 5: axis limits
                         "ylim": sp.ylim,  # Feature 5: axis limits
                         "title": sp.title,
@@ -72,6 +87,7 @@ def save_session(
                     "name": ds.name,
                     "operation": ds.operation,
                     "source_signals": ds.source_signals,
+                    "recipe": ds.recipe,
                     "display_name": ds.display_name,
                     "color": ds.color,
                     "line_width": ds.line_width,
@@ -130,6 +146,21 @@ def parse_view_state(session: Dict) -> ViewState:
             x_signal=sp_data.get("x_signal"),
             y_signals=sp_data.get("y_signals", []),
             xy_alignment=sp_data.get("xy_alignment", "linear"),
+            xy_density=sp_data.get("xy_density", False),
+            xy_bins=sp_data.get("xy_bins", 200),
+            render=sp_data.get("render", "lines"),
+            spec_nperseg=sp_data.get("spec_nperseg", 1024),
+            spec_hop=sp_data.get("spec_hop", 512),
+            fft_pad=sp_data.get("fft_pad", False),
+            fft_average=sp_data.get("fft_average", "none"),
+            fft_psd=sp_data.get("fft_psd", False),
+            event_kind=sp_data.get("event_kind", "none"),
+            event_level=sp_data.get("event_level"),
+            event_low=sp_data.get("event_low"),
+            event_high=sp_data.get("event_high"),
+            event_direction=sp_data.get("event_direction", "both"),
+            event_hysteresis=sp_data.get("event_hysteresis", 0.0),
+            event_min_duration=sp_data.get("event_min_duration", 0.0),
             xlim=sp_data.get("xlim"),  # Feature 5: axis limits
             ylim=sp_data.get("ylim"),  # Feature 5: axis limits
             title=sp_data.get("title", ""),
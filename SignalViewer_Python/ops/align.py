@@ -0,0 +1,108 @@
+"""
+Signal Viewer Pro - Alignment Cache
+====================================
+Resampling of one signal onto another signal's time base, shared by
+operations, compare, X-Y plots and export.
+
+Results are cached by the identity of the source time/data arrays and the
+target time array (guarded by weak references, so the cache never keeps a
+signal alive), the method, the out-of-range fill and an optional data
+version. Repeated compares and X-Y renders reuse the resampled arrays
+instead of interpolating again. Cached arrays are read-only; entries are
+dropped once any of their arrays is garbage collected, and evicted
+least-recently-used once ALIGN_CACHE_BYTES is exceeded.
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+
+from ops.weak_cache import WeakArrayCache
+
+
+# Total memory budget for cached resampled arrays
+ALIGN_CACHE_BYTES = 256 * 1024 * 1024
+
+# (id(time_src), id(data_src), id(time_dst), method, fill, version) -> result
+_align_cache = WeakArrayCache(ALIGN_CACHE_BYTES)
+
+
+def same_time_base(time_a: np.ndarray, time_b: np.ndarray) -> bool:
+    """True if two time arrays are the same object or hold equal values"""
+    if time_a is time_b:
+        return True
+    if len(time_a) != len(time_b):
+        return False
+    if len(time_a) and (time_a[0] != time_b[0] or time_a[-1] != time_b[-1]):
+        return False
+    return bool(np.array_equal(time_a, time_b))
+
+
+def resample(
+    time_src: np.ndarray,
+    data_src: np.ndarray,
+    time_dst: np.ndarray,
+    method: str = "linear",
+    fill: Optional[float] = None,
+    version: Any = None,
+) -> np.ndarray:
+    """
+    Resample a signal onto a target time base (cached).
+
+    Args:
+        time_src: Source time array (sorted)
+        data_src: Source data array
+        time_dst: Target time array
+        method: "linear" (np.interp) or "nearest" (first source sample at
+                or after each target time, clamped to the last sample)
+        fill: Value for target times outside the source range
+              (None clamps to the end values, like np.interp)
+        version: Data version of the source, for callers that can modify
+                 arrays in place (part of the cache key)
+
+    Returns:
+        Resampled data, one value per target time (read-only when cached;
+        data_src itself when both time bases hold the same values)
+    """
+    method = getattr(method, "value", method)  # Accept AlignmentMethod / InterpolationMethod
+    if len(time_src) == 0 or len(time_dst) == 0:
+        return np.full(len(time_dst), np.nan if fill is None else fill)
+    if time_src is time_dst:
+        return data_src
+
+    key = (id(time_src), id(data_src), id(time_dst), method, fill, version)
+    objs = (time_src, data_src, time_dst)
+    cached = _align_cache.get(key, objs)
+    if cached is not None:
+        return cached
+
+    if same_time_base(time_src, time_dst):
+        return data_src
+    result = _resample(time_src, data_src, time_dst, method, fill)
+    if _align_cache.put(key, objs, result, result.nbytes):  # Not cached if too large or e.g. a list
+        result.flags.writeable = False
+    return result
+
+
+def _resample(
+    time_src: np.ndarray,
+    data_src: np.ndarray,
+    time_dst: np.ndarray,
+    method: str,
+    fill: Optional[float],
+) -> np.ndarray:
+    """Uncached resampling (see resample)"""
+    if method != "nearest":
+        return np.interp(time_dst, time_src, data_src, left=fill, right=fill)
+
+    indices = np.clip(np.searchsorted(time_src, time_dst), 0, len(data_src) - 1)
+    result = np.asarray(data_src)[indices]
+    if fill is not None:
+        result = result.astype(float)
+        result[(time_dst < time_src[0]) | (time_dst > time_src[-1])] = fill
+    return result
+
+
+def clear_align_cache():
+    """Drop all cached resampled arrays"""
+    _align_cache.clear()
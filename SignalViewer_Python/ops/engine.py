@@ -5,12 +5,19 @@ Unary, binary, and multi-signal operations.
 Handles different time bases via alignment.
 """
 
+import threading
 import numpy as np
-from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Tuple
 from enum import Enum
+from numpy.lib.stride_tricks import sliding_window_view
 
-from core.models import Run, DerivedSignal, parse_signal_key, DERIVED_RUN_IDX
+from core.models import Run, DerivedSignal, SignalView, parse_signal_key, DERIVED_RUN_IDX
 from core.naming import get_derived_name
+from ops.region_index import get_region_index, slice_stats
+from ops.align import resample
+from ops.resample import to_uniform, from_uniform, sample_rate
+from ops.filters import moving_average, running_rms, butterworth_sos, sosfiltfilt
 
 
 class AlignmentMethod(Enum):
@@ -83,7 +90,7 @@ def apply_unary(
         elif operation == UnaryOp.RMS:
             # Running RMS (window of 10 samples)
             window = min(10, len(data))
-            result = np.sqrt(np.convolve(data**2, np.ones(window)/window, mode='same'))
+            result = running_rms(data, window)
         elif operation == UnaryOp.NORMALIZE:
             data_min, data_max = np.min(data), np.max(data)
             if data_max > data_min:
@@ -217,13 +224,8 @@ def apply_multi(
                 base_time = time
                 all_data.append(data)
             else:
-                # Align to base time
-                if alignment == AlignmentMethod.NEAREST:
-                    indices = np.searchsorted(time, base_time)
-                    indices = np.clip(indices, 0, len(data) - 1)
-                    all_data.append(data[indices])
-                else:
-                    all_data.append(np.interp(base_time, time, data))
+                # Align to base time (cached)
+                all_data.append(resample(time, data, base_time, alignment))
             
             all_names.append(sig_name)
         
@@ -267,8 +269,9 @@ def _get_data(
 ) -> Tuple[np.ndarray, np.ndarray]:
     """Get signal data from runs or derived"""
     if run_idx == DERIVED_RUN_IDX:
-        if sig_name in derived:
-            ds = derived[sig_name]
+        from ops.graph import resolve_derived
+        ds = resolve_derived(runs, derived, sig_name)
+        if ds is not None:
             return ds.time, ds.data
         return np.array([]), np.array([])
     
@@ -285,28 +288,11 @@ def _align_signals(
     data_b: np.ndarray,
     method: AlignmentMethod,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Align two signals to common time base"""
+    """Align two signals to common time base (resampled arrays are cached)"""
     # Use the denser time base
     if len(time_a) >= len(time_b):
-        base_time = time_a
-        a_aligned = data_a
-        if method == AlignmentMethod.NEAREST:
-            indices = np.searchsorted(time_b, base_time)
-            indices = np.clip(indices, 0, len(data_b) - 1)
-            b_aligned = data_b[indices]
-        else:
-            b_aligned = np.interp(base_time, time_b, data_b)
-    else:
-        base_time = time_b
-        b_aligned = data_b
-        if method == AlignmentMethod.NEAREST:
-            indices = np.searchsorted(time_a, base_time)
-            indices = np.clip(indices, 0, len(data_a) - 1)
-            a_aligned = data_a[indices]
-        else:
-            a_aligned = np.interp(base_time, time_a, data_a)
-    
-    return base_time, a_aligned, b_aligned
+        return time_a, data_a, resample(time_b, data_b, time_a, method)
+    return time_b, resample(time_a, data_a, time_b, method), data_b
 
 
 def align_two_signals(
@@ -345,28 +331,14 @@ def align_two_signals(
         # No overlap
         return np.array([]), False
     
-    # Create mask for overlapping region in reference time
-    overlap_mask = (t_ref >= t_min) & (t_ref <= t_max)
-    t_overlap = t_ref[overlap_mask]
-    
-    if len(t_overlap) < 2:
+    # Need at least two reference samples in the overlapping region
+    n_overlap = np.searchsorted(t_ref, t_max, side="right") - np.searchsorted(t_ref, t_min, side="left")
+    if n_overlap < 2:
         return np.array([]), False
     
     try:
-        if method == "nearest":
-            # Nearest neighbor
-            indices = np.searchsorted(t_other, t_overlap)
-            indices = np.clip(indices, 0, len(y_other) - 1)
-            y_aligned = y_other[indices]
-        else:
-            # Linear interpolation (default)
-            y_aligned = np.interp(t_overlap, t_other, y_other)
-        
-        # Return full-length arrays matching t_ref (NaN outside overlap)
-        result = np.full(len(t_ref), np.nan)
-        result[overlap_mask] = y_aligned
-        
-        return result, True
+        # Full-length array matching t_ref, NaN outside overlap (cached)
+        return resample(t_other, y_other, t_ref, method, fill=np.nan), True
         
     except Exception as e:
         print(f"[ALIGN] Alignment failed: {e}", flush=True)
@@ -432,22 +404,295 @@ def get_xy_plot_data(
     return results
 
 
+# =============================================================================
+# OPERATION KERNELS (array level - used by the derived-signal graph)
+# =============================================================================
+
+def compute_unary(time: np.ndarray, data: np.ndarray, operation: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply a unary operation (operations panel names) to one signal, or to
+    a stack of signals sharing the time base (rows of a 2D array).
+    
+    Args:
+        time: Time array
+        data: Signal data (n,) or stacked signals (rows, n)
+        operation: "derivative", "integral", "abs", "normalize", "rms",
+                   "smooth", "lowpass", "highpass", "butter_lowpass" or
+                   "butter_highpass" (else passthrough)
+        
+    Returns:
+        Tuple of (time, result) - result has the shape of data
+    """
+    n = data.shape[-1]
+    if operation == "derivative":
+        result = np.gradient(data, time, axis=-1)
+    elif operation == "integral":
+        result = np.cumsum(data, axis=-1) * np.mean(np.diff(time)) if len(time) > 1 else data
+    elif operation == "abs":
+        result = np.abs(data)
+    elif operation == "normalize":
+        min_v = np.min(data, axis=-1, keepdims=True)
+        span = np.max(data, axis=-1, keepdims=True) - min_v
+        result = np.where(span > 0, (data - min_v) / np.where(span > 0, span, 1), data * 0)
+    elif operation == "rms":
+        window = min(100, n // 10) or 10
+        result = running_rms(data, window)
+    elif operation == "smooth":
+        window = min(50, n // 20) or 5
+        result = moving_average(data, window)
+    elif operation in ("lowpass", "highpass", "butter_lowpass", "butter_highpass"):
+        # Default cutoff: 5% (lowpass) / 1% (highpass) of the sampling rate
+        fs = sample_rate(time) or 1.0
+        filter_type = operation.replace("butter_", "")
+        cutoff = fs * (0.05 if filter_type == "lowpass" else 0.01)
+        method = "butterworth" if operation.startswith("butter_") else "box"
+        result = apply_filter(time, data, filter_type, cutoff, method=method)
+    else:
+        result = data
+    return time, result
+
+
+# Max elements stacked per vectorised batch in compute_unary_across_runs. Small
+# enough to stay in cache: batching pays off for many short signals, while long
+# signals end up one per batch (no stacking copy)
+UNARY_BATCH_ELEMENTS = 262_144
+
+
+def compute_unary_across_runs(
+    runs: List[Run],
+    signal_name: str,
+    operation: str,
+) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Apply a unary operation to one signal in every run that contains it.
+    
+    Runs sharing a time base (equal time arrays and time offsets) are
+    stacked into a 2D array and processed by one vectorised compute_unary
+    call per group (in row blocks of at most UNARY_BATCH_ELEMENTS).
+    
+    Args:
+        runs: List of runs
+        signal_name: Signal name to look up in each run
+        operation: Unary operation (see compute_unary)
+        
+    Returns:
+        Run index -> (time, result), for runs holding non-empty data
+    """
+    # Group views by time base: [(view, [run indices])]
+    groups: List[Tuple[SignalView, List[int]]] = []
+    for run_idx, run in enumerate(runs):
+        view = run.get_signal_view(signal_name)
+        if view is None or len(view) == 0:
+            continue
+        for base, members in groups:
+            if base.time_shift == view.time_shift and (
+                base.time is view.time or (len(base.time) == len(view.time) and np.array_equal(base.time, view.time))
+            ):
+                members.append(run_idx)
+                break
+        else:
+            groups.append((view, [run_idx]))
+    
+    results = {}
+    for base, members in groups:
+        time = base.resolve_time()
+        rows_per_block = max(1, UNARY_BATCH_ELEMENTS // len(time))
+        for start in range(0, len(members), rows_per_block):
+            block = members[start:start + rows_per_block]
+            if len(block) > 1:
+                stacked = np.stack([runs[i].signals[signal_name].data for i in block])
+            else:
+                stacked = runs[block[0]].signals[signal_name].data[None, :]  # No copy
+            result_time, result = compute_unary(time, stacked, operation)
+            for row, run_idx in enumerate(block):
+                results[run_idx] = (result_time, result[row])
+    
+    return results
+
+
+def compute_binary(
+    time_a: np.ndarray,
+    data_a: np.ndarray,
+    time_b: np.ndarray,
+    data_b: np.ndarray,
+    operation: str,
+    alignment: str = "linear",
+    base: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply a binary operation (operations panel names) to two signals.
+    
+    Args:
+        time_a, data_a: Signal A
+        time_b, data_b: Signal B
+        operation: "add", "subtract", "multiply", "divide" or "abs_diff"
+        alignment: "linear" or "nearest"
+        base: 0 or 1 to force A's or B's time base (default: the denser one)
+        
+    Returns:
+        Tuple of (time, result)
+    """
+    method = AlignmentMethod.NEAREST if alignment == "nearest" else AlignmentMethod.LINEAR
+    if base is None:
+        result_time, a, b = _align_signals(time_a, data_a, time_b, data_b, method)
+    elif base == 0:
+        result_time, a = time_a, data_a
+        b = _align_to(time_a, time_b, data_b, method)
+    else:
+        result_time, b = time_b, data_b
+        a = _align_to(time_b, time_a, data_a, method)
+    
+    if operation == "add":
+        result = a + b
+    elif operation == "subtract":
+        result = a - b
+    elif operation == "multiply":
+        result = a * b
+    elif operation == "divide":
+        result = a / np.where(b != 0, b, 1)
+    elif operation == "abs_diff":
+        result = np.abs(a - b)
+    else:
+        result = a
+    return result_time, result
+
+
+def compute_multi(
+    sources: List[Tuple[np.ndarray, np.ndarray]],
+    operation: str,
+    alignment: str = "linear",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply a multi-signal operation on the first signal's time base.
+    
+    Args:
+        sources: List of (time, data)
+        operation: "norm", "mean", "max", "min" or "sum" (else first signal)
+        alignment: "linear" or "nearest"
+        
+    Returns:
+        Tuple of (time, result)
+    """
+    method = AlignmentMethod.NEAREST if alignment == "nearest" else AlignmentMethod.LINEAR
+    result_time = sources[0][0]
+    stacked = np.vstack([_align_to(result_time, t, d, method) for t, d in sources])
+    
+    if operation == "norm":
+        result = np.sqrt(np.sum(stacked**2, axis=0))
+    elif operation == "mean":
+        result = np.mean(stacked, axis=0)
+    elif operation == "max":
+        result = np.max(stacked, axis=0)
+    elif operation == "min":
+        result = np.min(stacked, axis=0)
+    elif operation == "sum":
+        result = np.sum(stacked, axis=0)
+    else:
+        result = stacked[0]
+    return result_time, result
+
+
+def _align_to(
+    base_time: np.ndarray,
+    time: np.ndarray,
+    data: np.ndarray,
+    method: AlignmentMethod,
+) -> np.ndarray:
+    """Resample one signal onto a time base (no-op when it is already on it)"""
+    return resample(time, data, base_time, method)
+
+
 # =============================================================================
 # FFT ANALYSIS
 # =============================================================================
 
+# FFT settings
+FFT_CACHE_BYTES = 128 * 1024 * 1024     # Memoised spectra (LRU by size)
+WINDOW_CACHE_BYTES = 64 * 1024 * 1024   # Cached window arrays (LRU by size)
+
+_fft_cache: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_fft_cache_bytes = 0
+_fft_lock = threading.Lock()
+
+_window_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_window_cache_bytes = 0
+_window_lock = threading.Lock()
+
+
+def clear_fft_cache():
+    """Drop all memoised spectra"""
+    global _fft_cache_bytes
+    with _fft_lock:
+        _fft_cache.clear()
+        _fft_cache_bytes = 0
+
+
+def get_window(window: str, n: int) -> np.ndarray:
+    """Get a (cached, read-only) window of length n"""
+    global _window_cache_bytes
+    key = (window, n)
+    with _window_lock:
+        win = _window_cache.get(key)
+        if win is not None:
+            _window_cache.move_to_end(key)
+            return win
+    
+    if window == "hanning":
+        win = np.hanning(n)
+    elif window == "hamming":
+        win = np.hamming(n)
+    elif window == "blackman":
+        win = np.blackman(n)
+    else:
+        win = np.ones(n)
+    win.flags.writeable = False
+    
+    if win.nbytes <= WINDOW_CACHE_BYTES:
+        with _window_lock:
+            if key not in _window_cache:
+                _window_cache[key] = win
+                _window_cache_bytes += win.nbytes
+            while _window_cache_bytes > WINDOW_CACHE_BYTES:
+                _window_cache_bytes -= _window_cache.popitem(last=False)[1].nbytes
+    return win
+
+
+def fast_fft_length(n: int) -> int:
+    """Smallest 5-smooth length (2^a * 3^b * 5^c) >= n, where FFTs are fastest"""
+    if n <= 6:
+        return max(int(n), 1)
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            quotient = -(-n // p35)
+            best = min(best, p35 << (quotient - 1).bit_length())
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
 def compute_fft(
     time: np.ndarray,
     data: np.ndarray,
-    window: str = "hanning"
+    window: str = "hanning",
+    pad: bool = False,
+    cache_key: Optional[Any] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compute FFT of signal.
     
+    Jittered time bases are resampled onto a uniform grid first (ops.resample).
+    
     Args:
         time: Time array
         data: Signal data
         window: Window function ("hanning", "hamming", "blackman", "none")
+        pad: Zero-pad to the next 5-smooth length (finer bins, and avoids
+            NumPy's slow path for lengths with large prime factors)
+        cache_key: Hashable identity of (time, data); results are memoised
+            under it with the settings (read-only). None disables caching.
         
     Returns:
         (frequencies, magnitudes) arrays
@@ -455,63 +700,358 @@ def compute_fft(
     if len(data) < 2:
         return np.array([]), np.array([])
     
-    # Calculate sampling frequency from time array
-    dt = np.mean(np.diff(time))
-    if dt <= 0:
-        return np.array([]), np.array([])
+    key = (cache_key, "fft", window, bool(pad)) if cache_key is not None else None
+    cached = _fft_memo_get(key)
+    if cached is not None:
+        return cached
     
-    fs = 1.0 / dt  # Sampling frequency
+    time, data = to_uniform(time, data)
     n = len(data)
+    if n < 2:
+        return np.array([]), np.array([])
+    dt = (time[-1] - time[0]) / (n - 1)
+    n_fft = fast_fft_length(n) if pad else n
     
-    # Remove DC component (mean)
-    data_centered = data - np.mean(data)
-    
-    # Apply window function
-    if window == "hanning":
-        win = np.hanning(n)
-    elif window == "hamming":
-        win = np.hamming(n)
-    elif window == "blackman":
-        win = np.blackman(n)
-    else:
-        win = np.ones(n)
-    
-    windowed_data = data_centered * win
+    # Remove DC component (mean) and apply window function
+    win = get_window(window, n)
+    windowed_data = (data - np.mean(data)) * win
     
     # Compute FFT (real input)
-    fft_result = np.fft.rfft(windowed_data)
-    freqs = np.fft.rfftfreq(n, dt)
+    fft_result = np.fft.rfft(windowed_data, n=n_fft)
+    freqs = np.fft.rfftfreq(n_fft, dt)
     
-    # Calculate magnitude (normalized)
-    magnitudes = np.abs(fft_result) * 2.0 / np.sum(win)
+    # Calculate magnitude (normalized; zero padding does not change it)
+    magnitudes = np.abs(fft_result)
+    magnitudes *= 2.0 / np.sum(win)
     
     # Skip DC component (first element)
-    return freqs[1:], magnitudes[1:]
+    return _fft_memo_put(key, (freqs[1:], magnitudes[1:]))
+
+
+def _fft_memo_get(key: Optional[tuple]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Memoised (frequencies, values) for key, if any"""
+    if key is None:
+        return None
+    with _fft_lock:
+        cached = _fft_cache.get(key)
+        if cached is not None:
+            _fft_cache.move_to_end(key)
+        return cached
+
+
+def _fft_memo_put(key: Optional[tuple], result: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Memoise (frequencies, values) under key (read-only) and return it"""
+    global _fft_cache_bytes
+    nbytes = result[0].nbytes + result[1].nbytes
+    if key is None or nbytes > FFT_CACHE_BYTES:
+        return result
+    for array in result:
+        array.flags.writeable = False
+    with _fft_lock:
+        old = _fft_cache.pop(key, None)
+        if old is not None:
+            _fft_cache_bytes -= old[0].nbytes + old[1].nbytes
+        while _fft_cache and _fft_cache_bytes + nbytes > FFT_CACHE_BYTES:
+            _, (freqs, values) = _fft_cache.popitem(last=False)
+            _fft_cache_bytes -= freqs.nbytes + values.nbytes
+        _fft_cache[key] = result
+        _fft_cache_bytes += nbytes
+    return result
+
+
+# Welch settings
+PSD_DEFAULT_NPERSEG = 4096       # Default samples per Welch segment
+PSD_BLOCK_ELEMENTS = 1 << 20     # Segment samples transformed per batched FFT (bounds memory)
 
 
 def compute_psd(
     time: np.ndarray,
     data: np.ndarray,
-    window: str = "hanning"
+    window: str = "hanning",
+    nperseg: Optional[int] = PSD_DEFAULT_NPERSEG,
+    hop: Optional[int] = None,
+    average: str = "mean",
+    pad: bool = False,
+    cache_key: Optional[Any] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Compute Power Spectral Density of signal.
+    Compute Power Spectral Density of signal (Welch's method).
+    
+    The record is split into overlapping segments, each detrended (mean
+    removed) and windowed; their periodograms are averaged. Averaging
+    trades frequency resolution (fs / nperseg) for a much lower variance
+    than a single whole-record FFT, and memory is bounded by the segment
+    blocks (see _segment_power) rather than the record length.
     
     Args:
         time: Time array
         data: Signal data
         window: Window function
+        nperseg: Samples per segment (clamped to the record length;
+            None = one segment over the whole record, i.e. a periodogram)
+        hop: Samples between segment starts (None = nperseg // 2)
+        average: "mean" or "median" (robust to transients; keeps every
+            segment's spectrum in memory)
+        pad: Zero-pad segments to the next 5-smooth length
+        cache_key: Hashable identity of (time, data) for memoisation
+        
+    Returns:
+        (frequencies, psd) arrays - one-sided density in units^2/Hz,
+        without the DC bin
+    """
+    key = (cache_key, "psd", window, nperseg, hop, average, bool(pad)) if cache_key is not None else None
+    cached = _fft_memo_get(key)
+    if cached is not None:
+        return cached
+    
+    welch = _welch(time, data, window, nperseg, hop, average, pad)
+    if welch is None:
+        return np.array([]), np.array([])
+    freqs, power, win, fs = welch
+    
+    # Density scaling, doubled for the one-sided spectrum (except DC and Nyquist)
+    psd = power / (fs * np.sum(np.square(win)))
+    psd[1:] *= 2.0
+    if (len(freqs) - 1) * 2 == _welch_nfft(len(win), pad):
+        psd[-1] /= 2.0
+    return _fft_memo_put(key, (freqs[1:], psd[1:]))
+
+
+def compute_averaged_fft(
+    time: np.ndarray,
+    data: np.ndarray,
+    window: str = "hanning",
+    nperseg: int = PSD_DEFAULT_NPERSEG,
+    hop: Optional[int] = None,
+    average: str = "mean",
+    pad: bool = False,
+    cache_key: Optional[Any] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Segment-averaged magnitude spectrum (Welch segments, RMS of magnitudes).
+    
+    Normalised like compute_fft, so a steady sine of amplitude A peaks at
+    about A, but with the lower variance of averaging. The median is not
+    bias-corrected here (the correction assumes noise and would inflate
+    tones).
+    
+    Args:
+        See compute_psd
         
     Returns:
-        (frequencies, psd) arrays
+        (frequencies, magnitudes) arrays without the DC bin
     """
-    freqs, mags = compute_fft(time, data, window)
-    if len(freqs) == 0:
-        return freqs, mags
+    key = (cache_key, "avg_fft", window, nperseg, hop, average, bool(pad)) if cache_key is not None else None
+    cached = _fft_memo_get(key)
+    if cached is not None:
+        return cached
     
-    # PSD is magnitude squared
-    psd = mags ** 2
-    return freqs, psd
+    welch = _welch(time, data, window, nperseg, hop, average, pad, median_bias=False)
+    if welch is None:
+        return np.array([]), np.array([])
+    freqs, power, win, _ = welch
+    magnitudes = np.sqrt(power) * (2.0 / np.sum(win))
+    return _fft_memo_put(key, (freqs[1:], magnitudes[1:]))
+
+
+def _welch(
+    time: np.ndarray,
+    data: np.ndarray,
+    window: str,
+    nperseg: Optional[int],
+    hop: Optional[int],
+    average: str,
+    pad: bool,
+    median_bias: bool = True,
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, float]]:
+    """Averaged |rfft|^2 over segments: (frequencies, power, window, fs) or None"""
+    if len(data) < 2:
+        return None
+    time, data = to_uniform(time, data)
+    n = len(data)
+    if n < 2:
+        return None
+    fs = (n - 1) / (time[-1] - time[0])
+    
+    nperseg = n if nperseg is None else int(min(max(nperseg, 2), n))
+    hop = int(max(hop or nperseg // 2, 1))
+    n_fft = _welch_nfft(nperseg, pad)
+    win = get_window(window, nperseg)
+    power = _segment_power(data, win, hop, n_fft, average, median_bias)
+    return np.fft.rfftfreq(n_fft, 1.0 / fs), power, win, fs
+
+
+def _welch_nfft(nperseg: int, pad: bool) -> int:
+    """FFT length for a segment length (5-smooth when padding)"""
+    return fast_fft_length(nperseg) if pad else nperseg
+
+
+def _segment_power(
+    data: np.ndarray,
+    win: np.ndarray,
+    hop: int,
+    n_fft: int,
+    average: str,
+    median_bias: bool = True,
+) -> np.ndarray:
+    """
+    Mean (or median) |rfft|^2 of detrended, windowed segments.
+    
+    Segments are zero-copy strided views (sliding_window_view); at most
+    PSD_BLOCK_ELEMENTS segment samples are detrended and transformed per
+    batched rfft, so temporaries stay bounded for any record length.
+    """
+    nperseg = len(win)
+    frames = sliding_window_view(data, nperseg)[::hop]  # (n_frames, nperseg) view
+    n_frames = frames.shape[0]
+    n_bins = n_fft // 2 + 1
+    block = max(PSD_BLOCK_ELEMENTS // nperseg, 1)
+    
+    median = average == "median" and n_frames > 1
+    per_frame = np.empty((n_frames, n_bins)) if median else None
+    total = np.zeros(n_bins)
+    
+    for start in range(0, n_frames, block):
+        chunk = frames[start:start + block]
+        segs = (chunk - chunk.mean(axis=1, keepdims=True)) * win
+        spec = np.fft.rfft(segs, n=n_fft, axis=1)
+        power = np.square(spec.real) + np.square(spec.imag)
+        if median:
+            per_frame[start:start + len(chunk)] = power
+        else:
+            total += power.sum(axis=0)
+    
+    if median:
+        power = np.median(per_frame, axis=0)
+        if median_bias:
+            # Median of chi-squared periodograms is biased low; same correction as SciPy
+            pairs = 2 * np.arange(1.0, (n_frames - 1) // 2 + 1)
+            power /= 1.0 + np.sum(1.0 / (pairs + 1) - 1.0 / pairs)
+        return power
+    return total / n_frames
+
+
+# Spectrogram settings
+SPECTROGRAM_CACHE_SIZE = 16      # Cached spectrograms (LRU)
+SPECTROGRAM_MAX_FRAMES = 1000    # Time columns sent to the browser
+SPECTROGRAM_MAX_BINS = 512       # Frequency rows sent to the browser
+SPECTROGRAM_BLOCK_FRAMES = 256   # Frames transformed per FFT batch (bounds memory)
+
+_spectrogram_cache: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
+_spectrogram_lock = threading.Lock()
+
+
+def clear_spectrogram_cache():
+    """Drop all cached spectrograms"""
+    with _spectrogram_lock:
+        _spectrogram_cache.clear()
+
+
+def compute_spectrogram(
+    time: np.ndarray,
+    data: np.ndarray,
+    window: str = "hanning",
+    nperseg: int = 1024,
+    hop: Optional[int] = None,
+    cache_key: Optional[Any] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute a short-time Fourier transform magnitude spectrogram.
+    
+    Frames are zero-copy strided views of the data (sliding_window_view),
+    transformed in blocks of SPECTROGRAM_BLOCK_FRAMES with one batched rfft
+    each. Output is decimated to at most SPECTROGRAM_MAX_FRAMES columns and
+    SPECTROGRAM_MAX_BINS rows by averaging power, so it can be sent as a
+    heatmap directly.
+    
+    Args:
+        time: Time array (jittered time bases are resampled to uniform)
+        data: Signal data
+        window: Window function ("hanning", "hamming", "blackman", "none")
+        nperseg: Samples per segment (clamped to the signal length)
+        hop: Samples between segment starts (None = nperseg // 2)
+        cache_key: Hashable identity of (time, data); results are cached
+            under it with the settings. None disables caching.
+        
+    Returns:
+        (frame_times, frequencies, magnitudes) with magnitudes shaped
+        (n_freqs, n_frames), normalised like compute_fft. Empty on failure.
+    """
+    empty = (np.array([]), np.array([]), np.empty((0, 0)))
+    n = len(data)
+    if n < 16:
+        return empty
+    
+    nperseg = int(min(max(nperseg, 16), n))
+    hop = int(max(hop or nperseg // 2, 1))
+    
+    key = None
+    if cache_key is not None:
+        key = (cache_key, window, nperseg, hop)
+        with _spectrogram_lock:
+            cached = _spectrogram_cache.get(key)
+            if cached is not None:
+                _spectrogram_cache.move_to_end(key)
+                return cached
+    
+    time, data = to_uniform(time, data)
+    if len(time) < nperseg:
+        return empty
+    dt = (time[-1] - time[0]) / (len(time) - 1)
+    
+    win = get_window(window, nperseg)
+    norm = 2.0 / np.sum(win)
+    frames = sliding_window_view(data, nperseg)[::hop]  # (n_frames, nperseg) view
+    n_frames = frames.shape[0]
+    
+    # Decimation factors: average power over groups of frames / frequency bins
+    n_bins = nperseg // 2 + 1
+    frame_group = -(-n_frames // SPECTROGRAM_MAX_FRAMES)
+    bin_group = -(-n_bins // SPECTROGRAM_MAX_BINS)
+    # Block size a multiple of the frame group so groups never straddle blocks
+    block = max(SPECTROGRAM_BLOCK_FRAMES // frame_group, 1) * frame_group
+    
+    n_cols = -(-n_frames // frame_group)
+    n_rows = -(-n_bins // bin_group)
+    power = np.empty((n_cols, n_rows))
+    
+    for start in range(0, n_frames, block):
+        chunk = frames[start:start + block]
+        # Remove each frame's mean, apply window, one batched FFT per block
+        segs = (chunk - chunk.mean(axis=1, keepdims=True)) * win
+        spec = np.abs(np.fft.rfft(segs, axis=1)) * norm
+        spec **= 2
+        power[start // frame_group:(start + len(chunk) - 1) // frame_group + 1] = _group_mean_2d(
+            spec, frame_group, bin_group
+        )
+    
+    # Frame centre times and (group-averaged) frequencies
+    centres = np.arange(n_frames) * hop + nperseg // 2
+    frame_times = _group_mean(time[centres], frame_group)
+    freqs = _group_mean(np.fft.rfftfreq(nperseg, dt), bin_group)
+    magnitudes = np.sqrt(power).T
+    
+    result = (frame_times, freqs, magnitudes)
+    if key is not None:
+        with _spectrogram_lock:
+            _spectrogram_cache[key] = result
+            while len(_spectrogram_cache) > SPECTROGRAM_CACHE_SIZE:
+                _spectrogram_cache.popitem(last=False)
+    return result
+
+
+def _group_mean(values: np.ndarray, group: int) -> np.ndarray:
+    """Mean over consecutive groups of `group` entries along axis 0 (last group may be short)"""
+    if group <= 1:
+        return values
+    idx = np.arange(0, len(values), group)
+    counts = np.diff(np.append(idx, len(values))).reshape((-1,) + (1,) * (values.ndim - 1))
+    return np.add.reduceat(values, idx, axis=0) / counts
+
+
+def _group_mean_2d(values: np.ndarray, row_group: int, col_group: int) -> np.ndarray:
+    """Mean over row groups and column groups of a 2D array"""
+    return _group_mean(_group_mean(values, row_group).T, col_group).T
 
 
 # =============================================================================
@@ -523,68 +1063,85 @@ def apply_filter(
     data: np.ndarray,
     filter_type: str,
     cutoff: float,
-    order: int = 4
+    order: int = 4,
+    method: str = "box",
 ) -> np.ndarray:
     """
     Apply digital filter to signal.
     
+    All filters are O(n) regardless of cutoff/window (see ops.filters).
+    Jittered time bases are filtered on a uniform grid at the median
+    sample interval and mapped back onto the original times.
+    
     Args:
         time: Time array (used to determine sampling frequency)
-        data: Signal data
-        filter_type: "lowpass", "highpass", "bandpass", "bandstop"
+        data: Signal data (n,) or stacked signals (rows, n)
+        filter_type: "lowpass", "highpass", "moving_avg", or with
+                     method="butterworth" also "bandpass"/"bandstop"
         cutoff: Cutoff frequency (Hz) or [low, high] for bandpass/bandstop
-        order: Filter order (default 4)
+                (window size in samples for moving_avg)
+        order: Filter order (Butterworth only, default 4)
+        method: "box" - moving-average approximation (window = fs / (2 * cutoff))
+                "butterworth" - zero-phase Butterworth of the given order
         
     Returns:
         Filtered data array
     """
-    if len(data) < order * 3:
+    if data.shape[-1] < order * 3:
         return data  # Not enough data for filtering
     
-    # Calculate sampling frequency
-    dt = np.mean(np.diff(time))
-    if dt <= 0:
+    try:
+        uniform_time, uniform_data = to_uniform(time, data)
+        if len(uniform_time) < order * 3:
+            return data
+        fs = 1.0 / ((uniform_time[-1] - uniform_time[0]) / (len(uniform_time) - 1))
+        filtered = _filter_uniform(uniform_data, fs, filter_type, cutoff, order, method)
+        return from_uniform(uniform_time, filtered, time)
+    except Exception:
         return data
-    
-    fs = 1.0 / dt
+
+
+def _filter_uniform(
+    data: np.ndarray,
+    fs: float,
+    filter_type: str,
+    cutoff: float,
+    order: int,
+    method: str,
+) -> np.ndarray:
+    """apply_filter on uniformly sampled data at rate fs"""
     nyq = fs / 2.0
     
-    # Normalize cutoff to Nyquist frequency
-    if isinstance(cutoff, (list, tuple)):
-        # Bandpass/bandstop
-        wn = [c / nyq for c in cutoff]
-        wn = [max(0.001, min(0.999, w)) for w in wn]
+    if method == "butterworth" and filter_type != "moving_avg":
+        # Keep cutoffs strictly inside (0, Nyquist)
+        clamp = lambda c: max(1e-6 * nyq, min(0.999 * nyq, c))
+        if filter_type in ("lowpass", "highpass"):
+            return sosfiltfilt(butterworth_sos(order, clamp(cutoff), fs, filter_type), data)
+        low, high = sorted(clamp(c) for c in cutoff)
+        lowpassed = sosfiltfilt(butterworth_sos(order, high, fs, "lowpass"), data)
+        if filter_type == "bandpass":
+            return sosfiltfilt(butterworth_sos(order, low, fs, "highpass"), lowpassed)
+        if filter_type == "bandstop":
+            # Zero-phase paths, so the two bands add without phase cancellation
+            return sosfiltfilt(butterworth_sos(order, low, fs, "lowpass"), data) + data - lowpassed
+        return data
+    
+    if filter_type == "lowpass":
+        # Simple low-pass: moving average
+        window_size = max(3, int(fs / (cutoff * 2)))
+        filtered = moving_average(data, window_size)
+    elif filter_type == "highpass":
+        # High-pass: original minus low-pass
+        window_size = max(3, int(fs / (cutoff * 2)))
+        filtered = data - moving_average(data, window_size)
+    elif filter_type == "moving_avg":
+        # Simple moving average
+        window_size = max(3, int(cutoff))  # cutoff as window size
+        filtered = moving_average(data, window_size)
     else:
-        wn = cutoff / nyq
-        wn = max(0.001, min(0.999, wn))
+        filtered = data
     
-    try:
-        # Use simple IIR filter (Butterworth)
-        # Implement manually to avoid scipy dependency
-        # For now, use moving average as fallback
-        if filter_type == "lowpass":
-            # Simple low-pass: moving average
-            window_size = max(3, int(fs / (cutoff * 2)))
-            kernel = np.ones(window_size) / window_size
-            filtered = np.convolve(data, kernel, mode='same')
-        elif filter_type == "highpass":
-            # High-pass: original minus low-pass
-            window_size = max(3, int(fs / (cutoff * 2)))
-            kernel = np.ones(window_size) / window_size
-            lowpass = np.convolve(data, kernel, mode='same')
-            filtered = data - lowpass
-        elif filter_type == "moving_avg":
-            # Simple moving average
-            window_size = max(3, int(cutoff))  # cutoff as window size
-            kernel = np.ones(window_size) / window_size
-            filtered = np.convolve(data, kernel, mode='same')
-        else:
-            filtered = data
-        
-        return filtered
-        
-    except Exception:
-        return data
+    return filtered
 
 
 def create_filtered_signal(
@@ -639,38 +1196,154 @@ def compute_signal_stats(
     Compute statistics for a signal (or region of signal).
     
     Args:
-        time: Time array
+        time: Time array (ascending)
         data: Signal data
         t_start: Start time for region (None = beginning)
         t_end: End time for region (None = end)
         
     Returns:
-        Dict with statistics: min, max, mean, std, rms, peak_to_peak, samples
+        Dict with statistics: min, max, mean, std, rms, peak_to_peak, samples, duration
     """
     if len(data) == 0:
         return {}
     
-    # Apply time region filter if specified
-    if t_start is not None or t_end is not None:
-        mask = np.ones(len(time), dtype=bool)
-        if t_start is not None:
-            mask &= (time >= t_start)
-        if t_end is not None:
-            mask &= (time <= t_end)
-        data = data[mask]
-        time = time[mask]
+    # Region located by binary search (time must be ascending)
+    return compute_view_stats(SignalView(time, data), t_start, t_end)
+
+
+def compute_view_stats(
+    view: SignalView,
+    t_start: Optional[float] = None,
+    t_end: Optional[float] = None,
+) -> Dict[str, float]:
+    """
+    Compute statistics of a signal view's displayed values.
     
-    if len(data) == 0:
-        return {}
+    The region is located by binary search on the base time vector (time
+    must be ascending). Long signals are answered from a cached prefix-sum /
+    sparse-table index (O(1) per query after the first), short ones by a
+    direct pass over the slice. Results are mapped through the view's
+    scale/offset - no transformed copies.
+    
+    Args:
+        view: Signal view (displayed time = time + time_shift)
+        t_start: Start of region in displayed time (None = beginning)
+        t_end: End of region in displayed time (None = end)
+        
+    Returns:
+        Same dict as compute_signal_stats
+    """
+    return compute_batch_stats({"": view}, [(t_start, t_end)])[""][0]
+
+
+# Batch reductions stack rows of at most this many samples (longer rows are
+# reduced one at a time, which is cache-friendlier than a large 2D block)
+BATCH_STACK_MAX_SAMPLES = 4096
+BATCH_STACK_BLOCK_ELEMENTS = 131_072  # Elements per stacked block (~1 MB, stays in cache)
+
+
+def compute_batch_stats(
+    views: Dict[str, SignalView],
+    regions: Optional[List[Tuple[Optional[float], Optional[float]]]] = None,
+) -> Dict[str, List[Dict[str, float]]]:
+    """
+    Compute statistics for many signals over one or more regions at once.
+    
+    Signals are grouped by shared time base (same time array and shift), so
+    each region is located once per group. Within a group, short signals are
+    stacked into a 2D array and reduced along rows in single vectorised
+    calls; long signals use their cached region index.
+    
+    Args:
+        views: Signal key -> signal view (displayed values)
+        regions: List of (t_start, t_end) in displayed time; None bounds mean
+                 the data start/end. Default: one full-range region.
+        
+    Returns:
+        Signal key -> list with one stats dict per region (same keys as
+        compute_signal_stats; empty dict where the region holds no samples)
+    """
+    regions = regions or [(None, None)]
+    results = {key: [{} for _ in regions] for key in views}
+    
+    groups: Dict[Tuple[int, float], List[str]] = {}
+    for key, view in views.items():
+        if view is not None and len(view) > 0:
+            groups.setdefault((id(view.time), view.time_shift), []).append(key)
+    
+    for keys in groups.values():
+        first = views[keys[0]]
+        datas = [views[k].data for k in keys]
+        indexes = [get_region_index(d) for d in datas]
+        scale = np.array([views[k].scale for k in keys], dtype=float)
+        offset = np.array([views[k].offset for k in keys], dtype=float)
+        
+        for r, (t_start, t_end) in enumerate(regions):
+            i0, i1 = first.index_range(t_start, t_end)
+            if i1 <= i0:
+                continue
+            raw = _batch_raw_stats(datas, indexes, i0, i1)
+            
+            # Map through y = scale * x + offset
+            a, b = raw["min"] * scale + offset, raw["max"] * scale + offset
+            lo, hi = np.minimum(a, b), np.maximum(a, b)
+            mean = raw["mean"]
+            # E[(a*x + b)^2] = a^2 E[x^2] + 2ab E[x] + b^2
+            mean_sq = scale * scale * raw["mean_sq"] + 2.0 * scale * offset * mean + offset * offset
+            with np.errstate(invalid="ignore"):
+                rms = np.sqrt(np.maximum(mean_sq, 0.0))
+            mean_out = mean * scale + offset
+            std_out = raw["std"] * np.abs(scale)
+            duration = float(first.time[i1 - 1] - first.time[i0]) if i1 - i0 > 1 else 0.0
+            
+            for j, key in enumerate(keys):
+                results[key][r] = {
+                    "min": float(lo[j]),
+                    "max": float(hi[j]),
+                    "mean": float(mean_out[j]),
+                    "std": float(std_out[j]),
+                    "rms": float(rms[j]),
+                    "peak_to_peak": float(hi[j] - lo[j]),
+                    "samples": int(i1 - i0),
+                    "duration": duration,
+                }
+    
+    return results
+
+
+def _batch_raw_stats(datas: List[np.ndarray], indexes: List, i0: int, i1: int) -> Dict[str, np.ndarray]:
+    """Raw min/max/mean/std/mean_sq arrays (one entry per data array) over samples [i0, i1)"""
+    k, m = len(datas), i1 - i0
+    out = {name: np.empty(k) for name in ("min", "max", "mean", "std", "mean_sq")}
+    
+    direct = []
+    for j in range(k):
+        if indexes[j] is not None:
+            stats = indexes[j].range_stats(i0, i1)
+            for name in out:
+                out[name][j] = stats[name]
+        else:
+            direct.append(j)
+    
+    if m > BATCH_STACK_MAX_SAMPLES:
+        for j in direct:
+            stats = slice_stats(datas[j][i0:i1])
+            for name in out:
+                out[name][j] = stats[name]
+        return out
+    
+    # Short rows: stack and reduce each statistic along rows in one call
+    rows_per_block = max(1, BATCH_STACK_BLOCK_ELEMENTS // m)
+    for start in range(0, len(direct), rows_per_block):
+        rows = direct[start:start + rows_per_block]
+        block = np.stack([datas[j][i0:i1] for j in rows]).astype(float, copy=False)
+        mean = block.mean(axis=1)
+        var = np.square(block - mean[:, None]).mean(axis=1)
+        out["min"][rows] = block.min(axis=1)
+        out["max"][rows] = block.max(axis=1)
+        out["mean"][rows] = mean
+        out["std"][rows] = np.sqrt(var)
+        out["mean_sq"][rows] = var + mean * mean
     
-    return {
-        "min": float(np.min(data)),
-        "max": float(np.max(data)),
-        "mean": float(np.mean(data)),
-        "std": float(np.std(data)),
-        "rms": float(np.sqrt(np.mean(data ** 2))),
-        "peak_to_peak": float(np.max(data) - np.min(data)),
-        "samples": int(len(data)),
-        "duration": float(time[-1] - time[0]) if len(time) > 1 else 0.0,
-    }
+    return out
 
@@ -0,0 +1,431 @@
+"""
+Signal Viewer Pro - Event Detection
+====================================
+Finds events in a signal as interval tables, with vectorised diff/sign
+logic (no per-sample Python loops):
+
+- crossings: times a signal crosses a level (rising/falling), with
+  optional hysteresis and sub-sample (linearly interpolated) times
+- edges: value changes of a state channel
+- dwells: runs of constant value of a state channel (optionally only one
+  value), with a minimum duration
+- band violations: intervals outside [low, high], with a minimum duration
+
+Every detector returns an EventTable: one row per event with start/end
+times (equal for point events), the sample indices spanned, the marker
+value and a direction. Interval events run from their first sample to
+the first sample after it (the last sample at the end of the record).
+
+detect_events works on a SignalView: the display transform is folded into
+the parameters so detection always runs on the base arrays, and tables
+are cached per (time, data, parameters, version) within EVENT_CACHE_BYTES
+(weakly referenced, see ops.weak_cache). next_event_time/prev_event_time find
+the neighbouring event of a cursor in O(log n).
+"""
+
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Any, Optional
+
+import numpy as np
+
+from core.models import SignalView
+from ops.weak_cache import WeakArrayCache
+
+
+class EventKind(Enum):
+    """Event detector"""
+    NONE = "none"
+    CROSSING = "crossing"   # Level crossings
+    EDGE = "edge"           # State value changes
+    DWELL = "dwell"         # Constant-value runs
+    BAND = "band"           # Excursions outside [low, high]
+
+
+# Total memory budget for cached event tables
+EVENT_CACHE_BYTES = 64 * 1024 * 1024
+
+_event_cache = WeakArrayCache(EVENT_CACHE_BYTES)
+
+# Dwell states within this relative distance of the requested value match
+# (absorbs round-off of the display scale/offset, e.g. 30 * 0.1 != 3.0)
+DWELL_VALUE_RTOL = 1e-9
+
+
+@dataclass(frozen=True)
+class EventSpec:
+    """Event detection parameters (hashable, part of the cache key)"""
+    kind: str = "none"              # EventKind value
+    level: Optional[float] = None   # Crossing level (default 0); dwell value filter
+    low: Optional[float] = None     # Band lower limit (None = unbounded)
+    high: Optional[float] = None    # Band upper limit (None = unbounded)
+    direction: str = "both"         # Crossings/edges: "rising", "falling" or "both"
+    hysteresis: float = 0.0         # Crossings: must pass level +/- hysteresis
+    min_duration: float = 0.0       # Dwells/band violations shorter than this are dropped
+
+
+@dataclass
+class EventTable:
+    """
+    Detected events, one row per event in time order.
+
+    value is the marker level: the crossing level, the new state (edges),
+    the held state (dwells) or the violated limit (band violations).
+    direction is +1 for rising crossings/edges and excursions above the
+    band, -1 for falling ones and excursions below, 0 for dwells.
+    """
+    start: np.ndarray        # Event (or interval start) times
+    end: np.ndarray          # Interval end times (== start for point events)
+    start_index: np.ndarray  # First sample of the event
+    end_index: np.ndarray    # Last sample of the event
+    value: np.ndarray
+    direction: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def duration(self) -> np.ndarray:
+        return self.end - self.start
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.start, self.end, self.start_index,
+                                      self.end_index, self.value, self.direction))
+
+    def select(self, keep: np.ndarray) -> "EventTable":
+        """Rows where keep is True (or at the given indices)"""
+        return EventTable(self.start[keep], self.end[keep], self.start_index[keep],
+                          self.end_index[keep], self.value[keep], self.direction[keep])
+
+
+def empty_table() -> EventTable:
+    """Table with no events"""
+    times, indices = np.array([]), np.array([], dtype=np.intp)
+    return EventTable(times, times, indices, indices, times, np.array([], dtype=np.int8))
+
+
+def find_crossings(
+    time: np.ndarray,
+    data: np.ndarray,
+    level: float = 0.0,
+    direction: str = "both",
+    hysteresis: float = 0.0,
+) -> EventTable:
+    """
+    Level crossings with sub-sample times.
+
+    A crossing is counted when the signal moves from below level - hysteresis
+    to above level + hysteresis (rising) or back (falling); samples inside
+    the hysteresis band or NaN keep the previous state, so noise around the
+    level gives one event. The time is interpolated where the signal passes
+    the threshold it switched on.
+
+    Args:
+        time: Time array (ascending)
+        data: Signal data
+        level: Crossing level
+        direction: "rising", "falling" or "both"
+        hysteresis: Half-width of the dead band around level (>= 0)
+
+    Returns:
+        EventTable of point events (start_index/end_index: first sample
+        past the threshold)
+    """
+    n = len(data)
+    if n < 2:
+        return empty_table()
+    x = np.asarray(data, dtype=float) - level
+    h = abs(float(hysteresis))
+
+    state = np.zeros(n, dtype=np.int8)
+    state[x > h] = 1
+    state[x < -h] = -1
+
+    # Forward-fill undecided samples with the last decided state
+    last = np.where(state != 0, np.arange(n), 0)
+    np.maximum.accumulate(last, out=last)
+    filled = state[last]
+
+    k = np.flatnonzero((filled[1:] != filled[:-1]) & (filled[:-1] != 0)) + 1
+    signs = filled[k]
+    if direction == "rising":
+        k, signs = k[signs > 0], signs[signs > 0]
+    elif direction == "falling":
+        k, signs = k[signs < 0], signs[signs < 0]
+
+    # Interpolate between the previous sample and the one that switched
+    x0, x1 = x[k - 1], x[k]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = (signs * h - x0) / (x1 - x0)
+    frac = np.where(np.isfinite(frac), np.clip(frac, 0.0, 1.0), 1.0)
+    t0, t1 = time[k - 1], time[k]
+    times = t0 + frac * (t1 - t0)
+
+    return EventTable(times, times, k, k, np.full(len(k), float(level)), signs)
+
+
+def find_edges(time: np.ndarray, data: np.ndarray, direction: str = "both") -> EventTable:
+    """
+    Value changes of a state channel.
+
+    Args:
+        time: Time array
+        data: State data (consecutive NaNs count as one value)
+        direction: "rising", "falling" or "both"
+
+    Returns:
+        EventTable of point events at the first sample of each new value
+        (value: the new state)
+    """
+    k = _change_points(data)
+    if len(k) == 0:
+        return empty_table()
+    new, old = data[k], data[k - 1]
+    with np.errstate(invalid="ignore"):
+        signs = np.nan_to_num(np.sign(np.asarray(new, dtype=float) - old)).astype(np.int8)
+    if direction == "rising":
+        keep = signs > 0
+    elif direction == "falling":
+        keep = signs < 0
+    else:
+        keep = slice(None)
+    k, signs = k[keep], signs[keep]
+    times = time[k]
+    return EventTable(times, times, k, k, np.asarray(data[k], dtype=float), signs)
+
+
+def find_dwells(
+    time: np.ndarray,
+    data: np.ndarray,
+    value: Optional[float] = None,
+    min_duration: float = 0.0,
+) -> EventTable:
+    """
+    Runs of constant value of a state channel.
+
+    Args:
+        time: Time array
+        data: State data
+        value: Only report runs holding this value (None = all runs)
+        min_duration: Drop runs shorter than this (seconds)
+
+    Returns:
+        EventTable of intervals (value: the held state)
+    """
+    n = len(data)
+    if n == 0:
+        return empty_table()
+    edges = _change_points(data)
+    starts = np.concatenate(([0], edges))
+    stops = np.concatenate((edges, [n]))
+    table = _intervals(time, starts, stops, np.asarray(data[starts], dtype=float),
+                       np.zeros(len(starts), dtype=np.int8))
+    keep = table.duration >= min_duration
+    if value is not None:
+        keep &= _matches_value(table.value, value)
+    return table.select(keep)
+
+
+def find_band_violations(
+    time: np.ndarray,
+    data: np.ndarray,
+    low: Optional[float] = None,
+    high: Optional[float] = None,
+    min_duration: float = 0.0,
+) -> EventTable:
+    """
+    Intervals where a signal is outside [low, high].
+
+    Args:
+        time: Time array
+        data: Signal data (NaN samples are not violations)
+        low: Lower limit (None = unbounded)
+        high: Upper limit (None = unbounded)
+        min_duration: Drop violations shorter than this (seconds)
+
+    Returns:
+        EventTable of intervals (value: the limit exceeded furthest;
+        direction: +1 above high, -1 below low)
+    """
+    n = len(data)
+    if n == 0 or (low is None and high is None):
+        return empty_table()
+    x = np.asarray(data, dtype=float)
+    above = np.zeros(n) if high is None else np.maximum(x - high, 0.0)
+    below = np.zeros(n) if low is None else np.maximum(low - x, 0.0)
+    outside = (above > 0) | (below > 0)  # NaN compares False
+
+    # Run boundaries of the violation mask
+    steps = np.diff(outside.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(steps == 1)
+    stops = np.flatnonzero(steps == -1)
+    if len(starts) == 0:
+        return empty_table()
+
+    # Largest excursion per run decides its side (gaps between runs add zeros)
+    peak_above = np.maximum.reduceat(np.nan_to_num(above), starts)
+    peak_below = np.maximum.reduceat(np.nan_to_num(below), starts)
+    signs = np.where(peak_above >= peak_below, 1, -1).astype(np.int8)
+    limits = np.where(signs > 0,
+                      np.nan if high is None else high,
+                      np.nan if low is None else low)
+    table = _intervals(time, starts, stops, limits, signs)
+    return table.select(table.duration >= min_duration)
+
+
+def detect_events(view: SignalView, spec: EventSpec, version: Any = None) -> EventTable:
+    """
+    Run the detector of spec on a signal view (cached).
+
+    Levels and limits are given in displayed units; they are mapped onto
+    the base data (scale/offset undone, sides swapped for a negative scale)
+    so the base arrays are scanned and the cache survives display changes.
+    Dwell values are matched in displayed units instead, with tolerance.
+
+    Args:
+        view: Signal view (times and values of the table are displayed ones)
+        spec: Detector and parameters
+        version: Data version of the signal (part of the cache key)
+
+    Returns:
+        EventTable (empty for EventKind.NONE or on error)
+    """
+    if spec.kind == EventKind.NONE.value or len(view.time) == 0:
+        return empty_table()
+    if view.scale == 0:
+        return empty_table()
+
+    raw_spec = _to_base_spec(spec, view.scale, view.offset)
+    table = _cached_table(view.time, view.data, raw_spec, version)
+    if table is None:
+        return empty_table()
+    if view.time_shift == 0.0 and not view.has_value_transform:
+        return table
+    shown = EventTable(
+        table.start + view.time_shift,
+        table.end + view.time_shift,
+        table.start_index,
+        table.end_index,
+        table.value * view.scale + view.offset,
+        (table.direction * np.sign(view.scale)).astype(np.int8),
+    )
+    if spec.kind == EventKind.DWELL.value and spec.level is not None and raw_spec.level is None:
+        return shown.select(_matches_value(shown.value, spec.level, view.offset))
+    return shown
+
+
+def subplot_event_spec(sp_config) -> EventSpec:
+    """EventSpec from a SubplotConfig's event_* settings"""
+    return EventSpec(
+        kind=sp_config.event_kind or EventKind.NONE.value,
+        level=sp_config.event_level,
+        low=sp_config.event_low,
+        high=sp_config.event_high,
+        direction=sp_config.event_direction or "both",
+        hysteresis=float(sp_config.event_hysteresis or 0.0),
+        min_duration=float(sp_config.event_min_duration or 0.0),
+    )
+
+
+def next_event_time(table: EventTable, t: float) -> Optional[float]:
+    """Start time of the first event after t (O(log n), None if there is none)"""
+    i = int(np.searchsorted(table.start, t + _time_tolerance(t), side="right"))
+    return float(table.start[i]) if i < len(table) else None
+
+
+def prev_event_time(table: EventTable, t: float) -> Optional[float]:
+    """Start time of the last event before t (O(log n), None if there is none)"""
+    i = int(np.searchsorted(table.start, t - _time_tolerance(t), side="left")) - 1
+    return float(table.start[i]) if i >= 0 else None
+
+
+def _time_tolerance(t: float) -> float:
+    """Times this close to the cursor count as the cursor position itself (0 for +/-inf)"""
+    return 1e-9 * max(1.0, abs(t)) if np.isfinite(t) else 0.0
+
+
+def _change_points(data: np.ndarray) -> np.ndarray:
+    """Indices k where data[k] != data[k - 1] (runs of NaN count as one value)"""
+    if len(data) < 2:
+        return np.array([], dtype=np.intp)
+    changed = data[1:] != data[:-1]
+    if np.issubdtype(np.asarray(data).dtype, np.floating):
+        nan = np.isnan(data)
+        changed &= ~(nan[1:] & nan[:-1])
+    return np.flatnonzero(changed) + 1
+
+
+def _matches_value(values: np.ndarray, value: float, offset: float = 0.0) -> np.ndarray:
+    """values equal to value up to DWELL_VALUE_RTOL (relative to the value and display offset)"""
+    return np.abs(values - value) <= DWELL_VALUE_RTOL * (abs(value) + abs(offset))
+
+
+def _intervals(
+    time: np.ndarray,
+    starts: np.ndarray,
+    stops: np.ndarray,
+    values: np.ndarray,
+    signs: np.ndarray,
+) -> EventTable:
+    """Interval table from [start, stop) sample runs"""
+    end_times = time[np.minimum(stops, len(time) - 1)]
+    return EventTable(time[starts], end_times, starts, stops - 1, values, signs)
+
+
+def _to_base_spec(spec: EventSpec, scale: float, offset: float) -> EventSpec:
+    """Spec in base data units for a view showing data * scale + offset"""
+    if scale == 1.0 and offset == 0.0:
+        return spec
+    to_base = lambda v: None if v is None else (v - offset) / scale
+    low, high = to_base(spec.low), to_base(spec.high)
+    direction = spec.direction
+    if scale < 0:
+        low, high = high, low
+        direction = {"rising": "falling", "falling": "rising"}.get(direction, direction)
+    # Dwell values are matched after mapping the table back (detect_events):
+    # a mapped level would rarely equal the stored state exactly
+    level = None if spec.kind == EventKind.DWELL.value else to_base(spec.level)
+    return replace(
+        spec,
+        level=level,
+        low=low,
+        high=high,
+        direction=direction,
+        hysteresis=spec.hysteresis / abs(scale),
+    )
+
+
+def _detect(time: np.ndarray, data: np.ndarray, spec: EventSpec) -> EventTable:
+    """Uncached detection on base arrays"""
+    if spec.kind == EventKind.CROSSING.value:
+        level = spec.level if spec.level is not None else 0.0
+        return find_crossings(time, data, level, spec.direction, spec.hysteresis)
+    if spec.kind == EventKind.EDGE.value:
+        return find_edges(time, data, spec.direction)
+    if spec.kind == EventKind.DWELL.value:
+        return find_dwells(time, data, spec.level, spec.min_duration)
+    if spec.kind == EventKind.BAND.value:
+        return find_band_violations(time, data, spec.low, spec.high, spec.min_duration)
+    return empty_table()
+
+
+def _cached_table(time: np.ndarray, data: np.ndarray, spec: EventSpec, version: Any) -> Optional[EventTable]:
+    """Event table for base arrays, from the cache or freshly detected"""
+    key = (id(time), id(data), spec, version)
+    cached = _event_cache.get(key, (time, data))
+    if cached is not None:
+        return cached
+
+    try:
+        table = _detect(time, data, spec)
+    except Exception as e:
+        print(f"[EVENTS] Detection failed ({spec.kind}): {e}", flush=True)
+        return None
+    _event_cache.put(key, (time, data), table, table.nbytes)
+    return table
+
+
+def clear_event_cache():
+    """Drop all cached event tables"""
+    _event_cache.clear()
@@ -0,0 +1,298 @@
+"""
+Signal Viewer Pro - Expression Engine
+======================================
+Vectorised formulas over signals and constants, e.g.
+
+    sqrt(A^2 + B^2) * 9.81 - 0.5
+    {0:speed} * 3.6 - {-1:speed_ref}
+
+- A, B, C, ... are the selected input signals in order; {run:signal}
+  references any signal key directly
+- All inputs are aligned to one common time base (the densest input)
+- Formulas are parsed with Python's ast against a whitelist (never eval'd)
+- Common subexpressions are computed once and constant subtrees folded
+- Evaluation runs in chunks with in-place NumPy ufuncs on a small pool of
+  reused chunk-sized buffers, so temporaries stay bounded regardless of
+  record length (inputs are aligned chunk by chunk as well)
+
+Division by zero and invalid math give inf/NaN, as in NumPy.
+"""
+
+import ast
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+EXPR_CHUNK_SAMPLES = 65_536  # Samples per evaluation chunk (bounds temporaries)
+
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+    ast.Mod: np.mod,
+}
+
+_COMPARE_OPS = {
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+_FUNCTIONS = {
+    "sqrt": np.sqrt, "abs": np.absolute, "exp": np.exp, "log": np.log, "log10": np.log10,
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "sign": np.sign, "floor": np.floor, "ceil": np.ceil,
+    "atan2": np.arctan2, "hypot": np.hypot, "min": np.minimum, "max": np.maximum,
+}
+
+_CONSTANTS = {"pi": np.pi, "e": np.e}
+
+_REF_PATTERN = re.compile(r"\{([^{}]+)\}")
+_VARIABLE_PATTERN = re.compile(r"^[A-Z]$")
+
+
+class CompiledExpression:
+    """
+    A formula compiled to a linear program over chunk buffers.
+
+    Each instruction is (ufunc, out_slot, args) where args are
+    ("in", input index), ("const", value) or ("buf", slot); out_slot -1
+    writes into the output array. Slots are reused once their value is
+    no longer needed, so n_slots is usually far below the node count.
+    """
+
+    def __init__(self, text: str, n_inputs: int, program: List[tuple], n_slots: int, result: tuple):
+        self.text = text
+        self.n_inputs = n_inputs
+        self.program = program
+        self.n_slots = n_slots
+        self.result = result  # ("in", i) / ("const", v) when there is no program
+
+    def evaluate(self, inputs: List, n: int) -> np.ndarray:
+        """
+        Evaluate over n samples.
+
+        Args:
+            inputs: One callable per input: (start, stop) -> float chunk
+            n: Output length
+
+        Returns:
+            Result array (float64)
+        """
+        out = np.empty(n)
+        if not self.program:
+            kind, value = self.result
+            if kind == "const":
+                out.fill(value)
+            else:
+                for start in range(0, n, EXPR_CHUNK_SAMPLES):
+                    stop = min(n, start + EXPR_CHUNK_SAMPLES)
+                    out[start:stop] = inputs[value](start, stop)
+            return out
+
+        buffers = [np.empty(min(n, EXPR_CHUNK_SAMPLES)) for _ in range(self.n_slots)]
+        with np.errstate(all="ignore"):
+            for start in range(0, n, EXPR_CHUNK_SAMPLES):
+                stop = min(n, start + EXPR_CHUNK_SAMPLES)
+                m = stop - start
+                chunks = {}
+                for func, slot, args in self.program:
+                    values = []
+                    for kind, value in args:
+                        if kind == "in":
+                            if value not in chunks:
+                                chunks[value] = inputs[value](start, stop)  # Aligned once per chunk
+                            values.append(chunks[value])
+                        elif kind == "buf":
+                            values.append(buffers[value][:m])
+                        else:
+                            values.append(value)
+                    func(*values, out=out[start:stop] if slot < 0 else buffers[slot][:m])
+        return out
+
+
+@lru_cache(maxsize=64)
+def compile_expression(text: str, keys: Tuple[Optional[str], ...]) -> CompiledExpression:
+    """
+    Parse and compile a formula.
+
+    Args:
+        text: Formula ("^" is power; A, B, ... and {key} reference inputs)
+        keys: Signal key of each input (A = keys[0], ...); None for inputs
+              that can only be referenced by letter
+
+    Returns:
+        CompiledExpression
+
+    Raises:
+        ValueError: Syntax errors, unknown names/functions, unknown keys
+    """
+    source = _REF_PATTERN.sub(lambda m: f"__ref_{_ref_index(keys, m.group(1).strip())}", text)
+    source = source.replace("^", "**")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Syntax error in expression: {e.msg}") from None
+
+    nodes: List[tuple] = []            # (func, arg node ids) or ("in", i) / ("const", v)
+    node_ids: Dict[tuple, int] = {}    # Structural key -> node id (common subexpressions)
+
+    def intern(key: tuple) -> int:
+        if key not in node_ids:
+            node_ids[key] = len(nodes)
+            nodes.append(key)
+        return node_ids[key]
+
+    def apply(func, args: List[int]) -> int:
+        leaves = [nodes[a] for a in args]
+        if all(leaf[0] == "const" for leaf in leaves):
+            with np.errstate(all="ignore"):
+                return intern(("const", float(func(*[leaf[1] for leaf in leaves]))))  # Constant folding
+        return intern(("op", func, tuple(args)))
+
+    def visit(node) -> int:
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return intern(("const", float(node.value)))
+        if isinstance(node, ast.Name):
+            if node.id.startswith("__ref_"):
+                return intern(("in", int(node.id[len("__ref_"):])))
+            if _VARIABLE_PATTERN.match(node.id):
+                index = ord(node.id) - ord("A")
+                if index >= len(keys):
+                    raise ValueError(f"'{node.id}' has no signal (only {len(keys)} selected)")
+                return intern(("in", index))
+            if node.id in _CONSTANTS:
+                return intern(("const", _CONSTANTS[node.id]))
+            raise ValueError(f"Unknown name '{node.id}'")
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            return apply(_BINARY_OPS[type(node.op)], [visit(node.left), visit(node.right)])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = visit(node.operand)
+            return apply(np.negative, [operand]) if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARE_OPS:
+            return apply(_COMPARE_OPS[type(node.ops[0])], [visit(node.left), visit(node.comparators[0])])
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            func = _FUNCTIONS.get(node.func.id)
+            if func is None:
+                raise ValueError(f"Unknown function '{node.func.id}'")
+            if len(node.args) != func.nin:
+                raise ValueError(f"{node.func.id}() takes {func.nin} argument(s)")
+            return apply(func, [visit(arg) for arg in node.args])
+        raise ValueError(f"Unsupported syntax: {ast.dump(node)[:40]}")
+
+    root = visit(tree)
+    if nodes[root][0] != "op":
+        return CompiledExpression(text, len(keys), [], 0, nodes[root])
+
+    # Only ops reachable from the root, in evaluation (post) order
+    order, seen = [], set()
+
+    def collect(node_id: int):
+        if node_id in seen or nodes[node_id][0] != "op":
+            return
+        seen.add(node_id)
+        for arg in nodes[node_id][2]:
+            collect(arg)
+        order.append(node_id)
+
+    collect(root)
+
+    last_use = {}
+    for step, node_id in enumerate(order):
+        for arg in nodes[node_id][2]:
+            last_use[arg] = step
+
+    # Register allocation: a buffer is free once its value's last reader ran
+    program, slot_of, free, n_slots = [], {}, [], 0
+    for step, node_id in enumerate(order):
+        _, func, args = nodes[node_id]
+        arg_refs = []
+        for arg in args:
+            leaf = nodes[arg]
+            arg_refs.append(("buf", slot_of[arg]) if leaf[0] == "op" else leaf)
+        for arg in set(args):
+            if nodes[arg][0] == "op" and last_use[arg] == step:
+                free.append(slot_of[arg])  # Output may overwrite it in place
+        if node_id == root:
+            slot = -1
+        elif free:
+            slot = free.pop()
+        else:
+            slot, n_slots = n_slots, n_slots + 1
+        slot_of[node_id] = slot
+        program.append((func, slot, tuple(arg_refs)))
+
+    return CompiledExpression(text, len(keys), program, n_slots, ("op", root))
+
+
+def _ref_index(keys: Tuple[Optional[str], ...], key: str) -> int:
+    if key not in keys:
+        raise ValueError(f"Signal '{key}' is not an input of this expression")
+    return keys.index(key)
+
+
+def expression_refs(text: str) -> List[str]:
+    """Signal keys referenced as {key} in a formula, in order of appearance"""
+    refs = []
+    for match in _REF_PATTERN.finditer(text):
+        key = match.group(1).strip()
+        if key not in refs:
+            refs.append(key)
+    return refs
+
+
+def evaluate_expression(
+    text: str,
+    sources: List[Tuple[np.ndarray, np.ndarray]],
+    keys: Optional[List[Optional[str]]] = None,
+    alignment: str = "linear",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate a formula over signals on a common time base.
+
+    Args:
+        text: Formula (see module docstring)
+        sources: (time, data) per input, in the order A, B, ...
+        keys: Signal key per input (for {key} references)
+        alignment: "linear" or "nearest" resampling onto the common base
+
+    Returns:
+        Tuple of (time, result) on the densest input's time base
+
+    Raises:
+        ValueError: Invalid formula or no inputs
+    """
+    if not sources:
+        raise ValueError("Expression needs at least one signal")
+    keys = tuple(keys) if keys is not None else (None,) * len(sources)
+    compiled = compile_expression(text, keys)
+
+    base = max(range(len(sources)), key=lambda i: len(sources[i][0]))
+    base_time = sources[base][0]
+    inputs = [_chunk_reader(base_time, t, d, alignment) for t, d in sources]
+    return base_time, compiled.evaluate(inputs, len(base_time))
+
+
+def _chunk_reader(base_time: np.ndarray, time: np.ndarray, data: np.ndarray, alignment: str):
+    """(start, stop) -> float chunk of one input on the base time (resampled per chunk)"""
+    same_base = time is base_time or (len(time) == len(base_time) and np.array_equal(time, base_time))
+    if same_base:
+        return lambda start, stop: np.asarray(data[start:stop], dtype=float)
+    if alignment == "nearest":
+        def read(start, stop):
+            indices = np.clip(np.searchsorted(time, base_time[start:stop]), 0, len(data) - 1)
+            return np.asarray(data[indices], dtype=float)
+        return read
+    return lambda start, stop: np.interp(base_time[start:stop], time, data)
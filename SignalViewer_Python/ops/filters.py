@@ -0,0 +1,260 @@
+"""
+Signal Viewer Pro - Filters
+============================
+O(n) filter kernels in NumPy (no SciPy dependency):
+
+- moving_average: centred box filter from a prefix sum, cost independent
+  of the window length (same output as np.convolve(x, ones(w)/w, 'same'))
+- running_rms: square root of the moving average of x^2
+- butterworth_sos: Butterworth low/high-pass design as second-order sections
+- sosfilt / sosfiltfilt: biquad cascade, causal or zero-phase
+  (forward-backward with odd-extension padding, like SciPy's sosfiltfilt)
+
+All kernels filter along the last axis, so a stack of signals sharing a
+time base (rows of a 2D array) is filtered in one call.
+
+IIR recursions are evaluated block-wise: the zero-state response of each
+block of IIR_BLOCK samples is one matrix product with the section's
+impulse response, and only the two-sample state is carried from block to
+block in Python. Cost is O(n * IIR_BLOCK) flops in BLAS, i.e. linear in n.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+IIR_BLOCK = 256  # Samples per block in the block-recursive IIR evaluation
+
+
+def moving_average(data: np.ndarray, window: int) -> np.ndarray:
+    """
+    Centred moving average with zero padding at the edges.
+
+    Matches np.convolve(data, np.ones(window) / window, mode='same') for
+    window <= len(data), in O(n) for any window. A NaN/inf only affects
+    the windows that contain it.
+
+    Args:
+        data: Signal data (filtered along the last axis)
+        window: Window length in samples
+
+    Returns:
+        Filtered array (same shape as data)
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.shape[-1]
+    window = max(int(window), 1)
+    if n == 0:
+        return data.copy()
+
+    # Prefix sum of the centred data limits cancellation on long records.
+    # Non-finite samples are summed as zero and counted separately, so they
+    # only affect the windows that contain them (as in np.convolve)
+    finite = np.isfinite(data)
+    all_finite = bool(finite.all())
+    clean = data if all_finite else np.where(finite, data, 0.0)
+    count = np.maximum(np.sum(finite, axis=-1, keepdims=True), 1)
+    ref = np.sum(clean, axis=-1, keepdims=True) / count
+    prefix = np.zeros(data.shape[:-1] + (n + 1,))
+    np.cumsum(np.where(finite, clean - ref, 0.0), axis=-1, out=prefix[..., 1:])
+
+    # Output i sums data[k - window + 1 .. k] with k = i + (window - 1) // 2
+    k = np.arange(n) + (window - 1) // 2
+    hi = np.minimum(k, n - 1) + 1
+    lo = np.maximum(k - window + 1, 0)
+    result = (prefix[..., hi] - prefix[..., lo] + ref * (hi - lo)) / window
+    if all_finite:
+        return result
+
+    # Windows holding +inf or -inf give that infinity, NaN (or both) give NaN
+    def in_window(bad: np.ndarray) -> np.ndarray:
+        bad_prefix = np.zeros(data.shape[:-1] + (n + 1,), dtype=np.int64)
+        np.cumsum(bad, axis=-1, out=bad_prefix[..., 1:])
+        return bad_prefix[..., hi] > bad_prefix[..., lo]
+
+    pos, neg = in_window(np.isposinf(data)), in_window(np.isneginf(data))
+    result[pos] = np.inf
+    result[neg] = -np.inf
+    result[(pos & neg) | in_window(np.isnan(data))] = np.nan
+    return result
+
+
+def running_rms(data: np.ndarray, window: int) -> np.ndarray:
+    """
+    Centred running RMS (moving average of x^2, zero padded), O(n).
+
+    Args:
+        data: Signal data (along the last axis)
+        window: Window length in samples
+
+    Returns:
+        RMS array (same shape as data)
+    """
+    mean_sq = moving_average(np.square(np.asarray(data, dtype=float)), window)
+    return np.sqrt(np.maximum(mean_sq, 0.0))
+
+
+def butterworth_sos(order: int, cutoff: float, fs: float, btype: str = "lowpass") -> np.ndarray:
+    """
+    Design a digital Butterworth filter as second-order sections.
+
+    Bilinear transform of the analog prototype with frequency prewarping,
+    so the -3 dB point lands exactly on the cutoff.
+
+    Args:
+        order: Filter order (>= 1)
+        cutoff: Cutoff frequency in Hz (0 < cutoff < fs / 2)
+        fs: Sampling frequency in Hz
+        btype: "lowpass" or "highpass"
+
+    Returns:
+        Array (n_sections, 6) of [b0, b1, b2, 1, a1, a2] rows
+    """
+    order = max(int(order), 1)
+    if not 0 < cutoff < fs / 2:
+        raise ValueError(f"Cutoff {cutoff} Hz must be between 0 and Nyquist ({fs / 2} Hz)")
+    highpass = btype == "highpass"
+
+    warped = 2.0 * fs * np.tan(np.pi * cutoff / fs)
+    k = np.arange(order)
+    prototype = np.exp(1j * np.pi * (2 * k + order + 1) / (2 * order))  # Left half-plane poles
+    analog = warped / prototype if highpass else warped * prototype
+    poles = (2.0 * fs + analog) / (2.0 * fs - analog)
+
+    sections = []
+    for p in poles[poles.imag > 1e-12]:
+        b = [1.0, 2.0, 1.0] if not highpass else [1.0, -2.0, 1.0]
+        sections.append(b + [1.0, -2.0 * p.real, abs(p) ** 2])
+    for p in poles[np.abs(poles.imag) <= 1e-12]:
+        b = [1.0, 1.0, 0.0] if not highpass else [1.0, -1.0, 0.0]
+        sections.append(b + [1.0, -p.real, 0.0])
+
+    sos = np.array(sections)
+    # Unity gain in the passband: DC for lowpass, Nyquist for highpass
+    z = -1.0 if highpass else 1.0
+    gain = (sos[:, 0] + sos[:, 1] * z + sos[:, 2]) / (sos[:, 3] + sos[:, 4] * z + sos[:, 5])
+    sos[:, :3] /= gain[:, None]
+    return sos
+
+
+def sosfilt(sos: np.ndarray, data: np.ndarray, steady_state: bool = False) -> np.ndarray:
+    """
+    Causal filtering through a cascade of second-order sections.
+
+    Args:
+        sos: Sections from butterworth_sos
+        data: Signal data (filtered along the last axis)
+        steady_state: Start each section at its steady state for a constant
+                      input equal to the first sample (avoids the start-up
+                      transient); default starts from rest
+
+    Returns:
+        Filtered array (same shape as data)
+    """
+    data = np.asarray(data, dtype=float)
+    if data.shape[-1] == 0:
+        return data.copy()
+    y = data.reshape(-1, data.shape[-1])
+    for b0, b1, b2, a0, a1, a2 in np.asarray(sos, dtype=float):
+        b0, b1, b2, a1, a2 = b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0
+        x0 = y[:, 0].copy() if steady_state else np.zeros(len(y))
+        y0 = x0 * ((b0 + b1 + b2) / (1.0 + a1 + a2))
+        y = _biquad(y, (b0, b1, b2), (a1, a2), x0, y0)
+    return y.reshape(data.shape)
+
+
+def sosfiltfilt(sos: np.ndarray, data: np.ndarray, padlen: Optional[int] = None) -> np.ndarray:
+    """
+    Zero-phase filtering: the cascade is run forward, then backward.
+
+    The signal is padded with an odd extension at both ends and each pass
+    starts from steady state, so the edges are free of start-up transients.
+    The magnitude response is the square of the filter's (-6 dB at cutoff).
+
+    Args:
+        sos: Sections from butterworth_sos
+        data: Signal data (filtered along the last axis)
+        padlen: Samples of odd extension per side (default 3 * (2 * sections + 1))
+
+    Returns:
+        Filtered array (same shape as data)
+    """
+    x = np.asarray(data, dtype=float)
+    n = x.shape[-1]
+    if padlen is None:
+        padlen = 3 * (2 * len(sos) + 1)
+    padlen = min(padlen, n - 1) if n > 1 else 0
+
+    if padlen > 0:
+        x = np.concatenate((
+            2.0 * x[..., :1] - x[..., padlen:0:-1],
+            x,
+            2.0 * x[..., -1:] - x[..., -2:-padlen - 2:-1],
+        ), axis=-1)
+    y = sosfilt(sos, x, steady_state=True)
+    y = sosfilt(sos, y[..., ::-1], steady_state=True)[..., ::-1]
+    return y[..., padlen:padlen + n] if padlen > 0 else y
+
+
+def _biquad(
+    x: np.ndarray,
+    b: Tuple[float, float, float],
+    a: Tuple[float, float],
+    x_init: np.ndarray,
+    y_init: np.ndarray,
+) -> np.ndarray:
+    """
+    One section over the rows of x (rows, n):
+    y[k] = b0 x[k] + b1 x[k-1] + b2 x[k-2] - a1 y[k-1] - a2 y[k-2].
+
+    x_init / y_init give x[-1] = x[-2] / y[-1] = y[-2] per row.
+    """
+    rows, n = x.shape
+    b0, b1, b2 = b
+    a1, a2 = a
+
+    # FIR (numerator) part, vectorised
+    x_prev = np.concatenate((np.repeat(x_init[:, None], 2, axis=1), x), axis=1)
+    w = b0 * x + b1 * x_prev[:, 1:-1] + b2 * x_prev[:, :-2]
+
+    # All-pole part, block-wise. h: impulse response of 1 / (1 + a1 z^-1 + a2 z^-2)
+    block = max(min(IIR_BLOCK, n), 2)  # Padding past n never affects earlier outputs
+    h = np.empty(block + 1)
+    h[0], prev1, prev2 = 1.0, 1.0, 0.0
+    for i in range(1, block + 1):
+        h[i] = -a1 * prev1 - a2 * prev2
+        prev1, prev2 = h[i], prev1
+
+    # Zero-state response of every block: blocks times the lower-triangular Toeplitz of h
+    n_blocks = -(-n // block)
+    padded = np.zeros((rows, n_blocks * block))
+    padded[:, :n] = w
+    idx = np.arange(block)
+    lags = idx[:, None] - idx[None, :]
+    toeplitz = np.where(lags >= 0, h[np.clip(lags, 0, block)], 0.0)
+    zero_state = padded.reshape(rows, n_blocks, block) @ toeplitz.T
+
+    # Response to the state entering a block: y[-1] -> h[k + 1], y[-2] -> -a2 h[k]
+    c1, c2 = h[1:], -a2 * h[:-1]
+
+    # Carry the two-sample state block to block (n_blocks steps, all rows at once)
+    c1_last, c2_last, c1_second, c2_second = c1[-1], c2[-1], c1[-2], c2[-2]
+    state1, state2 = np.empty((rows, n_blocks)), np.empty((rows, n_blocks))
+    if rows == 1:
+        # Plain floats are much faster than 1-element arrays in the loop
+        p1, p2 = float(y_init[0]), float(y_init[0])
+        last, second = zero_state[0, :, -1].tolist(), zero_state[0, :, -2].tolist()
+        s1, s2 = state1[0], state2[0]
+        for i in range(n_blocks):
+            s1[i], s2[i] = p1, p2
+            p1, p2 = last[i] + c1_last * p1 + c2_last * p2, second[i] + c1_second * p1 + c2_second * p2
+    else:
+        p1, p2 = y_init.astype(float), y_init.astype(float)
+        last, second = zero_state[:, :, -1], zero_state[:, :, -2]
+        for i in range(n_blocks):
+            state1[:, i], state2[:, i] = p1, p2
+            p1, p2 = last[:, i] + c1_last * p1 + c2_last * p2, second[:, i] + c1_second * p1 + c2_second * p2
+
+    y = zero_state + state1[:, :, None] * c1 + state2[:, :, None] * c2
+    return y.reshape(rows, -1)[:, :n]
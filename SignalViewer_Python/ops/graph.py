@@ -0,0 +1,420 @@
+"""
+Signal Viewer Pro - Derived Signal Graph
+=========================================
+Derived signals as nodes of a DAG over source signal keys.
+
+Each derived signal created by an operation keeps a recipe (operation +
+source keys), so it can be recomputed when its inputs change:
+
+- Results are stamped with the version stamps of their inputs
+- When runs are reloaded or replaced, only derived signals downstream of
+  changed inputs are marked stale (invalidate_derived)
+- Stale signals recompute lazily, on first access (resolve_derived)
+- Recipe sources may be nested recipes, e.g. derivative(A + B); the inner
+  result is evaluated in memory (memoised) instead of being registered
+
+Recipe format (plain dict, JSON-serialisable for sessions):
+    {"op_type": "unary" | "binary" | "multi" | "expr",
+     "operation": operation name (see ops.engine.compute_unary etc.),
+                  or the formula for "expr" (see ops.expr),
+     "sources": [signal key or nested recipe, ...],
+     "alignment": "linear" | "nearest",
+     "base": index of the source providing the time base (binary, optional)}
+
+Derived signals without a recipe (loaded data, comparisons) are static
+leaves: they are never recomputed, only checked for missing inputs.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.models import Run, DerivedSignal, parse_signal_key, make_signal_key, next_data_version, DERIVED_RUN_IDX
+from ops.engine import compute_unary, compute_binary, compute_multi, compute_unary_across_runs
+from ops.expr import evaluate_expression
+
+
+NESTED_CACHE_SIZE = 16  # Memoised in-memory intermediates (LRU)
+
+_nested_cache: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_nested_lock = threading.Lock()
+_resolving = set()  # Names being resolved (cycle guard, graph_lock held)
+
+# Serialises resolution and invalidation of derived signals (reentrant:
+# resolving a signal resolves its derived inputs). Hold it while reading
+# several derived signals that must be consistent with each other.
+graph_lock = threading.RLock()
+
+
+def make_recipe(
+    op_type: str,
+    operation: str,
+    sources: List,
+    alignment: str = "linear",
+    base: Optional[int] = None,
+) -> Dict:
+    """
+    Build a derived-signal recipe.
+
+    Args:
+        op_type: "unary", "binary", "multi" or "expr"
+        operation: Operation name (formula for "expr")
+        sources: Signal keys (or nested recipes)
+        alignment: "linear" or "nearest"
+        base: Binary only - index of the source whose time base is used
+
+    Returns:
+        Recipe dict
+    """
+    recipe = {"op_type": op_type, "operation": operation, "sources": list(sources), "alignment": alignment or "linear"}
+    if base is not None:
+        recipe["base"] = base
+    return recipe
+
+
+def recipe_keys(recipe: Dict) -> List[str]:
+    """Leaf signal keys of a recipe (nested recipes included), in order"""
+    keys = []
+    for src in recipe.get("sources", []):
+        for key in (recipe_keys(src) if isinstance(src, dict) else [src]):
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+def signal_stamp(runs: List[Run], derived: Dict[str, DerivedSignal], sig_key: str) -> Optional[tuple]:
+    """Data identity of a signal key: version stamp plus any run/signal time offsets (None if missing)"""
+    run_idx, sig_name = parse_signal_key(sig_key)
+    if run_idx == DERIVED_RUN_IDX:
+        ds = derived.get(sig_name)
+        return (ds.version,) if ds is not None else None
+    if 0 <= run_idx < len(runs):
+        run = runs[run_idx]
+        sig = run.signals.get(sig_name)
+        if sig is None:
+            return None
+        return (run.version, run.time_offset, sig.time_offset)
+    return None
+
+
+def input_stamps(runs: List[Run], derived: Dict[str, DerivedSignal], recipe: Dict) -> Optional[tuple]:
+    """Stamps of all leaf inputs of a recipe (None if any input is missing)"""
+    stamps = []
+    for key in recipe_keys(recipe):
+        stamp = signal_stamp(runs, derived, key)
+        if stamp is None:
+            return None
+        stamps.append((key, stamp))
+    return tuple(stamps)
+
+
+def create_derived(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    name: str,
+    recipe: Dict,
+) -> Optional[DerivedSignal]:
+    """
+    Evaluate a recipe and wrap the result as a derived signal (not registered).
+
+    A recipe that reads the output name itself (overwriting one of its own
+    inputs) would form a cycle, so such results are kept as static data.
+
+    Args:
+        runs: List of runs
+        derived: Dict of derived signals
+        name: Output name
+        recipe: Recipe (see make_recipe)
+
+    Returns:
+        DerivedSignal or None if inputs are missing or evaluation failed
+    """
+    stamps = input_stamps(runs, derived, recipe)
+    result = evaluate_recipe(runs, derived, recipe)
+    if result is None or stamps is None:
+        return None
+
+    keys = recipe_keys(recipe)
+    cyclic = make_signal_key(DERIVED_RUN_IDX, name) in keys
+    time, data = result
+    return DerivedSignal(
+        name=name,
+        time=time,
+        data=data,
+        operation=recipe["operation"],
+        source_signals=keys,
+        recipe=None if cyclic else recipe,
+        input_stamps=None if cyclic else stamps,
+    )
+
+
+def create_derived_across_runs(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    signal_name: str,
+    operation: str,
+    name_for: Callable[[int], str],
+) -> Dict[str, DerivedSignal]:
+    """
+    Apply a unary operation to a signal in every run containing it, in bulk.
+
+    Computation is batched across runs sharing a time base
+    (ops.engine.compute_unary_across_runs). Each result still gets its own
+    single-source recipe, so later recomputation only touches changed runs.
+
+    Args:
+        runs: List of runs
+        derived: Dict of derived signals
+        signal_name: Signal name to look up in each run
+        operation: Unary operation name
+        name_for: Run index -> output name
+
+    Returns:
+        Output name -> DerivedSignal (not registered)
+    """
+    created = {}
+    for run_idx, (time, data) in compute_unary_across_runs(runs, signal_name, operation).items():
+        sig_key = make_signal_key(run_idx, signal_name)
+        recipe = make_recipe("unary", operation, [sig_key])
+        name = name_for(run_idx)
+        created[name] = DerivedSignal(
+            name=name,
+            time=time,
+            data=data,
+            operation=operation,
+            source_signals=[sig_key],
+            recipe=recipe,
+            input_stamps=input_stamps(runs, derived, recipe),
+        )
+    return created
+
+
+def evaluate_recipe(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    recipe: Dict,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Evaluate a recipe from current source data.
+
+    Args:
+        runs: List of runs
+        derived: Dict of derived signals (stale sources are resolved first)
+        recipe: Recipe (see make_recipe)
+
+    Returns:
+        Tuple of (time, data), or None if an input is missing/empty or failed
+    """
+    try:
+        sources = []
+        for src in recipe["sources"]:
+            if isinstance(src, dict):
+                source = _evaluate_nested(runs, derived, src)
+            else:
+                source = _source_data(runs, derived, src)
+            if source is None or len(source[1]) == 0:
+                return None
+            sources.append(source)
+
+        op_type, operation = recipe["op_type"], recipe["operation"]
+        alignment = recipe.get("alignment", "linear")
+        if op_type == "unary":
+            return compute_unary(sources[0][0], sources[0][1], operation)
+        if op_type == "binary":
+            (t1, d1), (t2, d2) = sources[:2]
+            return compute_binary(t1, d1, t2, d2, operation, alignment, recipe.get("base"))
+        if op_type == "expr":
+            keys = [src if isinstance(src, str) else None for src in recipe["sources"]]
+            return evaluate_expression(operation, sources, keys, alignment)
+        return compute_multi(sources, operation, alignment)
+
+    except Exception as e:
+        print(f"[GRAPH] Evaluation failed ({recipe.get('operation')}): {e}", flush=True)
+        return None
+
+
+def _evaluate_nested(runs, derived, recipe: Dict) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Evaluate an unregistered intermediate, memoised by recipe and input stamps"""
+    stamps = input_stamps(runs, derived, recipe)
+    if stamps is None:
+        return None
+    key = (json.dumps(recipe, sort_keys=True), stamps)
+
+    with _nested_lock:
+        hit = _nested_cache.get(key)
+        if hit is not None:
+            _nested_cache.move_to_end(key)
+            return hit
+
+    result = evaluate_recipe(runs, derived, recipe)
+    if result is not None:
+        with _nested_lock:
+            _nested_cache[key] = result
+            while len(_nested_cache) > NESTED_CACHE_SIZE:
+                _nested_cache.popitem(last=False)
+    return result
+
+
+def _source_data(runs, derived, sig_key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(time, data) of a source key, resolving stale derived sources"""
+    run_idx, sig_name = parse_signal_key(sig_key)
+    if run_idx == DERIVED_RUN_IDX:
+        ds = resolve_derived(runs, derived, sig_name)
+        return (ds.time, ds.data) if ds is not None else None
+    if 0 <= run_idx < len(runs) and sig_name in runs[run_idx].signals:
+        return runs[run_idx].get_signal_data(sig_name)
+    return None
+
+
+def resolve_derived(runs: List[Run], derived: Dict[str, DerivedSignal], name: str) -> Optional[DerivedSignal]:
+    """
+    Get a derived signal with up-to-date data, recomputing it if needed.
+
+    A signal is recomputed when it is marked stale or its input stamps no
+    longer match (inputs reloaded, replaced or time-shifted). Signals whose
+    inputs are missing keep their last data and are labelled broken.
+
+    Args:
+        runs: List of runs
+        derived: Dict of derived signals
+        name: Derived signal name
+
+    Returns:
+        DerivedSignal or None if it does not exist
+    """
+    with graph_lock:
+        return _resolve_locked(runs, derived, name)
+
+
+def _resolve_locked(runs: List[Run], derived: Dict[str, DerivedSignal], name: str) -> Optional[DerivedSignal]:
+    """resolve_derived with graph_lock held"""
+    ds = derived.get(name)
+    if ds is None or ds.recipe is None or name in _resolving:
+        return ds
+
+    _resolving.add(name)
+    try:
+        # Resolve derived inputs first so their stamps are final
+        for key in recipe_keys(ds.recipe):
+            run_idx, sig_name = parse_signal_key(key)
+            if run_idx == DERIVED_RUN_IDX:
+                resolve_derived(runs, derived, sig_name)
+
+        stamps = input_stamps(runs, derived, ds.recipe)
+        if stamps is None:
+            _set_broken(ds, True)
+            return ds
+        _set_broken(ds, False)
+        if not ds.stale and stamps == ds.input_stamps:
+            return ds
+
+        result = evaluate_recipe(runs, derived, ds.recipe)
+        if result is None:
+            _set_broken(ds, True)
+            return ds
+
+        # Publish data, version and stamps together: a new version always
+        # accompanies new data, so nothing cached under the version set by
+        # invalidate_derived (paired with the old data) is reused
+        time_new, data_new = result
+        ds.__dict__.update(
+            time=time_new, data=data_new, version=next_data_version(), input_stamps=stamps, stale=False
+        )
+        print(f"[GRAPH] Recomputed derived signal: {name}", flush=True)
+        return ds
+    finally:
+        _resolving.discard(name)
+
+
+def invalidate_derived(runs: List[Run], derived: Dict[str, DerivedSignal]) -> Tuple[List[str], List[str]]:
+    """
+    Mark derived signals whose inputs changed as stale (call after runs change).
+
+    Only the affected subgraph is touched: signals are visited in dependency
+    order, and marking one stale bumps its version, which in turn changes
+    the input stamps of its dependents. Nothing is recomputed here.
+
+    Args:
+        runs: List of runs (after reload/replace)
+        derived: Dict of derived signals
+
+    Returns:
+        Tuple of (stale names, broken names)
+    """
+    with graph_lock:
+        return _invalidate_locked(runs, derived)
+
+
+def _invalidate_locked(runs: List[Run], derived: Dict[str, DerivedSignal]) -> Tuple[List[str], List[str]]:
+    """invalidate_derived with graph_lock held"""
+    stale, broken = [], []
+    for name in _topological_order(derived):
+        ds = derived[name]
+        keys = recipe_keys(ds.recipe) if ds.recipe is not None else ds.source_signals
+        if any(signal_stamp(runs, derived, key) is None for key in keys):
+            _set_broken(ds, True)
+            broken.append(name)
+            continue
+        _set_broken(ds, False)
+        if ds.recipe is None:
+            continue
+        if ds.stale or input_stamps(runs, derived, ds.recipe) != ds.input_stamps:
+            ds.__dict__.update(stale=True, version=next_data_version())
+            stale.append(name)
+
+    if stale or broken:
+        print(f"[GRAPH] Invalidated {len(stale)} derived signals ({len(broken)} broken)", flush=True)
+    return stale, broken
+
+
+def dependents_of(derived: Dict[str, DerivedSignal], name: str) -> List[str]:
+    """All derived signals depending on a derived signal, directly or transitively"""
+    children: Dict[str, List[str]] = {}
+    for other, ds in derived.items():
+        for key in ds.source_signals:
+            run_idx, sig_name = parse_signal_key(key)
+            if run_idx == DERIVED_RUN_IDX:
+                children.setdefault(sig_name, []).append(other)
+
+    found, stack = [], [name]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            if child != name and child not in found:
+                found.append(child)
+                stack.append(child)
+    return found
+
+
+def _topological_order(derived: Dict[str, DerivedSignal]) -> List[str]:
+    """Derived names ordered so every signal follows its derived inputs (cycles broken arbitrarily)"""
+    order, state = [], {}
+    for root in derived:
+        if root in state:
+            continue
+        stack = [(root, False)]
+        while stack:
+            name, done = stack.pop()
+            if done:
+                state[name] = 2
+                order.append(name)
+                continue
+            if state.get(name):
+                continue
+            state[name] = 1
+            stack.append((name, True))
+            for key in derived[name].source_signals:
+                run_idx, sig_name = parse_signal_key(key)
+                if run_idx == DERIVED_RUN_IDX and sig_name in derived and not state.get(sig_name):
+                    stack.append((sig_name, False))
+    return order
+
+
+def _set_broken(ds: DerivedSignal, broken: bool):
+    """Flag a derived signal whose inputs are missing (it keeps its last data)"""
+    if ds.broken != broken:
+        ds.broken = broken
+        state = "marked broken (missing inputs)" if broken else "inputs available again"
+        print(f"[GRAPH] Derived signal '{ds.name}' {state}", flush=True)
@@ -0,0 +1,287 @@
+"""
+Signal Viewer Pro - Region Query Index
+=======================================
+Per-signal index answering statistics over any sample range [i0, i1)
+without scanning it:
+
+- Per-block count, mean and sum of squared deviations (M2), with
+  aligned power-of-two levels, give mean/std/RMS from O(log n) blocks
+  merged with Chan's parallel-variance formula (each block is centred on
+  its own mean, so level changes do not cancel digits)
+- A sparse table over fixed-size block minima/maxima gives min/max in
+  O(1) plus a scan of at most two partial blocks
+- A prefix count of non-finite samples lets ranges containing NaN/inf
+  fall back to a direct pass, keeping NumPy's semantics
+
+Indexes are built on the second query of a data array (a one-off query
+is cheaper as a direct pass) and cached per array.
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+
+# Signals shorter than this are cheaper to scan than to index
+INDEX_MIN_SAMPLES = 50_000
+
+# Samples per min/max block (partial blocks at the range ends are scanned)
+BLOCK_SIZE = 256
+
+# Total memory budget for cached indexes
+INDEX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Only indexes unused for this long are evicted to make room; when the
+# budget is held by recently used indexes, new arrays get a direct pass
+# instead (prevents LRU thrash when one query spans more than the budget)
+INDEX_IDLE_SECONDS = 30.0
+
+_index_cache: "OrderedDict[tuple, list]" = OrderedDict()  # (id, len) -> [weakref(data), index, last_used]
+_index_cache_bytes = 0
+_index_lock = threading.Lock()
+
+# Arrays queried once without an index: (id, len) -> weakref(data)
+SEEN_CACHE_SIZE = 1024
+_seen: "OrderedDict[tuple, weakref.ref]" = OrderedDict()
+
+
+def slice_stats(data: np.ndarray) -> Dict[str, float]:
+    """
+    Raw statistics of a data slice by direct reduction.
+
+    Returns:
+        Dict with min, max, mean, std, mean_sq, samples (empty if no data)
+    """
+    if len(data) == 0:
+        return {}
+    mean = float(np.mean(data))
+    var = float(np.mean(np.square(data - mean)))
+    return {
+        "min": float(np.min(data)),
+        "max": float(np.max(data)),
+        "mean": mean,
+        "std": float(np.sqrt(var)),
+        "mean_sq": var + mean * mean,
+        "samples": int(len(data)),
+    }
+
+
+class RegionIndex:
+    """
+    Block moment levels and block sparse-table index over one data array.
+
+    Memory is a small fraction of the data (block tables only) plus a
+    non-finite prefix count when the data has NaN/inf.
+    """
+
+    def __init__(self, data: np.ndarray):
+        self._data_ref = weakref.ref(data)  # The cache must not keep the signal alive
+        n = len(data)
+
+        finite = np.isfinite(data)
+        all_finite = bool(finite.all())
+        self._bad = None if all_finite else np.concatenate(([0], np.cumsum(~finite)))
+        clean = data if all_finite else np.where(finite, data, 0.0)
+
+        # Moment levels over full blocks: level k holds (mean, M2) of the
+        # aligned runs of 2**k blocks
+        n_blocks = n // BLOCK_SIZE
+        clean_blocks = np.asarray(clean[:n_blocks * BLOCK_SIZE], dtype=float).reshape(n_blocks, BLOCK_SIZE)
+        means = clean_blocks.mean(axis=1)
+        m2s = np.square(clean_blocks - means[:, None]).sum(axis=1)
+        self._means, self._m2s = [means], [m2s]
+        count = BLOCK_SIZE
+        while len(means) >= 2:
+            pairs = len(means) // 2
+            mean_a, mean_b = means[0:2 * pairs:2], means[1:2 * pairs:2]
+            delta = mean_b - mean_a
+            means = mean_a + delta * 0.5
+            m2s = m2s[0:2 * pairs:2] + m2s[1:2 * pairs:2] + delta * delta * (count * 0.5)
+            self._means.append(means)
+            self._m2s.append(m2s)
+            count *= 2
+
+        # Sparse tables over full blocks: level k holds extrema of 2**k blocks
+        blocks = np.asarray(data[:n_blocks * BLOCK_SIZE], dtype=float).reshape(n_blocks, BLOCK_SIZE)
+        self._mins = [np.fmin.reduce(blocks, axis=1)] if n_blocks else []
+        self._maxs = [np.fmax.reduce(blocks, axis=1)] if n_blocks else []
+        span = 1
+        while span * 2 <= n_blocks:
+            prev_min, prev_max = self._mins[-1], self._maxs[-1]
+            self._mins.append(np.fmin(prev_min[:-span], prev_min[span:]))
+            self._maxs.append(np.fmax(prev_max[:-span], prev_max[span:]))
+            span *= 2
+
+    @property
+    def data(self) -> np.ndarray:
+        data = self._data_ref()
+        if data is None:
+            raise ReferenceError("Indexed data array no longer exists")
+        return data
+
+    @property
+    def nbytes(self) -> int:
+        tables = sum(t.nbytes for t in self._mins + self._maxs + self._means + self._m2s)
+        return tables + (self._bad.nbytes if self._bad is not None else 0)
+
+    def _extrema(self, i0: int, i1: int):
+        """(min, max) over [i0, i1) - sparse table for full blocks, scan for the ends"""
+        data = self.data
+        b0 = -(-i0 // BLOCK_SIZE)  # First full block
+        b1 = i1 // BLOCK_SIZE      # One past the last full block
+        if b1 <= b0:
+            segment = data[i0:i1]
+            return float(np.min(segment)), float(np.max(segment))
+
+        level = (b1 - b0).bit_length() - 1
+        lo = min(self._mins[level][b0], self._mins[level][b1 - (1 << level)])
+        hi = max(self._maxs[level][b0], self._maxs[level][b1 - (1 << level)])
+        for segment in (data[i0:b0 * BLOCK_SIZE], data[b1 * BLOCK_SIZE:i1]):
+            if len(segment):
+                lo = min(lo, np.min(segment))
+                hi = max(hi, np.max(segment))
+        return float(lo), float(hi)
+
+    def _moments(self, i0: int, i1: int):
+        """(count, mean, M2) over [i0, i1) - block levels for full blocks, scan for the ends"""
+        data = self.data
+        b0 = -(-i0 // BLOCK_SIZE)
+        b1 = i1 // BLOCK_SIZE
+        if b1 <= b0:
+            return _segment_moments(data[i0:i1])
+
+        acc = _segment_moments(data[i0:b0 * BLOCK_SIZE])
+        b = b0
+        while b < b1:
+            # Largest aligned run of 2**k blocks starting at b that fits
+            k = min((b & -b).bit_length() - 1 if b else len(self._means) - 1, len(self._means) - 1)
+            while b + (1 << k) > b1:
+                k -= 1
+            acc = _merge_moments(acc, (BLOCK_SIZE << k, float(self._means[k][b >> k]), float(self._m2s[k][b >> k])))
+            b += 1 << k
+        return _merge_moments(acc, _segment_moments(data[b1 * BLOCK_SIZE:i1]))
+
+    def range_stats(self, i0: int, i1: int) -> Dict[str, float]:
+        """
+        Raw statistics over samples [i0, i1).
+
+        Returns:
+            Same dict as slice_stats (empty if the range is empty)
+        """
+        i0, i1 = max(int(i0), 0), min(int(i1), len(self.data))
+        if i1 <= i0:
+            return {}
+        if self._bad is not None and self._bad[i1] != self._bad[i0]:
+            return slice_stats(self.data[i0:i1])  # NaN/inf in range - NumPy semantics
+
+        m, mean, m2 = self._moments(i0, i1)
+        var = max(m2 / m, 0.0)
+        lo, hi = self._extrema(i0, i1)
+        return {
+            "min": lo,
+            "max": hi,
+            "mean": float(mean),
+            "std": float(np.sqrt(var)),
+            "mean_sq": float(var + mean * mean),
+            "samples": m,
+        }
+
+
+def _segment_moments(segment: np.ndarray):
+    """(count, mean, M2) of a short segment by direct reduction"""
+    if len(segment) == 0:
+        return 0, 0.0, 0.0
+    segment = np.asarray(segment, dtype=float)
+    mean = float(np.mean(segment))
+    return len(segment), mean, float(np.sum(np.square(segment - mean)))
+
+
+def _merge_moments(a, b):
+    """Combine two (count, mean, M2) triples (Chan et al. parallel variance)"""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
+
+
+def get_region_index(data: np.ndarray) -> Optional[RegionIndex]:
+    """
+    Get the (cached) index for a data array.
+
+    Keyed by array identity and length, guarded by a weak reference.
+    The first query of an array only records it; the index is built on
+    the second, so one-off batch queries never build (or thrash) indexes.
+
+    Returns:
+        RegionIndex, or None if the caller should do a direct pass
+    """
+    global _index_cache_bytes
+    if len(data) < INDEX_MIN_SAMPLES:
+        return None
+
+    key = (id(data), len(data))
+    with _index_lock:
+        entry = _index_cache.get(key)
+        if entry is not None and entry[0]() is data:
+            entry[2] = time.monotonic()
+            _index_cache.move_to_end(key)
+            return entry[1]
+
+        seen = _seen.pop(key, None)
+        if seen is None or seen() is not data:
+            _seen[key] = weakref.ref(data)
+            while len(_seen) > SEEN_CACHE_SIZE:
+                _seen.popitem(last=False)
+            return None
+
+        if not _make_room(_estimate_nbytes(len(data))):
+            _seen[key] = seen  # Still eligible once room frees up
+            return None
+
+    index = RegionIndex(data)
+    with _index_lock:
+        old = _index_cache.pop(key, None)
+        if old is not None:
+            _index_cache_bytes -= old[1].nbytes
+        _index_cache[key] = [weakref.ref(data), index, time.monotonic()]
+        _index_cache_bytes += index.nbytes
+    return index
+
+
+def _estimate_nbytes(n: int) -> int:
+    """Approximate RegionIndex.nbytes for n samples (extrema tables dominate)"""
+    n_blocks = max(n // BLOCK_SIZE, 1)
+    return 16 * n_blocks * n_blocks.bit_length() + 32 * n_blocks
+
+
+def _make_room(nbytes: int) -> bool:
+    """Evict dead, then idle, indexes until nbytes fits the budget (lock held)"""
+    global _index_cache_bytes
+    for key in [k for k, entry in _index_cache.items() if entry[0]() is None]:
+        _index_cache_bytes -= _index_cache.pop(key)[1].nbytes
+
+    idle_before = time.monotonic() - INDEX_IDLE_SECONDS
+    for key in list(_index_cache):
+        if _index_cache_bytes + nbytes <= INDEX_CACHE_BYTES:
+            break
+        if _index_cache[key][2] <= idle_before:
+            _index_cache_bytes -= _index_cache.pop(key)[1].nbytes
+    return _index_cache_bytes + nbytes <= INDEX_CACHE_BYTES
+
+
+def clear_region_index_cache():
+    """Drop all cached region indexes"""
+    global _index_cache_bytes
+    with _index_lock:
+        _index_cache.clear()
+        _seen.clear()
+        _index_cache_bytes = 0
@@ -0,0 +1,245 @@
+"""
+Signal Viewer Pro - Uniform Resampling
+=======================================
+Spectral analysis, IIR filters and cross-correlation need uniformly
+sampled data, but logger timestamps are often jittered. This module is
+the one place that puts signals on a uniform grid:
+
+- time_base: (is_uniform, dt) of a time array; the median interval is
+  used when dropouts skew the mean (memoised per array)
+- to_uniform: resample onto a uniform grid at the signal's own rate
+  (returns the inputs unchanged when they already are uniform)
+- decimate: integer-factor rate reduction with a zero-phase Butterworth
+  anti-alias filter
+- resample_rate: change to any rate (anti-aliased when reducing)
+- from_uniform: map uniformly sampled results back onto the original times
+
+Interpolation runs in chunks of RESAMPLE_CHUNK_SAMPLES (the grid is never
+materialised twice). Results are cached per signal (weakly referenced
+time/data arrays), rate and method, within RESAMPLE_CACHE_BYTES. All
+functions work along the last axis, so stacked signals (rows, n) sharing
+a time base are resampled together.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ops.filters import butterworth_sos, sosfiltfilt
+from ops.weak_cache import WeakArrayCache
+
+
+# Max relative deviation of any interval from the mean for a time base to
+# count as uniform (also absorbs timestamps rounded in the CSV)
+UNIFORM_TOLERANCE = 0.01
+
+# Grid samples interpolated per chunk (bounds temporaries)
+RESAMPLE_CHUNK_SAMPLES = 1 << 20
+
+# Anti-alias filter: Butterworth order, cutoff as a fraction of the new Nyquist
+ANTIALIAS_ORDER = 8
+ANTIALIAS_CUTOFF = 0.8
+
+# Total memory budget for cached resampled signals and grids
+RESAMPLE_CACHE_BYTES = 256 * 1024 * 1024
+
+_resample_cache = WeakArrayCache(RESAMPLE_CACHE_BYTES)
+
+
+def time_base(time: np.ndarray) -> Tuple[bool, float]:
+    """
+    Classify a time array (memoised per array).
+
+    Returns:
+        (is_uniform, dt): dt is the mean interval, or the median interval
+        when gaps pull the mean away from it (0.0 if fewer than 2 samples
+        or not increasing)
+    """
+    key = ("base", id(time))
+    cached = _resample_cache.get(key, (time,))
+    if cached is not None:
+        return cached
+
+    n = len(time)
+    if n < 2:
+        return False, 0.0
+    diffs = np.diff(time)
+    dt_mean = float(time[-1] - time[0]) / (n - 1)
+    if not dt_mean > 0:
+        result = (False, 0.0)
+    elif float(np.max(np.abs(diffs - dt_mean))) <= UNIFORM_TOLERANCE * dt_mean:
+        result = (True, dt_mean)
+    else:
+        # Median is robust to dropouts; with jitter alone the mean is exact
+        dt = float(np.median(diffs))
+        if not dt > 0 or abs(dt - dt_mean) <= UNIFORM_TOLERANCE * dt_mean:
+            dt = dt_mean
+        result = (False, dt)
+    _resample_cache.put(key, (time,), result, 0)
+    return result
+
+
+def sample_rate(time: np.ndarray) -> float:
+    """Sampling rate in Hz from the time base (0.0 if undefined)"""
+    dt = time_base(time)[1]
+    return 1.0 / dt if dt > 0 else 0.0
+
+
+def to_uniform(
+    time: np.ndarray,
+    data: np.ndarray,
+    dt: Optional[float] = None,
+    method: str = "linear",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resample a signal onto a uniform grid (cached).
+
+    Args:
+        time: Time array (ascending)
+        data: Signal data (n,) or stacked signals (rows, n)
+        dt: Grid interval (default: the signal's own interval, see time_base)
+        method: "linear" or "nearest"
+
+    Returns:
+        (grid, data) - the inputs themselves if already uniform at dt,
+        empty arrays if the time base is unusable
+    """
+    uniform, own_dt = time_base(time)
+    if own_dt <= 0:
+        return np.array([]), np.array([])
+    if dt is None or dt <= 0:
+        dt = own_dt
+    if uniform and abs(dt - own_dt) <= 1e-9 * own_dt:
+        return time, data
+
+    key = ("uniform", id(time), id(data), dt, method)
+    cached = _resample_cache.get(key, (time, data))
+    if cached is not None:
+        return cached
+
+    grid = _grid(time, dt)
+    resampled = _interp_chunked(grid, time, np.asarray(data), method)
+    resampled.flags.writeable = False
+    _resample_cache.put(key, (time, data), (grid, resampled), resampled.nbytes)
+    return grid, resampled
+
+
+def decimate(data: np.ndarray, factor: int, order: int = ANTIALIAS_ORDER) -> np.ndarray:
+    """
+    Reduce the rate of uniformly sampled data by an integer factor.
+
+    A zero-phase Butterworth low-pass at ANTIALIAS_CUTOFF of the new
+    Nyquist removes content that would alias, then every factor-th
+    sample is kept (starting with the first).
+
+    Args:
+        data: Uniformly sampled data (along the last axis)
+        factor: Decimation factor (>= 1)
+        order: Anti-alias filter order
+
+    Returns:
+        Decimated data
+    """
+    factor = int(factor)
+    if factor <= 1:
+        return data
+    sos = butterworth_sos(order, ANTIALIAS_CUTOFF * 0.5 / factor, 1.0)
+    return np.ascontiguousarray(sosfiltfilt(sos, data)[..., ::factor])
+
+
+def resample_rate(
+    time: np.ndarray,
+    data: np.ndarray,
+    fs: float,
+    method: str = "linear",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resample a signal to a uniform grid at rate fs (cached).
+
+    Reducing the rate low-pass filters first (integer ratios use decimate);
+    raising it interpolates.
+
+    Args:
+        time: Time array (ascending)
+        data: Signal data (n,) or stacked signals (rows, n)
+        fs: Target sampling rate in Hz
+        method: "linear" or "nearest" (interpolation onto the new grid)
+
+    Returns:
+        (grid, data) on the new rate (empty arrays if unusable)
+    """
+    uniform_time, uniform_data = to_uniform(time, data, method=method)
+    if len(uniform_time) < 2 or not fs > 0:
+        return np.array([]), np.array([])
+    dt = float(uniform_time[-1] - uniform_time[0]) / (len(uniform_time) - 1)
+    ratio = 1.0 / (fs * dt)  # Old rate / new rate
+    if abs(ratio - 1.0) <= 1e-9:
+        return uniform_time, uniform_data
+
+    key = ("rate", id(time), id(data), fs, method)
+    cached = _resample_cache.get(key, (time, data))
+    if cached is not None:
+        return cached
+
+    factor = int(round(ratio))
+    if ratio > 1.0 and abs(ratio - factor) <= 1e-6 * ratio:
+        grid = np.ascontiguousarray(uniform_time[::factor])
+        result = decimate(uniform_data, factor)
+    else:
+        source = uniform_data
+        if ratio > 1.0:
+            sos = butterworth_sos(ANTIALIAS_ORDER, ANTIALIAS_CUTOFF * 0.5 / ratio, 1.0)
+            source = sosfiltfilt(sos, uniform_data)
+        grid = _grid(uniform_time, 1.0 / fs)
+        result = _interp_chunked(grid, uniform_time, np.asarray(source), method)
+
+    result.flags.writeable = False
+    _resample_cache.put(key, (time, data), (grid, result), grid.nbytes + result.nbytes)
+    return grid, result
+
+
+def from_uniform(uniform_time: np.ndarray, uniform_data: np.ndarray, time: np.ndarray) -> np.ndarray:
+    """
+    Map data computed on a uniform grid back onto the original times.
+
+    Returns:
+        Data on time (uniform_data itself when the grid is time)
+    """
+    if uniform_time is time:
+        return uniform_data
+    return _interp_chunked(time, uniform_time, np.asarray(uniform_data), "linear")
+
+
+def _grid(time: np.ndarray, dt: float) -> np.ndarray:
+    """Uniform grid from time[0] at interval dt covering time (shared per time array)"""
+    key = ("grid", id(time), dt)
+    cached = _resample_cache.get(key, (time,))
+    if cached is not None:
+        return cached
+    n = int(np.floor(float(time[-1] - time[0]) / dt * (1 + 1e-12))) + 1
+    grid = time[0] + np.arange(n) * dt
+    grid.flags.writeable = False
+    _resample_cache.put(key, (time,), grid, grid.nbytes)
+    return grid
+
+
+def _interp_chunked(time_dst: np.ndarray, time_src: np.ndarray, data: np.ndarray, method: str) -> np.ndarray:
+    """Resample data (along the last axis) from time_src onto time_dst in chunks"""
+    out = np.empty(data.shape[:-1] + (len(time_dst),))
+    rows_in = data.reshape(-1, data.shape[-1])
+    rows_out = out.reshape(-1, len(time_dst))
+    for start in range(0, len(time_dst), RESAMPLE_CHUNK_SAMPLES):
+        stop = min(len(time_dst), start + RESAMPLE_CHUNK_SAMPLES)
+        chunk = time_dst[start:stop]
+        if method == "nearest":
+            indices = np.clip(np.searchsorted(time_src, chunk), 0, data.shape[-1] - 1)
+            rows_out[:, start:stop] = rows_in[:, indices]
+        else:
+            for row_in, row_out in zip(rows_in, rows_out):
+                row_out[start:stop] = np.interp(chunk, time_src, row_in)
+    return out
+
+
+def clear_resample_cache():
+    """Drop all cached grids and resampled signals"""
+    _resample_cache.clear()
@@ -0,0 +1,101 @@
+"""
+Signal Viewer Pro - Weak Array Cache
+=====================================
+Byte-budgeted LRU cache for results computed from NumPy arrays, shared by
+alignment, resampling and event detection.
+
+Keys are built by the caller (usually from id() of the input arrays plus
+parameters). Each entry weakly references the arrays it was computed
+from, so the cache never keeps a signal alive:
+
+- A lookup only hits while those arrays are the same live objects (ids
+  can be reused once an array is garbage collected)
+- Entries are dropped as soon as any of their arrays is collected
+  (weakref callbacks queue the key; it is removed on the next access)
+- Least recently used entries are evicted once budget_bytes is exceeded
+"""
+
+import threading
+import weakref
+from collections import OrderedDict, deque
+from typing import Any, Hashable, Optional, Sequence
+
+
+class WeakArrayCache:
+    """Thread-safe LRU of values guarded by weak references to their inputs"""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()  # key -> [weakrefs, value, nbytes]
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._dead_keys: deque = deque()  # Appended by weakref callbacks, dropped on next access
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently held"""
+        return self._nbytes
+
+    def get(self, key: Hashable, objs: Sequence[Any]) -> Optional[Any]:
+        """
+        Cached value for key if all its arrays are still the same objects.
+
+        Args:
+            key: Cache key
+            objs: The arrays the value was computed from (in put order)
+
+        Returns:
+            The cached value, or None
+        """
+        with self._lock:
+            self._drop_dead()
+            entry = self._entries.get(key)
+            if entry is None or any(ref() is not obj for ref, obj in zip(entry[0], objs)):
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, objs: Sequence[Any], value: Any, nbytes: int) -> bool:
+        """
+        Cache value under key, weakly referencing objs.
+
+        Args:
+            key: Cache key
+            objs: The arrays the value was computed from
+            value: Value to cache
+            nbytes: Memory charged against the budget
+
+        Returns:
+            True if cached (False if too large or objs are not weak-referenceable)
+        """
+        if nbytes > self.budget_bytes:
+            return False
+        try:
+            on_dead = lambda _ref, key=key: self._dead_keys.append(key)
+            refs = tuple(weakref.ref(obj, on_dead) for obj in objs)
+        except TypeError:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[2]
+            while self._entries and self._nbytes + nbytes > self.budget_bytes:
+                self._nbytes -= self._entries.popitem(last=False)[1][2]
+            self._entries[key] = [refs, value, nbytes]
+            self._nbytes += nbytes
+        return True
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._dead_keys.clear()
+            self._nbytes = 0
+
+    def _drop_dead(self):
+        """Remove entries whose arrays no longer exist (lock held)"""
+        while self._dead_keys:
+            key = self._dead_keys.popleft()
+            entry = self._entries.get(key)
+            if entry is not None and any(ref() is None for ref in entry[0]):  # Not a newer entry reusing the ids
+                self._nbytes -= self._entries.pop(key)[2]
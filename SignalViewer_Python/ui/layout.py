@@ -18,6 +18,7 @@ def create_layout():
         dcc.Store(id="store-runs", data=[]),                    # List of run file paths
         dcc.Store(id="store-view-state", data={}),              # ViewState as dict
         dcc.Store(id="store-refresh", data=0),                  # Refresh trigger
+        dcc.Store(id="store-figure-payload", data=None),        # Main plot payload (shared x arrays)
         dcc.Store(id="store-selected-files", data=[]),          # Multi-file import selection
         dcc.Store(id="store-collapsed-runs", data={}),          # Collapsed state per run {idx: bool}
         
@@ -179,7 +180,167 @@ def create_layout():
                                 ),
                             ]),
                             html.Small("Interpolates Y to X's time base for alignment", className="text-muted"),
+                            
+                            # Density heatmap for very large X-Y data
+                            html.Div([
+                                dbc.Checklist(
+                                    id="xy-density",
+                                    options=[{"label": "Density heatmap", "value": True}],
+                                    value=[],
+                                    switch=True,
+                                    className="small",
+                                ),
+                                dcc.Dropdown(
+                                    id="xy-bins",
+                                    options=[{"label": f"{n} x {n} bins", "value": n} for n in (100, 200, 400, 800)],
+                                    value=200,
+                                    clearable=False,
+                                    style={"fontSize": "11px"},
+                                ),
+                            ], className="mt-2"),
                         ], id="xy-controls", style={"display": "none"}),
+                        
+                        # Time mode event detection (hidden by default)
+                        html.Div([
+                            html.Hr(className="my-2"),
+                            html.Label("Events", className="small fw-bold text-info"),
+                            dcc.Dropdown(
+                                id="event-kind",
+                                options=[
+                                    {"label": "None", "value": "none"},
+                                    {"label": "Level crossings", "value": "crossing"},
+                                    {"label": "State edges", "value": "edge"},
+                                    {"label": "Dwell intervals", "value": "dwell"},
+                                    {"label": "Band violations", "value": "band"},
+                                ],
+                                value="none",
+                                clearable=False,
+                                className="mb-2",
+                                style={"fontSize": "11px"},
+                            ),
+                            dbc.RadioItems(
+                                id="event-direction",
+                                options=[
+                                    {"label": "Both", "value": "both"},
+                                    {"label": "Rising", "value": "rising"},
+                                    {"label": "Falling", "value": "falling"},
+                                ],
+                                value="both",
+                                inline=True,
+                                className="small mb-1",
+                            ),
+                            dbc.Row([
+                                dbc.Col([
+                                    dbc.Label("Level", className="small mb-0"),
+                                    dbc.Input(id="event-level", type="number", size="sm", placeholder="0 / any", step="any", debounce=True),
+                                ], width=6),
+                                dbc.Col([
+                                    dbc.Label("Hysteresis", className="small mb-0"),
+                                    dbc.Input(id="event-hysteresis", type="number", size="sm", placeholder="0", step="any", min=0, debounce=True),
+                                ], width=6),
+                            ], className="mb-1"),
+                            dbc.Row([
+                                dbc.Col([
+                                    dbc.Label("Low", className="small mb-0"),
+                                    dbc.Input(id="event-low", type="number", size="sm", placeholder="none", step="any", debounce=True),
+                                ], width=6),
+                                dbc.Col([
+                                    dbc.Label("High", className="small mb-0"),
+                                    dbc.Input(id="event-high", type="number", size="sm", placeholder="none", step="any", debounce=True),
+                                ], width=6),
+                            ], className="mb-1"),
+                            dbc.Label("Min duration (s)", className="small mb-0"),
+                            dbc.Input(id="event-min-duration", type="number", size="sm", placeholder="0", step="any", min=0, debounce=True),
+                            html.Small("Crossings use level and hysteresis; band violations low/high; "
+                                       "dwells hold the level value (empty = any). Step the cursor with ◀ / ▶.",
+                                       className="text-muted"),
+                        ], id="event-controls", style={"display": "none"}),
+                        
+                        # FFT mode controls (hidden by default)
+                        html.Div([
+                            html.Hr(className="my-2"),
+                            html.Label("FFT Configuration", className="small fw-bold text-info"),
+                            html.Div([
+                                html.Label("Averaging:", className="small text-muted"),
+                                dcc.Dropdown(
+                                    id="fft-average",
+                                    options=[
+                                        {"label": "None (whole record)", "value": "none"},
+                                        {"label": "Welch mean", "value": "mean"},
+                                        {"label": "Welch median", "value": "median"},
+                                    ],
+                                    value="none",
+                                    clearable=False,
+                                    className="mb-2",
+                                    style={"fontSize": "11px"},
+                                ),
+                            ]),
+                            dbc.Checklist(
+                                id="fft-psd",
+                                options=[{"label": "Power spectral density", "value": True}],
+                                value=[],
+                                switch=True,
+                                className="small",
+                            ),
+                            dbc.Checklist(
+                                id="fft-pad",
+                                options=[{"label": "Zero-pad to fast FFT length", "value": True}],
+                                value=[],
+                                switch=True,
+                                className="small",
+                            ),
+                            html.Small("Pads to the next 2^a 3^b 5^c length (finer bins, faster FFT)", className="text-muted"),
+                            html.Br(),
+                            html.Small("Welch averaging uses the window, segment length and overlap below", className="text-muted"),
+                        ], id="fft-controls", style={"display": "none"}),
+                        
+                        # Spectrogram mode controls (hidden by default)
+                        html.Div([
+                            html.Hr(className="my-2"),
+                            html.Label("Spectral Configuration", className="small fw-bold text-info"),
+                            html.Div([
+                                html.Label("Window:", className="small text-muted"),
+                                dcc.Dropdown(
+                                    id="spec-window",
+                                    options=[
+                                        {"label": "Hanning", "value": "hanning"},
+                                        {"label": "Hamming", "value": "hamming"},
+                                        {"label": "Blackman", "value": "blackman"},
+                                        {"label": "None (rectangular)", "value": "none"},
+                                    ],
+                                    value="hanning",
+                                    clearable=False,
+                                    className="mb-2",
+                                    style={"fontSize": "11px"},
+                                ),
+                            ]),
+                            html.Div([
+                                html.Label("Segment length:", className="small text-muted"),
+                                dcc.Dropdown(
+                                    id="spec-nperseg",
+                                    options=[{"label": f"{n} samples", "value": n} for n in (128, 256, 512, 1024, 2048, 4096, 8192)],
+                                    value=1024,
+                                    clearable=False,
+                                    className="mb-2",
+                                    style={"fontSize": "11px"},
+                                ),
+                            ]),
+                            html.Div([
+                                html.Label("Overlap:", className="small text-muted"),
+                                dbc.RadioItems(
+                                    id="spec-overlap",
+                                    options=[
+                                        {"label": "0%", "value": 0},
+                                        {"label": "50%", "value": 50},
+                                        {"label": "75%", "value": 75},
+                                    ],
+                                    value=50,
+                                    inline=True,
+                                    className="small",
+                                ),
+                            ]),
+                            html.Small("Hop = segment length x (1 - overlap)", className="text-muted"),
+                        ], id="spec-controls", style={"display": "none"}),
                     ], className="p-2", style={"maxHeight": "300px", "overflowY": "auto"}),
                 ]),
             ], width=2, className="bg-dark p-2", style={"height": "calc(100vh - 60px)", "overflowY": "auto"}),
@@ -278,7 +439,12 @@ def create_layout():
                             dbc.Button("🔀 X-Y", id="btn-mode-xy", size="sm", color="secondary", outline=True),
                             dbc.Button("📊 FFT", id="btn-mode-fft", size="sm", color="secondary", outline=True,
                                       title="Frequency spectrum analysis"),
+                            dbc.Button("🌈 Spectrogram", id="btn-mode-spec", size="sm", color="secondary", outline=True,
+                                      title="Time-frequency analysis (STFT)"),
                         ], size="sm", className="me-2"),
+                        dbc.Button("🖼️ Raster", id="btn-render-raster", size="sm", color="secondary", outline=True,
+                                  className="me-2",
+                                  title="Time mode: draw signals as a server-side image (very dense data)"),
                     ], width="auto"),
                     dbc.Col([
                         # Cursor toggle and dual cursor mode
@@ -399,6 +565,13 @@ def create_layout():
                                 dbc.Button("→", id="btn-cursor-jump", size="sm", color="info", outline=True),
                             ], size="sm"),
                         ], width="auto"),
+                        # Step to the previous / next detected event
+                        dbc.Col([
+                            dbc.ButtonGroup([
+                                dbc.Button("◀", id="btn-event-prev", size="sm", color="info", outline=True, title="Previous event"),
+                                dbc.Button("▶", id="btn-event-next", size="sm", color="info", outline=True, title="Next event"),
+                            ], size="sm"),
+                        ], width="auto"),
                         dbc.Col([
                             html.Span(id="cursor-time-display", className="text-info small fw-bold"),
                         ], width="auto"),
@@ -546,6 +719,7 @@ def create_layout():
         # Hidden components
         dcc.Download(id="download-session"),
         dcc.Download(id="download-report"),
+        dcc.Location(id="export-location", refresh=True),  # CSV export download URL
         dcc.Interval(id="interval-stream", interval=500, disabled=True),
         dcc.Interval(id="interval-replay", interval=50, disabled=True),
         
@@ -577,6 +751,7 @@ def create_operations_panel():
                 {"label": "Unary (1)", "value": "unary"},
                 {"label": "Binary (2)", "value": "binary"},
                 {"label": "Multi (N)", "value": "multi"},
+                {"label": "Formula", "value": "expr"},
             ],
             value="unary",
             inline=True,
@@ -595,21 +770,51 @@ def create_operations_panel():
         ),
         
         # Operation dropdown (populated dynamically)
-        dbc.Label("Operation", className="small"),
-        dbc.Select(
-            id="select-operation",
-            options=[
-                # Unary ops
-                {"label": "Derivative (d/dt)", "value": "derivative"},
-                {"label": "Integral (∫dt)", "value": "integral"},
-                {"label": "Absolute |x|", "value": "abs"},
-                {"label": "Normalize (0-1)", "value": "normalize"},
-                {"label": "RMS", "value": "rms"},
-            ],
-            value="derivative",
-            size="sm",
-            className="mb-2",
-        ),
+        html.Div([
+            dbc.Label("Operation", className="small"),
+            dbc.Select(
+                id="select-operation",
+                options=[
+                    # Unary ops
+                    {"label": "Derivative (d/dt)", "value": "derivative"},
+                    {"label": "Integral (∫dt)", "value": "integral"},
+                    {"label": "Absolute |x|", "value": "abs"},
+                    {"label": "Normalize (0-1)", "value": "normalize"},
+                    {"label": "RMS", "value": "rms"},
+                ],
+                value="derivative",
+                size="sm",
+                className="mb-2",
+            ),
+            # Unary only: run the operation on the same signal in every run
+            html.Div(
+                dbc.Checkbox(
+                    id="check-op-all-runs",
+                    label="Apply to all runs with this signal",
+                    value=False,
+                    className="small",
+                ),
+                id="op-all-runs-group",
+                className="mb-2",
+            ),
+        ], id="op-operation-group"),
+        
+        # Formula (for "Formula" type): A, B, ... are the selected signals
+        html.Div([
+            dbc.Label("Formula", className="small"),
+            dbc.Input(
+                id="input-op-expression",
+                placeholder="e.g. sqrt(A^2 + B^2) * 9.81 - {0:offset}",
+                size="sm",
+                className="mb-1",
+            ),
+            html.Div(
+                "A, B, ... = selected signals, {run:signal} = any signal. "
+                "Functions: sqrt abs exp log sin cos atan2 hypot min max ...",
+                className="text-muted mb-2",
+                style={"fontSize": "10px"},
+            ),
+        ], id="op-expression-group", style={"display": "none"}),
         
         # Alignment (for binary/multi)
         html.Div([
@@ -20,7 +20,12 @@ INPUTS/OUTPUTS:
             subplot 3 -> row=2, col=2 (bottom-right)
 """
 
+import base64
+import os
+import threading
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -28,8 +33,11 @@ if TYPE_CHECKING:
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-from core.models import Run, DerivedSignal, SubplotConfig, ViewState, parse_signal_key, DERIVED_RUN_IDX
+from core.models import Run, DerivedSignal, SignalView, SubplotConfig, ViewState, parse_signal_key, sample_views, DERIVED_RUN_IDX
 from core.naming import get_signal_label
+from viz.raster import rasterize_lines, png_data_uri, histogram_2d, finite_range
+from ops.align import resample
+from ops.events import EventKind, EventSpec, EventTable, detect_events, find_edges, subplot_event_spec
 
 
 # Signal colors
@@ -62,6 +70,30 @@ THEMES = {
 }
 
 
+# Typed-array payload settings (Plotly.js "bdata" spec)
+TYPED_ARRAY_ATTRS = ("x", "y", "z")  # Trace attributes sent as binary
+FLOAT32_ATTRS = ("y", "z")           # Attributes that may be narrowed to float32
+FLOAT32_TOLERANCE = 1e-6             # Max float32 error, relative to data span
+
+# Raster render mode: assumed plot width in pixels (the browser does not report
+# it), split across columns like the figure's own horizontal layout
+RASTER_PLOT_WIDTH_PX = 1400
+RASTER_MAX_PX = 2000  # Upper bound on either image dimension
+
+# Event markers drawn per signal (thinned evenly across the record, or the
+# visible range for viewport-rendered subplots; the cursor can still step
+# through every event)
+EVENT_MAX_MARKERS = 5000
+
+# numpy dtype -> Plotly.js typed array code (int64 is not supported by Plotly.js)
+_TYPED_ARRAY_CODES = {
+    "float64": "f8", "float32": "f4",
+    "int32": "i4", "uint32": "u4",
+    "int16": "i2", "uint16": "u2",
+    "int8": "i1", "uint8": "u1",
+}
+
+
 def subplot_idx_to_row_col(subplot_idx: int, cols: int) -> Tuple[int, int]:
     """
     Convert 0-based subplot index to 1-based (row, col) for Plotly.
@@ -204,9 +236,8 @@ def create_figure(
             axis_name = f"xaxis{sp_idx + 1}" if sp_idx > 0 else "xaxis"
             fig.update_layout(**{axis_name: dict(matches='x', showticklabels=True)})
     
-    # Track cursor values and time range
+    # Track cursor values and color assignment
     cursor_values = {}
-    time_min, time_max = float('inf'), float('-inf')
     color_idx = 0
     traces_per_subplot = {i: 0 for i in range(total_subplots)}
     
@@ -228,105 +259,55 @@ def create_figure(
             row=row, col=col,
         )
     
-    # Add traces for each subplot
+    # Color assignment runs on across subplots - fix each subplot's start up front
+    # so subplots can be built independently
+    color_starts = []
     for sp_idx in range(total_subplots):
-        sp_config = view_state.subplots[sp_idx]
-        row, col = subplot_idx_to_row_col(sp_idx, cols)
+        color_starts.append(color_idx)
+        color_idx += _colors_needed(runs, derived_signals, view_state.subplots[sp_idx])
+    
+    # Build traces for each subplot (cached per subplot - only changed subplots
+    # rebuild, in parallel), then assemble the figure serially
+    all_pieces = _get_all_subplot_pieces(
+        runs, derived_signals, view_state.subplots[:total_subplots],
+        rows, cols, color_starts, signal_settings,
+    )
+    
+    subplot_shapes, subplot_annotations, subplot_images = [], [], []
+    cursor_sources = []
+    for sp_idx, pieces in enumerate(all_pieces):
+        pieces.replay(fig, subplot_shapes, subplot_annotations, subplot_images)
+        traces_per_subplot[sp_idx] += pieces.trace_count
+        cursor_sources.extend(pieces.cursor_sources)
+    
+    # Adjust subplot title positions to prevent overlap with xlabels from row above
+    # (only the titles exist at this point - subplot labels are added below)
+    if rows > 1 and total_subplots > 1:
+        titles = [ann.to_plotly_json() for ann in fig.layout.annotations]
+        for ann in titles:
+            # Move subplot titles up slightly
+            if ann.get("y") is not None:
+                ann["y"] = ann["y"] + 0.02
+        fig.layout.annotations = titles
+    
+    # Cursor values are never cached - they depend on cursor time only.
+    # Both cursors and the X-Y cursor positions are evaluated in one batch.
+    cursor_mode = getattr(view_state, 'cursor_mode', 'single')
+    cursor2_time = getattr(view_state, 'cursor2_time', None)
+    if view_state.cursor_enabled and view_state.cursor_time is not None:
+        xy_x_views = {}
+        for sp_idx in range(total_subplots):
+            sp_config = view_state.subplots[sp_idx] if sp_idx < len(view_state.subplots) else None
+            if sp_config and sp_config.mode == "xy" and sp_config.x_signal:
+                x_run_idx, x_sig_name = parse_signal_key(sp_config.x_signal)
+                xy_x_views[sp_idx] = _get_signal_view(runs, derived_signals, x_run_idx, x_sig_name)
         
-        if sp_config.mode == "xy":
-            # X-Y mode - add traces and get cursor values
-            xy_cursor, trace_count = _add_xy_traces(
-                fig, runs, derived_signals, sp_config, row, col, 
-                color_idx, signal_settings, view_state, sp_idx,
-                total_subplots, traces_per_subplot[sp_idx]
-            )
-            traces_per_subplot[sp_idx] += trace_count
-            cursor_values.update(xy_cursor or {})
-        elif sp_config.mode == "fft":
-            # FFT mode - frequency spectrum analysis
-            trace_count = _add_fft_traces(
-                fig, runs, derived_signals, sp_config, row, col,
-                color_idx, signal_settings, sp_idx, total_subplots,
-                traces_per_subplot[sp_idx]
-            )
-            traces_per_subplot[sp_idx] += trace_count
-        else:
-            # Time mode
-            for sig_key in sp_config.assigned_signals:
-                run_idx, sig_name = parse_signal_key(sig_key)
-                
-                # Get data
-                time_data, sig_data = _get_signal_data(runs, derived_signals, run_idx, sig_name)
-                
-                if len(time_data) == 0:
-                    continue
-                
-                # Update time range
-                time_min = min(time_min, float(time_data[0]))
-                time_max = max(time_max, float(time_data[-1]))
-                
-                # Get settings
-                settings = signal_settings.get(sig_key, {})
-                color = settings.get("color") or COLORS[color_idx % len(COLORS)]
-                width = settings.get("line_width") or 1.5
-                
-                # Apply scale and offset transformations
-                scale = settings.get("scale", 1.0) or 1.0
-                offset = settings.get("offset", 0.0) or 0.0
-                time_offset = settings.get("time_offset", 0.0) or 0.0
-                
-                if scale != 1.0 or offset != 0.0:
-                    sig_data = sig_data * scale + offset
-                
-                # Apply time offset
-                if time_offset != 0.0:
-                    time_data = time_data + time_offset
-                
-                # Get label
-                run_paths = [r.file_path for r in runs]
-                label = get_signal_label(run_idx, sig_name, run_paths, settings.get("display_name"))
-                
-                # Check if state signal
-                is_state = settings.get("is_state", False)
-                
-                if is_state:
-                    # State signal: render as transitions (vertical lines at value changes)
-                    _add_state_trace(fig, time_data, sig_data, label, color, width, row, col, sp_idx, total_subplots)
-                    traces_per_subplot[sp_idx] += 1
-                else:
-                    # Normal signal - Feature 7: Group by subplot, individual toggle
-                    # Each trace in subplot shares legendgroup for grouping, but toggleitem allows individual toggle
-                    is_first_in_subplot = traces_per_subplot[sp_idx] == 0
-                    subplot_group = f"SP{sp_idx+1}"
-                    
-                    fig.add_trace(
-                        go.Scattergl(
-                            x=time_data,
-                            y=sig_data,
-                            name=label,  # Clean label without SP suffix (group header shows subplot)
-                            mode="lines",
-                            line=dict(color=color, width=width),
-                            hovertemplate=f"<b>{label}</b><br>T: %{{x:.4f}}<br>V: %{{y:.4g}}<extra></extra>",
-                            # Group by subplot for organized legend
-                            legendgroup=subplot_group,
-                            # Add group title for first trace in each subplot (only when multiple subplots)
-                            legendgrouptitle=dict(text=f"Subplot {sp_idx+1}") if is_first_in_subplot and total_subplots > 1 else None,
-                        ),
-                        row=row, col=col,
-                    )
-                    traces_per_subplot[sp_idx] += 1
-                
-                # Cursor value (show transformed value)
-                if view_state.cursor_enabled and view_state.cursor_time is not None:
-                    val = _interpolate_at(time_data, sig_data, view_state.cursor_time)
-                    cursor_values[sig_key] = {
-                        "value": val,
-                        "label": label,
-                        "color": color,
-                        "subplot": sp_idx,
-                    }
-                
-                color_idx += 1
+        cursor_values, xy_cursor_x = _cursor_values_at(
+            cursor_sources,
+            view_state.cursor_time,
+            cursor2_time if cursor_mode == "dual" else None,
+            extra_views=xy_x_views,
+        )
     
     # Add cursor line to all subplots
     if view_state.cursor_enabled and view_state.cursor_time is not None:
@@ -336,17 +317,13 @@ def create_figure(
             
             # For X-Y mode, cursor should be at the X value corresponding to cursor time
             if sp_config and sp_config.mode == "xy" and sp_config.x_signal:
-                x_run_idx, x_sig_name = parse_signal_key(sp_config.x_signal)
-                x_time, x_data = _get_signal_data(runs, derived_signals, x_run_idx, x_sig_name)
-                if len(x_time) > 0 and len(x_data) > 0:
-                    # Find X value at cursor time
-                    cursor_x = _interpolate_at(x_time, x_data, view_state.cursor_time)
-                    if cursor_x is not None:
-                        fig.add_vline(
-                            x=cursor_x,
-                            line=dict(color="#ff6b6b", width=2, dash="dash"),
-                            row=row, col=col,
-                        )
+                cursor_x = xy_cursor_x.get(sp_idx)
+                if cursor_x is not None:
+                    fig.add_vline(
+                        x=cursor_x,
+                        line=dict(color="#ff6b6b", width=2, dash="dash"),
+                        row=row, col=col,
+                    )
             elif sp_config and sp_config.mode != "fft":
                 # Time mode - cursor at time value (skip for FFT mode)
                 fig.add_vline(
@@ -356,8 +333,6 @@ def create_figure(
                 )
     
     # Add second cursor line if in dual mode
-    cursor2_time = getattr(view_state, 'cursor2_time', None)
-    cursor_mode = getattr(view_state, 'cursor_mode', 'single')
     if cursor_mode == "dual" and cursor2_time is not None:
         for sp_idx in range(total_subplots):
             row, col = subplot_idx_to_row_col(sp_idx, cols)
@@ -412,15 +387,6 @@ def create_figure(
         uirevision="stable",
     )
     
-    # Adjust subplot title positions to prevent overlap with xlabels from row above
-    if rows > 1 and total_subplots > 1:
-        annotations = list(fig.layout.annotations)
-        for ann in annotations:
-            # Move subplot titles up slightly
-            if ann.y is not None:
-                ann.y = ann.y + 0.02
-        fig.update_layout(annotations=annotations)
-    
     # Style subplots - highlight active one (unless exporting)
     for sp_idx in range(total_subplots):
         row, col = subplot_idx_to_row_col(sp_idx, cols)
@@ -489,39 +455,784 @@ def create_figure(
                 borderpad=2,
             )
     
+    # Batch-add state transition lines, labels and raster images recorded by the subplots.
+    # Done last: Plotly re-validates every shape/annotation on each later layout change.
+    # Subplot shapes go first so cursor and region shapes still draw on top of them.
+    if subplot_shapes or subplot_annotations or subplot_images:
+        fig.update_layout(
+            shapes=subplot_shapes + list(fig.layout.shapes),
+            annotations=list(fig.layout.annotations) + subplot_annotations,
+            images=list(fig.layout.images) + subplot_images,
+        )
+    
     # Log trace counts
     print(f"[FIGURE] Traces per subplot: {traces_per_subplot}", flush=True)
     
     return fig, cursor_values
 
 
-def _get_signal_data(
+# =============================================================================
+# PAYLOAD SERIALISATION
+# =============================================================================
+
+def figure_to_payload(fig: go.Figure, y_float32: bool = False, dedupe_x: bool = True) -> Dict:
+    """
+    Serialise a figure to a dict for the browser with binary trace arrays.
+    
+    Numeric x/y/z arrays are emitted as Plotly typed arrays
+    ({"dtype": "f8", "bdata": <base64>}) instead of JSON number lists,
+    which is ~2x smaller than text and much faster to encode.
+    
+    With dedupe_x, x arrays shared by several traces (e.g. all signals of
+    one run in time mode) are encoded once into payload["shared_x"] and the
+    traces carry {"shared": <index>} instead. Such payloads must go through
+    the clientside resolver in app.py before reaching dcc.Graph.
+    
+    Args:
+        fig: Figure from create_figure
+        y_float32: If True, send y/z values as float32 where the
+            rounding error stays within FLOAT32_TOLERANCE of the data span
+            (time/x values always keep full float64 precision)
+        dedupe_x: If True, emit identical x arrays only once
+        
+    Returns:
+        Dict with "data" and "layout" (plus "shared_x" when deduplicated)
+    """
+    traces = [trace.to_plotly_json() for trace in fig.data]
+    
+    shared_x = []
+    if dedupe_x:
+        groups = _group_shared_arrays([t.get("x") for t in traces])
+        for group in groups:
+            ref = {"shared": len(shared_x)}
+            shared_x.append(encode_typed_array(traces[group[0]]["x"]))
+            for i in group:
+                traces[i]["x"] = ref
+    
+    for trace_json in traces:
+        for attr in TYPED_ARRAY_ATTRS:
+            value = trace_json.get(attr)
+            if isinstance(value, np.ndarray):
+                narrow = y_float32 and attr in FLOAT32_ATTRS
+                trace_json[attr] = encode_typed_array(value, narrow)
+    
+    payload = {"data": traces, "layout": fig.layout.to_plotly_json()}
+    if shared_x:
+        payload["shared_x"] = shared_x
+    return payload
+
+
+def _group_shared_arrays(arrays: List) -> List[List[int]]:
+    """
+    Group indices of numeric arrays with identical contents.
+    
+    Arrays are bucketed by a cheap fingerprint (length, dtype, first/last
+    value) and only compared in full within a bucket. Only groups with more
+    than one member are returned.
+    """
+    buckets: Dict[Tuple, List[List[int]]] = {}
+    for i, arr in enumerate(arrays):
+        if not isinstance(arr, np.ndarray) or arr.dtype.kind not in "fiu" or arr.size < 2:
+            continue
+        fingerprint = (arr.shape, arr.dtype.str, arr.flat[0].item(), arr.flat[-1].item())
+        groups = buckets.setdefault(fingerprint, [])
+        for group in groups:
+            other = arrays[group[0]]
+            if other is arr or np.array_equal(other, arr):
+                group.append(i)
+                break
+        else:
+            groups.append([i])
+    
+    return [g for groups in buckets.values() for g in groups if len(g) > 1]
+
+
+def encode_typed_array(arr: np.ndarray, allow_float32: bool = False):
+    """
+    Encode a numeric array as a Plotly typed-array spec.
+    
+    Returns the array unchanged for non-numeric dtypes (Plotly handles those).
+    """
+    if arr.dtype.kind not in "fiu":
+        return arr
+    
+    if arr.dtype.kind in "iu" and arr.dtype.name not in _TYPED_ARRAY_CODES:
+        # int64/uint64: use int32 when lossless, else float64
+        if len(arr) and arr.min() >= np.iinfo(np.int32).min and arr.max() <= np.iinfo(np.int32).max:
+            arr = arr.astype(np.int32)
+        else:
+            arr = arr.astype(np.float64)
+    elif arr.dtype.kind == "f" and arr.dtype.name not in _TYPED_ARRAY_CODES:
+        arr = arr.astype(np.float64)
+    
+    if allow_float32 and arr.dtype == np.float64:
+        arr32 = _narrow_to_float32(arr)
+        if arr32 is not None:
+            arr = arr32
+    
+    arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+    spec = {
+        "dtype": _TYPED_ARRAY_CODES[arr.dtype.name],
+        "bdata": base64.b64encode(arr.tobytes()).decode("ascii"),
+    }
+    if arr.ndim > 1:
+        spec["shape"] = ",".join(str(n) for n in arr.shape)
+    return spec
+
+
+def _narrow_to_float32(arr: np.ndarray) -> Optional[np.ndarray]:
+    """Return arr as float32 if precision allows, else None"""
+    if arr.size == 0:
+        return None
+    
+    finite = arr[np.isfinite(arr)]
+    if finite.size == 0:
+        return arr.astype(np.float32)
+    
+    lo, hi = float(finite.min()), float(finite.max())
+    if max(abs(lo), abs(hi)) >= np.finfo(np.float32).max:
+        return None
+    
+    span = hi - lo
+    tolerance = FLOAT32_TOLERANCE * (span if span > 0 else max(abs(hi), 1.0))
+    
+    arr32 = arr.astype(np.float32)
+    with np.errstate(invalid="ignore"):
+        err = np.nanmax(np.abs(arr32.astype(np.float64) - arr))
+    if err <= tolerance:
+        return arr32
+    return None
+
+
+# =============================================================================
+# PER-SUBPLOT TRACE CACHE
+# =============================================================================
+
+# Maximum number of cached subplot builds (LRU eviction beyond this)
+SUBPLOT_CACHE_SIZE = 64
+
+_subplot_cache: "OrderedDict[tuple, _SubplotPieces]" = OrderedDict()
+_cache_lock = threading.Lock()  # Guards _subplot_cache (callbacks may run concurrently)
+
+# Worker threads for building changed subplots in parallel (1 = build serially)
+BUILD_WORKERS = min(8, os.cpu_count() or 1)
+_build_pool: Optional[ThreadPoolExecutor] = None
+
+
+class _SubplotPieces:
+    """
+    Recorded figure operations for a single subplot.
+    
+    Trace builders draw into this object instead of a real figure, so the
+    result can be cached and replayed into any figure with the same grid.
+    Supports the subset of the go.Figure API used by the trace builders.
+    Shapes and annotations are kept as plain dicts so they can be added to
+    the layout in one batch (Plotly's add_vline/add_annotation are slow).
+    """
+    
+    def __init__(self, sp_idx: int):
+        suffix = str(sp_idx + 1) if sp_idx > 0 else ""
+        self.xref = f"x{suffix}"
+        self.yref = f"y{suffix}"
+        self.traces: List[Tuple[Any, int, int]] = []
+        self.axis_updates: List[Tuple[str, dict]] = []
+        self.shapes: List[Dict] = []
+        self.annotations: List[Dict] = []
+        self.images: List[Dict] = []
+        self.cursor_sources: List[Dict] = []  # Arrays used for cursor values
+        self.trace_count = 0
+        self.colors_used = 0
+    
+    def add_trace(self, trace, row=None, col=None):
+        self.traces.append((trace, row, col))
+    
+    def add_vline(self, x, line=None, row=None, col=None):
+        # Same shape Plotly's add_vline produces for this subplot
+        self.shapes.append(dict(
+            type="line", x0=x, x1=x, xref=self.xref,
+            y0=0, y1=1, yref=f"{self.yref} domain",
+            line=line or {},
+        ))
+    
+    def add_annotation(self, **kwargs):
+        self.annotations.append(kwargs)
+    
+    def add_layout_image(self, **kwargs):
+        self.images.append(kwargs)
+    
+    def update_xaxes(self, **kwargs):
+        self.axis_updates.append(("update_xaxes", kwargs))
+    
+    def update_yaxes(self, **kwargs):
+        self.axis_updates.append(("update_yaxes", kwargs))
+    
+    def replay(self, fig: go.Figure, shapes: List[Dict], annotations: List[Dict], images: List[Dict]):
+        """
+        Apply recorded operations to a real figure (traces are copied by Plotly).
+        Shapes, annotations and images are appended to the given lists for batch layout update.
+        """
+        for trace, row, col in self.traces:
+            fig.add_trace(trace, row=row, col=col)
+        for name, kwargs in self.axis_updates:
+            getattr(fig, name)(**kwargs)
+        shapes.extend(self.shapes)
+        annotations.extend(self.annotations)
+        images.extend(self.images)
+
+
+def clear_trace_cache():
+    """Drop all cached subplot builds"""
+    with _cache_lock:
+        _subplot_cache.clear()
+
+
+def _signal_version(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sig_key: Optional[str],
+) -> Optional[tuple]:
+    """Data identity of a signal key (ops.graph.signal_stamp), recomputing stale derived signals first"""
+    if not sig_key:
+        return None
+    from ops.graph import resolve_derived, signal_stamp
+    run_idx, sig_name = parse_signal_key(sig_key)
+    if run_idx == DERIVED_RUN_IDX:
+        resolve_derived(runs, derived, sig_name)
+    return signal_stamp(runs, derived, sig_key)
+
+
+def _subplot_cache_key(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sp_config: SubplotConfig,
+    sp_idx: int,
+    rows: int,
+    cols: int,
+    color_start: int,
+    signal_settings: Dict[str, Dict],
+) -> tuple:
+    """
+    Build the cache key for one subplot.
+    
+    Covers everything the trace builders read: signal identity and data version,
+    per-signal settings, subplot mode and mode settings, grid position, the
+    starting color index and the run paths (labels depend on all run names).
+    Titles and active-subplot highlight are applied outside and not included.
+    """
+    keys = list(sp_config.assigned_signals)
+    if sp_config.mode == "xy" and sp_config.x_signal:
+        keys.append(sp_config.x_signal)
+    
+    signals_part = tuple(
+        (
+            key,
+            _signal_version(runs, derived, key),
+            tuple(sorted(signal_settings.get(key, {}).items())),
+        )
+        for key in keys
+    )
+    
+    return (
+        sp_idx, rows, cols, color_start,
+        sp_config.mode,
+        sp_config.x_signal if sp_config.mode == "xy" else None,
+        sp_config.xy_alignment,
+        getattr(sp_config, 'fft_window', 'hanning'),
+        getattr(sp_config, 'fft_log_scale', True),
+        _viewport_key(sp_config),
+        (sp_config.xy_density, sp_config.xy_bins) if sp_config.mode == "xy" else None,
+        (sp_config.spec_nperseg, sp_config.spec_hop) if sp_config.mode in ("spectrogram", "fft") else None,
+        (sp_config.fft_pad, sp_config.fft_average, sp_config.fft_psd) if sp_config.mode == "fft" else None,
+        subplot_event_spec(sp_config) if sp_config.mode == "time" and sp_config.event_kind != "none" else None,
+        signals_part,
+        tuple(r.file_path for r in runs),
+    )
+
+
+def _viewport_key(sp_config: SubplotConfig) -> Optional[tuple]:
+    """Zoom window part of the cache key (None unless rendered for the viewport)"""
+    if not sp_config.uses_viewport:
+        return None
+    return (
+        tuple(sp_config.view_xrange) if sp_config.view_xrange else None,
+        tuple(sp_config.view_yrange) if sp_config.view_yrange else None,
+    )
+
+
+def _colors_needed(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sp_config: SubplotConfig,
+) -> int:
+    """
+    Number of palette colors a subplot consumes (must match its builder's colors_used).
+    
+    Time-mode subplots (lines or raster) take one color per signal with data;
+    other modes restart from their own color start and consume none.
+    """
+    if sp_config.mode in ("xy", "fft", "spectrogram"):
+        return 0
+    count = 0
+    for sig_key in sp_config.assigned_signals:
+        run_idx, sig_name = parse_signal_key(sig_key)
+        view = _get_signal_view(runs, derived, run_idx, sig_name)
+        if view is not None and len(view.time) > 0:
+            count += 1
+    return count
+
+
+def _get_build_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for subplot builds (created on first use)"""
+    global _build_pool
+    with _cache_lock:
+        if _build_pool is None:
+            _build_pool = ThreadPoolExecutor(max_workers=BUILD_WORKERS, thread_name_prefix="subplot-build")
+        return _build_pool
+
+
+def _get_all_subplot_pieces(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sp_configs: List[SubplotConfig],
+    rows: int,
+    cols: int,
+    color_starts: List[int],
+    signal_settings: Dict[str, Dict],
+) -> List[_SubplotPieces]:
+    """
+    Get pieces for every subplot, building only those that changed.
+    
+    Cache misses are built concurrently on a thread pool - the heavy work
+    (alignment, FFT/STFT, binning, rasterising) is NumPy and releases the GIL.
+    Builders only read shared state and draw into their own recorder.
+    """
+    keys = [
+        _subplot_cache_key(runs, derived, sp_config, sp_idx, rows, cols, color_starts[sp_idx], signal_settings)
+        for sp_idx, sp_config in enumerate(sp_configs)
+    ]
+    
+    results: List[Optional[_SubplotPieces]] = [None] * len(sp_configs)
+    misses = []
+    with _cache_lock:
+        for sp_idx, key in enumerate(keys):
+            pieces = _subplot_cache.get(key)
+            if pieces is not None:
+                _subplot_cache.move_to_end(key)
+                results[sp_idx] = pieces
+            else:
+                misses.append(sp_idx)
+    
+    def build(sp_idx: int) -> _SubplotPieces:
+        return _build_subplot_pieces(
+            runs, derived, sp_configs[sp_idx], sp_idx, rows, cols,
+            color_starts[sp_idx], signal_settings,
+        )
+    
+    if len(misses) > 1 and BUILD_WORKERS > 1:
+        built = list(_get_build_pool().map(build, misses))
+    else:
+        built = [build(sp_idx) for sp_idx in misses]
+    
+    with _cache_lock:
+        for sp_idx, pieces in zip(misses, built):
+            results[sp_idx] = pieces
+            _subplot_cache[keys[sp_idx]] = pieces
+        while len(_subplot_cache) > SUBPLOT_CACHE_SIZE:
+            _subplot_cache.popitem(last=False)
+    
+    return results
+
+
+def _build_subplot_pieces(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sp_config: SubplotConfig,
+    sp_idx: int,
+    rows: int,
+    cols: int,
+    color_start: int,
+    signal_settings: Dict[str, Dict],
+) -> _SubplotPieces:
+    """Build all traces for one subplot into a recorder"""
+    pieces = _SubplotPieces(sp_idx)
+    row, col = subplot_idx_to_row_col(sp_idx, cols)
+    total_subplots = rows * cols
+    
+    if sp_config.mode == "xy":
+        # X-Y mode - add traces and get cursor sources
+        cursor_sources, trace_count = _add_xy_traces(
+            pieces, runs, derived, sp_config, row, col,
+            color_start, signal_settings, sp_idx, total_subplots, 0,
+        )
+        pieces.cursor_sources = cursor_sources
+        pieces.trace_count = trace_count
+    elif sp_config.mode == "fft":
+        # FFT mode - frequency spectrum analysis
+        pieces.trace_count = _add_fft_traces(
+            pieces, runs, derived, sp_config, row, col,
+            color_start, signal_settings, sp_idx, total_subplots, 0,
+        )
+    elif sp_config.mode == "spectrogram":
+        # Spectrogram mode - time-frequency heatmap
+        pieces.trace_count = _add_spectrogram_traces(
+            pieces, runs, derived, sp_config, row, col,
+            color_start, signal_settings, sp_idx, total_subplots,
+        )
+    elif sp_config.render == "raster":
+        # Time mode drawn server-side as an image
+        width, height = _raster_size(rows, cols)
+        cursor_sources, trace_count, colors_used = _add_raster_traces(
+            pieces, runs, derived, sp_config, row, col,
+            color_start, signal_settings, sp_idx, total_subplots, width, height,
+        )
+        pieces.cursor_sources = cursor_sources
+        pieces.trace_count = trace_count
+        pieces.colors_used = colors_used
+    else:
+        # Time mode
+        cursor_sources, trace_count, colors_used = _add_time_traces(
+            pieces, runs, derived, sp_config, row, col,
+            color_start, signal_settings, sp_idx, total_subplots, 0,
+        )
+        pieces.cursor_sources = cursor_sources
+        pieces.trace_count = trace_count
+        pieces.colors_used = colors_used
+    
+    return pieces
+
+
+def _cursor_values_at(
+    cursor_sources: List[Dict],
+    cursor_time: float,
+    cursor2_time: Optional[float] = None,
+    extra_views: Optional[Dict[Any, SignalView]] = None,
+) -> Tuple[Dict, Dict]:
+    """
+    Evaluate cursor values for recorded cursor sources in one batched query.
+    
+    Args:
+        cursor_sources: Sources recorded by the subplot builders
+        cursor_time: Cursor 1 time
+        cursor2_time: Cursor 2 time (dual mode) or None
+        extra_views: Additional views to sample at cursor 1, by caller key
+        
+    Returns:
+        Tuple of (cursor values by signal key with "value" and, in dual mode,
+        "value2"; extra view values by key, None where unavailable)
+    """
+    extra_views = extra_views or {}
+    times = [cursor_time] if cursor2_time is None else [cursor_time, cursor2_time]
+    views = [src["view"] for src in cursor_sources] + list(extra_views.values())
+    samples = sample_views(views, times)
+    
+    def as_value(view: Optional[SignalView], value: float) -> Optional[float]:
+        return None if view is None or len(view.time) == 0 else float(value)
+    
+    values = {}
+    for src, row in zip(cursor_sources, samples):
+        values[src["key"]] = {
+            "value": as_value(src["view"], row[0]),
+            "label": src["label"],
+            "color": src["color"],
+            "subplot": src["subplot"],
+        }
+        if cursor2_time is not None:
+            values[src["key"]]["value2"] = as_value(src["view"], row[1])
+    
+    extra = {
+        key: as_value(view, row[0])
+        for (key, view), row in zip(extra_views.items(), samples[len(cursor_sources):])
+    }
+    return values, extra
+
+
+def _add_time_traces(
+    fig: go.Figure,
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sp_config: SubplotConfig,
+    row: int,
+    col: int,
+    color_start: int,
+    signal_settings: Dict,
+    sp_idx: int,
+    total_subplots: int,
+    current_trace_count: int,
+) -> Tuple[List[Dict], int, int]:
+    """
+    Add time-mode traces to subplot.
+    
+    Returns:
+        Tuple of (cursor_sources, trace_count added, colors used)
+    """
+    cursor_sources = []
+    color_idx = color_start
+    trace_count = 0
+    run_paths = [r.file_path for r in runs]
+    event_spec = subplot_event_spec(sp_config)
+    
+    for sig_key in sp_config.assigned_signals:
+        run_idx, sig_name = parse_signal_key(sig_key)
+        
+        # Get data
+        view = _get_signal_view(runs, derived, run_idx, sig_name)
+        
+        if view is None or len(view.time) == 0:
+            continue
+        
+        # Get settings
+        settings = signal_settings.get(sig_key, {})
+        color = settings.get("color") or COLORS[color_idx % len(COLORS)]
+        width = settings.get("line_width") or 1.5
+        
+        # Scale/offset/time offset stay lazy; arrays are only materialised for the trace
+        view = _apply_display_settings(view, settings)
+        time_data = view.resolve_time()
+        sig_data = view.resolve_data()
+        
+        # Get label
+        label = get_signal_label(run_idx, sig_name, run_paths, settings.get("display_name"))
+        
+        # Check if state signal
+        is_state = settings.get("is_state", False)
+        
+        if is_state:
+            # State signal: render as transitions (vertical lines at value changes)
+            _add_state_trace(fig, time_data, sig_data, label, color, width, row, col, sp_idx, total_subplots)
+        else:
+            # Normal signal - Feature 7: Group by subplot, individual toggle
+            # Each trace in subplot shares legendgroup for grouping, but toggleitem allows individual toggle
+            is_first_in_subplot = (current_trace_count + trace_count) == 0
+            subplot_group = f"SP{sp_idx+1}"
+            
+            fig.add_trace(
+                go.Scattergl(
+                    x=time_data,
+                    y=sig_data,
+                    name=label,  # Clean label without SP suffix (group header shows subplot)
+                    mode="lines",
+                    line=dict(color=color, width=width),
+                    hovertemplate=f"<b>{label}</b><br>T: %{{x:.4f}}<br>V: %{{y:.4g}}<extra></extra>",
+                    # Group by subplot for organized legend
+                    legendgroup=subplot_group,
+                    # Add group title for first trace in each subplot (only when multiple subplots)
+                    legendgrouptitle=dict(text=f"Subplot {sp_idx+1}") if is_first_in_subplot and total_subplots > 1 else None,
+                ),
+                row=row, col=col,
+            )
+        trace_count += 1
+        
+        if event_spec.kind != EventKind.NONE.value:
+            events = detect_events(view, event_spec, _signal_version(runs, derived, sig_key))
+            _add_event_markers(fig, events, event_spec, label, color, row, col, sp_idx)
+        
+        # Cursor source (cursor shows transformed value)
+        cursor_sources.append({
+            "key": sig_key,
+            "view": view,
+            "label": label,
+            "color": color,
+            "subplot": sp_idx,
+        })
+        
+        color_idx += 1
+    
+    return cursor_sources, trace_count, color_idx - color_start
+
+
+def _raster_size(rows: int, cols: int) -> Tuple[int, int]:
+    """Approximate plot-area pixel size of one subplot (mirrors create_figure's layout)"""
+    height = max(700, 320 * rows) - 80  # Top/bottom margins
+    v_spacing = 0.15 if rows > 1 else 0.05
+    h_spacing = 0.08 if cols > 1 else 0.02
+    plot_h = height * (1 - v_spacing * (rows - 1)) / rows
+    plot_w = (RASTER_PLOT_WIDTH_PX - 210) * (1 - h_spacing * (cols - 1)) / cols
+    return (
+        int(min(max(plot_w, 50), RASTER_MAX_PX)),
+        int(min(max(plot_h, 50), RASTER_MAX_PX)),
+    )
+
+
+def _add_raster_traces(
+    fig: go.Figure,
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sp_config: SubplotConfig,
+    row: int,
+    col: int,
+    color_start: int,
+    signal_settings: Dict,
+    sp_idx: int,
+    total_subplots: int,
+    width: int,
+    height: int,
+) -> Tuple[List[Dict], int, int]:
+    """
+    Add time-mode signals as one server-side rendered image.
+    
+    Signals are rasterised for the subplot's current zoom window
+    (view_xrange/view_yrange, else the full data range) and embedded as a
+    layout image in data coordinates. The browser only gets the image, an
+    invisible trace spanning the full data extent (keeps autorange/reset
+    working) and one legend entry per signal. State signals are drawn as in
+    time mode.
+    
+    Returns:
+        Tuple of (cursor_sources, trace_count added, colors used)
+    """
+    cursor_sources = []
+    series = []
+    color_idx = color_start
+    trace_count = 0
+    run_paths = [r.file_path for r in runs]
+    subplot_group = f"SP{sp_idx+1}"
+    t_min, t_max = np.inf, -np.inf
+    y_min, y_max = np.inf, -np.inf
+    event_spec = subplot_event_spec(sp_config)
+    
+    for sig_key in sp_config.assigned_signals:
+        run_idx, sig_name = parse_signal_key(sig_key)
+        view = _get_signal_view(runs, derived, run_idx, sig_name)
+        if view is None or len(view.time) == 0:
+            continue
+        
+        settings = signal_settings.get(sig_key, {})
+        color = settings.get("color") or COLORS[color_idx % len(COLORS)]
+        width_px = settings.get("line_width") or 1.5
+        label = get_signal_label(run_idx, sig_name, run_paths, settings.get("display_name"))
+        
+        view = _apply_display_settings(view, settings)
+        time_data = view.resolve_time()
+        sig_data = view.resolve_data()
+        
+        if settings.get("is_state", False):
+            _add_state_trace(fig, time_data, sig_data, label, color, width_px, row, col, sp_idx, total_subplots)
+        else:
+            series.append((time_data, sig_data, color))
+            t_min, t_max = min(t_min, time_data[0]), max(t_max, time_data[-1])
+            with np.errstate(invalid="ignore"):
+                y_min = min(y_min, np.nanmin(sig_data))
+                y_max = max(y_max, np.nanmax(sig_data))
+            
+            # Legend entry only - the data itself is in the image
+            fig.add_trace(
+                go.Scatter(
+                    x=[None], y=[None],
+                    name=label,
+                    mode="lines",
+                    line=dict(color=color, width=width_px),
+                    legendgroup=subplot_group,
+                    legendgrouptitle=dict(text=f"Subplot {sp_idx+1}") if trace_count == 0 and total_subplots > 1 else None,
+                    hoverinfo="skip",
+                ),
+                row=row, col=col,
+            )
+        trace_count += 1
+        
+        if event_spec.kind != EventKind.NONE.value:
+            events = detect_events(view, event_spec, _signal_version(runs, derived, sig_key))
+            visible = tuple(sp_config.view_xrange) if sp_config.view_xrange else None
+            _add_event_markers(fig, events, event_spec, label, color, row, col, sp_idx, x_range=visible)
+        
+        cursor_sources.append({
+            "key": sig_key,
+            "view": view,
+            "label": label,
+            "color": color,
+            "subplot": sp_idx,
+        })
+        color_idx += 1
+    
+    if series and np.isfinite(y_min) and np.isfinite(y_max):
+        if y_max <= y_min:
+            y_min, y_max = y_min - 0.5, y_max + 0.5
+        x_range = tuple(sp_config.view_xrange) if sp_config.view_xrange else (float(t_min), float(t_max))
+        y_range = tuple(sp_config.view_yrange) if sp_config.view_yrange else (float(y_min), float(y_max))
+        
+        image = rasterize_lines(series, x_range, y_range, width, height)
+        suffix = str(sp_idx + 1) if sp_idx > 0 else ""
+        fig.add_layout_image(
+            source=png_data_uri(image),
+            xref=f"x{suffix}", yref=f"y{suffix}",
+            x=x_range[0], y=y_range[1],
+            sizex=x_range[1] - x_range[0], sizey=y_range[1] - y_range[0],
+            xanchor="left", yanchor="top",
+            sizing="stretch",
+            layer="above",
+        )
+        
+        # Invisible full-extent trace so autorange covers all data
+        fig.add_trace(
+            go.Scatter(
+                x=[float(t_min), float(t_max)], y=[float(y_min), float(y_max)],
+                mode="markers",
+                marker=dict(size=0.1, opacity=0),
+                showlegend=False,
+                hoverinfo="skip",
+            ),
+            row=row, col=col,
+        )
+        
+        total = sum(len(t) for t, _, _ in series)
+        print(f"[RASTER] Subplot {sp_idx}: {len(series)} signals, {total} samples -> {width}x{height}px", flush=True)
+    
+    return cursor_sources, trace_count, color_idx - color_start
+
+
+def _get_signal_view(
     runs: List[Run],
     derived: Dict[str, DerivedSignal],
     run_idx: int,
     sig_name: str,
-) -> Tuple[np.ndarray, np.ndarray]:
-    """Get signal data from runs or derived signals"""
+) -> Optional[SignalView]:
+    """Get a copy-free signal view from runs or derived signals (None if missing)"""
     if run_idx == DERIVED_RUN_IDX:
-        if sig_name in derived:
-            ds = derived[sig_name]
-            return ds.time, ds.data
-        return np.array([]), np.array([])
+        from ops.graph import resolve_derived
+        ds = resolve_derived(runs, derived, sig_name)
+        return ds.get_view() if ds is not None else None
     
     if 0 <= run_idx < len(runs):
-        return runs[run_idx].get_signal_data(sig_name)
+        return runs[run_idx].get_signal_view(sig_name)
     
-    return np.array([]), np.array([])
+    return None
 
 
-def _interpolate_at(time: np.ndarray, data: np.ndarray, target: float) -> Optional[float]:
-    """Interpolate value at target time"""
-    if len(time) == 0:
+def get_display_view(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sig_key: str,
+    signal_settings: Dict[str, Dict],
+) -> Optional[SignalView]:
+    """Get a signal as displayed in time mode: offsets and scale applied lazily"""
+    run_idx, sig_name = parse_signal_key(sig_key)
+    view = _get_signal_view(runs, derived, run_idx, sig_name)
+    if view is None:
         return None
-    try:
-        return float(np.interp(target, time, data))
-    except:
+    return _apply_display_settings(view, signal_settings.get(sig_key, {}))
+
+
+def get_display_events(
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sig_key: str,
+    signal_settings: Dict[str, Dict],
+    spec: EventSpec,
+) -> Optional[EventTable]:
+    """Events of a signal as displayed in time mode (shares the figure's cached tables)"""
+    view = get_display_view(runs, derived, sig_key, signal_settings)
+    if view is None:
         return None
+    return detect_events(view, spec, _signal_version(runs, derived, sig_key))
+
+
+def _apply_display_settings(view: SignalView, settings: Dict, time_shift: bool = True) -> SignalView:
+    """Layer per-signal scale/offset (and optionally time_offset) settings onto a view"""
+    scale = settings.get("scale", 1.0) or 1.0
+    offset = settings.get("offset", 0.0) or 0.0
+    time_offset = (settings.get("time_offset", 0.0) or 0.0) if time_shift else 0.0
+    if scale == 1.0 and offset == 0.0 and time_offset == 0.0:
+        return view
+    return view.with_transform(scale, offset, time_offset)
 
 
 def _add_state_trace(
@@ -551,7 +1262,7 @@ def _add_state_trace(
         return
     
     # Find transitions (where value changes)
-    transitions = np.where(np.diff(data) != 0)[0] if len(time) > 1 else np.array([])
+    transitions = find_edges(time, data)
     
     annotations_data = []  # (x, text) pairs
     
@@ -562,9 +1273,9 @@ def _add_state_trace(
     
     # Transition times
     transition_times = [initial_time]
-    for idx in transitions:
-        t = float(time[idx + 1])
-        new_val = data[idx + 1]
+    for idx in transitions.start_index:
+        t = float(time[idx])
+        new_val = data[idx]
         new_val_str = int(new_val) if np.issubdtype(data.dtype, np.integer) or new_val == int(new_val) else f"{new_val:.1f}"
         transition_times.append(t)
         annotations_data.append((t, str(new_val_str)))
@@ -613,6 +1324,76 @@ def _add_state_trace(
     print(f"[STATE] Added state signal '{label}' with {len(transitions)} transitions", flush=True)
 
 
+def _add_event_markers(
+    fig: go.Figure,
+    events: EventTable,
+    spec: EventSpec,
+    label: str,
+    color: str,
+    row: int,
+    col: int,
+    sp_idx: int = 0,
+    x_range: Optional[Tuple[float, float]] = None,
+):
+    """
+    Add detected events of one signal as a marker trace.
+    
+    Crossings and edges are triangles (up = rising, down = falling) at the
+    crossing level or new state; dwells and band violations are thick
+    translucent bars from start to end at the held state or violated limit.
+    With x_range (viewport-rendered subplots) only events overlapping it
+    are drawn; beyond EVENT_MAX_MARKERS, markers are thinned evenly.
+    """
+    total = len(events)
+    if x_range is not None and total:
+        events = events.select((events.end >= x_range[0]) & (events.start <= x_range[1]))
+    shown = len(events)
+    if shown == 0:
+        return
+    thinned = shown > EVENT_MAX_MARKERS
+    if thinned:
+        events = events.select(np.linspace(0, shown - 1, EVENT_MAX_MARKERS).astype(int))
+    
+    subplot_group = f"SP{sp_idx+1}"
+    name = f"{label} {spec.kind} events"
+    if thinned:
+        name += f" (thinned: {EVENT_MAX_MARKERS} of {shown})"
+    if spec.kind in (EventKind.DWELL.value, EventKind.BAND.value):
+        gaps = np.full(len(events), np.nan)
+        hover = [f"{d:.6g} s" for d in events.duration]
+        fig.add_trace(
+            go.Scattergl(
+                x=np.column_stack((events.start, events.end, gaps)).ravel(),
+                y=np.column_stack((events.value, events.value, gaps)).ravel(),
+                text=np.repeat(hover, 3),
+                name=name,
+                mode="lines",
+                line=dict(color=color, width=8),
+                opacity=0.45,
+                hovertemplate=f"<b>{label}</b> {spec.kind}<br>T: %{{x:.4f}}<br>Duration: %{{text}}<extra></extra>",
+                legendgroup=subplot_group,
+            ),
+            row=row, col=col,
+        )
+    else:
+        symbols = np.where(events.direction > 0, "triangle-up",
+                           np.where(events.direction < 0, "triangle-down", "circle"))
+        fig.add_trace(
+            go.Scattergl(
+                x=events.start,
+                y=events.value,
+                name=name,
+                mode="markers",
+                marker=dict(color=color, size=9, symbol=symbols.tolist(), line=dict(color="white", width=1)),
+                hovertemplate=f"<b>{label}</b> {spec.kind}<br>T: %{{x:.6f}}<br>V: %{{y:.4g}}<extra></extra>",
+                legendgroup=subplot_group,
+            ),
+            row=row, col=col,
+        )
+    
+    print(f"[EVENTS] {name}: {total} found, {len(events)} drawn", flush=True)
+
+
 def _add_xy_traces(
     fig: go.Figure,
     runs: List[Run],
@@ -622,11 +1403,10 @@ def _add_xy_traces(
     col: int,
     color_start: int,
     signal_settings: Dict,
-    view_state: Any = None,
     sp_idx: int = 0,
     total_subplots: int = 1,
     current_trace_count: int = 0,
-) -> Tuple[Dict, int]:
+) -> Tuple[List[Dict], int]:
     """
     Add X-Y traces to subplot (P3-8, P7-15).
     
@@ -635,23 +1415,26 @@ def _add_xy_traces(
     - Y signals come from sp_config.assigned_signals
     - X axis label = X signal name (not "Time")
     - Cursor values show X and Y signal values at cursor time
+    - With sp_config.xy_density, each Y signal is drawn as a 2D histogram
+      heatmap over the current zoom window instead of a line
     
     Returns:
-        Tuple of (cursor_values dict, trace_count added)
+        Tuple of (cursor_sources list, trace_count added)
     """
-    cursor_values = {}
+    cursor_sources = []
     
     if not sp_config.x_signal:
         print(f"[X-Y] Subplot {sp_config.index}: No X signal selected", flush=True)
-        return cursor_values, 0
+        return cursor_sources, 0
     
     # Get X data
     x_run_idx, x_sig_name = parse_signal_key(sp_config.x_signal)
-    x_time, x_data = _get_signal_data(runs, derived, x_run_idx, x_sig_name)
+    x_view = _get_signal_view(runs, derived, x_run_idx, x_sig_name)
+    x_time, x_data = (x_view.resolve_time(), x_view.data) if x_view is not None else (np.array([]), np.array([]))
     
     if len(x_data) == 0:
         print(f"[X-Y] X signal '{x_sig_name}' has no data", flush=True)
-        return cursor_values, 0
+        return cursor_sources, 0
     
     run_paths = [r.file_path for r in runs]
     x_label = get_signal_label(x_run_idx, x_sig_name, run_paths)
@@ -663,18 +1446,18 @@ def _add_xy_traces(
     color_idx = color_start
     alignment_method = sp_config.xy_alignment or "linear"
     
-    # Add cursor values for X signal if cursor is enabled (P7-15)
-    if view_state and view_state.cursor_enabled and view_state.cursor_time is not None:
-        x_val = _interpolate_at(x_time, x_data, view_state.cursor_time)
-        cursor_values[sp_config.x_signal] = {
-            "value": x_val,
-            "label": f"X: {x_label}",
-            "color": "#58a6ff",
-            "subplot": sp_idx,
-        }
+    # Cursor source for X signal (P7-15)
+    cursor_sources.append({
+        "key": sp_config.x_signal,
+        "view": x_view,
+        "label": f"X: {x_label}",
+        "color": "#58a6ff",
+        "subplot": sp_idx,
+    })
     
     # Y signals come from assigned_signals
     y_keys = sp_config.assigned_signals
+    density_extents = []  # Full data (x, y) ranges of density heatmaps
     
     for y_key in y_keys:
         # Skip if Y signal is the same as X signal
@@ -682,7 +1465,8 @@ def _add_xy_traces(
             continue
         
         y_run_idx, y_sig_name = parse_signal_key(y_key)
-        y_time, y_data = _get_signal_data(runs, derived, y_run_idx, y_sig_name)
+        y_view = _get_signal_view(runs, derived, y_run_idx, y_sig_name)
+        y_time, y_data = (y_view.resolve_time(), y_view.data) if y_view is not None else (np.array([]), np.array([]))
         
         if len(y_data) == 0:
             print(f"[X-Y] Y signal '{y_sig_name}' has no data", flush=True)
@@ -704,12 +1488,11 @@ def _add_xy_traces(
         if len(x_time_overlap) < 2:
             continue
         
-        if alignment_method == "nearest":
-            indices = np.searchsorted(y_time, x_time_overlap)
-            indices = np.clip(indices, 0, len(y_data) - 1)
-            y_aligned = y_data[indices]
-        else:
-            y_aligned = np.interp(x_time_overlap, y_time, y_data)
+        # Resampled onto the full X time base (cached across renders), then cut
+        y_aligned = resample(
+            y_time, y_data, x_time, alignment_method,
+            version=_signal_version(runs, derived, y_key),
+        )[overlap_mask]
         
         settings = signal_settings.get(y_key, {})
         color = settings.get("color") or COLORS[color_idx % len(COLORS)]
@@ -720,6 +1503,25 @@ def _add_xy_traces(
         subplot_group = f"SP{sp_idx+1}"
         is_first_in_subplot = current_trace_count == 0
         
+        if sp_config.xy_density:
+            extent = _add_xy_density_trace(
+                fig, sp_config, x_data_overlap, y_aligned,
+                f"{y_label} vs {x_label}", subplot_group,
+                is_first_in_subplot, total_subplots, row, col,
+            )
+            if extent is not None:
+                density_extents.append(extent)
+                current_trace_count += 1
+            cursor_sources.append({
+                "key": y_key,
+                "view": y_view,
+                "label": f"Y: {y_label}",
+                "color": color,
+                "subplot": sp_idx,
+            })
+            color_idx += 1
+            continue
+        
         fig.add_trace(
             go.Scattergl(
                 x=x_data_overlap,
@@ -735,20 +1537,96 @@ def _add_xy_traces(
         )
         current_trace_count += 1
         
-        # Add cursor value for Y signal (P7-15)
-        if view_state and view_state.cursor_enabled and view_state.cursor_time is not None:
-            y_val = _interpolate_at(y_time, y_data, view_state.cursor_time)
-            cursor_values[y_key] = {
-                "value": y_val,
-                "label": f"Y: {y_label}",
-                "color": color,
-                "subplot": sp_idx,
-            }
+        # Cursor source for Y signal (P7-15)
+        cursor_sources.append({
+            "key": y_key,
+            "view": y_view,
+            "label": f"Y: {y_label}",
+            "color": color,
+            "subplot": sp_idx,
+        })
         
         color_idx += 1
         print(f"[X-Y] Added trace: {y_label} ({len(y_aligned)} points)", flush=True)
     
-    return cursor_values, current_trace_count
+    if density_extents:
+        # Invisible full-extent trace so autorange covers all data, not just the binned window
+        fig.add_trace(
+            go.Scatter(
+                x=[min(e[0][0] for e in density_extents), max(e[0][1] for e in density_extents)],
+                y=[min(e[1][0] for e in density_extents), max(e[1][1] for e in density_extents)],
+                mode="markers",
+                marker=dict(size=0.1, opacity=0),
+                showlegend=False,
+                hoverinfo="skip",
+            ),
+            row=row, col=col,
+        )
+    
+    return cursor_sources, current_trace_count
+
+
+def _add_xy_density_trace(
+    fig: go.Figure,
+    sp_config: SubplotConfig,
+    x: np.ndarray,
+    y: np.ndarray,
+    name: str,
+    legend_group: str,
+    is_first_in_subplot: bool,
+    total_subplots: int,
+    row: int,
+    col: int,
+) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
+    """
+    Add one X-Y pair as a log-count density heatmap.
+    
+    Bins cover the subplot's zoom window (view_xrange/view_yrange) or the
+    full data range, so cost is bounded by xy_bins^2 rather than sample count.
+    Only the first density trace in a subplot is visible; others are
+    toggled from the legend.
+    
+    Returns:
+        Full data ((x_min, x_max), (y_min, y_max)), or None if nothing was added
+    """
+    x_extent, y_extent = finite_range(x), finite_range(y)
+    if x_extent is None or y_extent is None:
+        return None
+    
+    bins = max(int(sp_config.xy_bins or 200), 10)
+    x_range = tuple(sp_config.view_xrange) if sp_config.view_xrange else x_extent
+    y_range = tuple(sp_config.view_yrange) if sp_config.view_yrange else y_extent
+    if x_range[1] <= x_range[0]:
+        x_range = (x_range[0] - 0.5, x_range[0] + 0.5)
+    if y_range[1] <= y_range[0]:
+        y_range = (y_range[0] - 0.5, y_range[0] + 0.5)
+    
+    counts = histogram_2d(x, y, x_range, y_range, bins, bins)
+    with np.errstate(divide="ignore"):
+        z = np.where(counts > 0, np.log10(counts), np.nan)  # Empty bins stay transparent
+    
+    x_step = (x_range[1] - x_range[0]) / bins
+    y_step = (y_range[1] - y_range[0]) / bins
+    
+    fig.add_trace(
+        go.Heatmap(
+            x0=x_range[0] + x_step / 2, dx=x_step,
+            y0=y_range[0] + y_step / 2, dy=y_step,
+            z=z,
+            name=name,
+            colorscale="Viridis",
+            showscale=False,
+            showlegend=True,
+            visible=True if is_first_in_subplot else "legendonly",
+            hovertemplate=f"<b>{name}</b><br>X: %{{x:.4g}}<br>Y: %{{y:.4g}}<br>log10(count): %{{z:.2f}}<extra></extra>",
+            legendgroup=legend_group,
+            legendgrouptitle=dict(text=legend_group.replace("SP", "Subplot ")) if is_first_in_subplot and total_subplots > 1 else None,
+        ),
+        row=row, col=col,
+    )
+    print(f"[X-Y] Density: {name} ({len(x)} points -> {bins}x{bins} bins)", flush=True)
+    
+    return x_extent, y_extent
 
 
 def _add_fft_traces(
@@ -767,12 +1645,14 @@ def _add_fft_traces(
     """
     Add FFT (frequency spectrum) traces to subplot.
     
-    Shows magnitude vs frequency for each assigned signal.
+    Shows magnitude (or power spectral density) vs frequency for each
+    assigned signal - from one whole-record FFT, or Welch-averaged over
+    segments of sp_config.spec_nperseg samples (hop sp_config.spec_hop).
     
     Returns:
         Number of traces added
     """
-    from ops.engine import compute_fft
+    from ops.engine import compute_fft, compute_averaged_fft, compute_psd
     
     color_idx = color_start
     trace_count = 0
@@ -781,26 +1661,45 @@ def _add_fft_traces(
     # Get window type from config
     window = getattr(sp_config, 'fft_window', 'hanning') or 'hanning'
     log_scale = getattr(sp_config, 'fft_log_scale', True)
+    averaged = sp_config.fft_average in ("mean", "median")
+    psd = sp_config.fft_psd
+    y_label = "PSD (units²/Hz)" if psd else "Magnitude"
     
     for sig_key in sp_config.assigned_signals:
         run_idx, sig_name = parse_signal_key(sig_key)
-        time_data, sig_data = _get_signal_data(runs, derived, run_idx, sig_name)
+        view = _get_signal_view(runs, derived, run_idx, sig_name)
         
-        if len(time_data) < 10:  # Need minimum samples for FFT
+        if view is None or len(view.time) < 10:  # Need minimum samples for FFT
             continue
         
-        # Apply signal settings (scale, offset)
+        # Apply signal settings (scale, offset) - a time shift does not change the spectrum
         settings = signal_settings.get(sig_key, {})
-        scale = settings.get("scale", 1.0) or 1.0
-        offset = settings.get("offset", 0.0) or 0.0
-        if scale != 1.0 or offset != 0.0:
-            sig_data = sig_data * scale + offset
+        view = _apply_display_settings(view, settings, time_shift=False)
         
-        # Compute FFT
-        freqs, magnitudes = compute_fft(time_data, sig_data, window)
+        # Spectrum of the raw data on the unshifted base time vector, memoised
+        # per signal version and settings; offset only affects DC (removed),
+        # so scale is applied to the cached values
+        cache_key = (sig_key, _signal_version(runs, derived, sig_key))
+        if psd:
+            # Without averaging: one segment over the whole record (periodogram)
+            freqs, magnitudes = compute_psd(
+                view.time, view.data, window,
+                sp_config.spec_nperseg if averaged else None, sp_config.spec_hop,
+                sp_config.fft_average, sp_config.fft_pad, cache_key,
+            )
+        elif averaged:
+            freqs, magnitudes = compute_averaged_fft(
+                view.time, view.data, window,
+                sp_config.spec_nperseg, sp_config.spec_hop,
+                sp_config.fft_average, sp_config.fft_pad, cache_key,
+            )
+        else:
+            freqs, magnitudes = compute_fft(view.time, view.data, window, pad=sp_config.fft_pad, cache_key=cache_key)
         
         if len(freqs) == 0:
             continue
+        if view.scale != 1.0:
+            magnitudes = magnitudes * (view.scale ** 2 if psd else abs(view.scale))
         
         color = settings.get("color") or COLORS[color_idx % len(COLORS)]
         label = get_signal_label(run_idx, sig_name, run_paths, settings.get("display_name"))
@@ -813,10 +1712,10 @@ def _add_fft_traces(
             go.Scattergl(
                 x=freqs,
                 y=magnitudes,
-                name=f"FFT({label})",
+                name=f"PSD({label})" if psd else f"FFT({label})",
                 mode="lines",
                 line=dict(color=color, width=1.5),
-                hovertemplate=f"<b>{label}</b><br>Freq: %{{x:.2f}} Hz<br>Mag: %{{y:.4g}}<extra></extra>",
+                hovertemplate=f"<b>{label}</b><br>Freq: %{{x:.2f}} Hz<br>{'PSD' if psd else 'Mag'}: %{{y:.4g}}<extra></extra>",
                 legendgroup=subplot_group,
                 legendgrouptitle=dict(text=f"Subplot {sp_idx+1}") if is_first_in_subplot and total_subplots > 1 else None,
             ),
@@ -830,10 +1729,92 @@ def _add_fft_traces(
     # Update axis labels for FFT mode
     fig.update_xaxes(title_text="Frequency (Hz)", row=row, col=col)
     fig.update_yaxes(
-        title_text="Magnitude",
+        title_text=y_label,
         type="log" if log_scale else "linear",
         row=row, col=col,
     )
     
     return trace_count
 
+
+def _add_spectrogram_traces(
+    fig: go.Figure,
+    runs: List[Run],
+    derived: Dict[str, DerivedSignal],
+    sp_config: SubplotConfig,
+    row: int,
+    col: int,
+    color_start: int,
+    signal_settings: Dict,
+    sp_idx: int,
+    total_subplots: int,
+) -> int:
+    """
+    Add spectrogram (STFT) heatmaps to subplot.
+    
+    One heatmap per assigned signal; only the first is visible, the others
+    can be switched on from the legend. Spectrograms are cached per signal
+    version and settings in ops.engine, and scale is applied to the cached
+    magnitudes (offset only affects DC, which is removed per segment).
+    
+    Returns:
+        Number of traces added
+    """
+    from ops.engine import compute_spectrogram
+    
+    trace_count = 0
+    run_paths = [r.file_path for r in runs]
+    window = sp_config.fft_window or "hanning"
+    log_scale = sp_config.fft_log_scale
+    subplot_group = f"SP{sp_idx+1}"
+    
+    for sig_key in sp_config.assigned_signals:
+        run_idx, sig_name = parse_signal_key(sig_key)
+        view = _get_signal_view(runs, derived, run_idx, sig_name)
+        if view is None or len(view.time) < 16:
+            continue
+        
+        settings = signal_settings.get(sig_key, {})
+        view = _apply_display_settings(view, settings)
+        label = get_signal_label(run_idx, sig_name, run_paths, settings.get("display_name"))
+        
+        frame_times, freqs, mags = compute_spectrogram(
+            view.time, view.data, window,
+            sp_config.spec_nperseg, sp_config.spec_hop,
+            cache_key=(sig_key, _signal_version(runs, derived, sig_key)),
+        )
+        if mags.size == 0:
+            continue
+        
+        mags = mags * abs(view.scale)
+        if log_scale:
+            z = 20.0 * np.log10(np.maximum(mags, 1e-12))
+            z_label = "dB"
+        else:
+            z = mags
+            z_label = "Mag"
+        
+        fig.add_trace(
+            go.Heatmap(
+                x=frame_times + view.time_shift,
+                y=freqs,
+                z=z,
+                name=f"STFT({label})",
+                colorscale="Viridis",
+                showscale=False,
+                showlegend=True,
+                visible=True if trace_count == 0 else "legendonly",
+                hovertemplate=f"<b>{label}</b><br>T: %{{x:.4f}}<br>Freq: %{{y:.2f}} Hz<br>{z_label}: %{{z:.3g}}<extra></extra>",
+                legendgroup=subplot_group,
+                legendgrouptitle=dict(text=f"Subplot {sp_idx+1}") if trace_count == 0 and total_subplots > 1 else None,
+            ),
+            row=row, col=col,
+        )
+        trace_count += 1
+        
+        print(f"[SPECTROGRAM] Added {label}: {z.shape[1]} frames x {z.shape[0]} bins", flush=True)
+    
+    fig.update_xaxes(title_text="Time", row=row, col=col)
+    fig.update_yaxes(title_text="Frequency (Hz)", row=row, col=col)
+    
+    return trace_count